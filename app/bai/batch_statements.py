@@ -0,0 +1,197 @@
+"""
+Batch PDF bank statement generation
+Fetches the summaries and transactions for all selected accounts in two
+set-based queries and renders the PDFs in parallel on a process pool,
+writing them to a ZIP file or an output directory.
+
+Usage:
+    python -m app.bai.batch_statements --from 2025-01-01 --to 2025-01-31 --output statements.zip
+    python -m app.bai.batch_statements --from 2025-01-01 --to 2025-01-31 --output statements/ --iban NL00RABO0123456789
+"""
+import argparse
+import csv
+import io
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import groupby
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from config.config import Config
+
+LOG_FILENAME = 'statements_log.csv'
+
+
+def statement_filename(iban, date_from, date_to):
+    """File name used for one account's statement (same as the PDF download route)"""
+    return f'bank_statement_{iban}_{date_from}_{date_to}.pdf'
+
+
+def remove_expired_batches(directory, max_age):
+    """Delete batch ZIP files older than max_age seconds
+
+    Returns:
+        int: Files removed
+    """
+    cutoff = time.time() - max_age
+    removed = 0
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.name.endswith('.zip') and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def _render_statement(summary, transactions, path):
+    """Render one statement to path; runs in a pool process"""
+    from app.bai.pdf_generator import generate_bank_statement_pdf
+
+    start = time.perf_counter()
+    with open(path, 'wb') as output:
+        generate_bank_statement_pdf(summary, transactions, output=output)
+    return time.perf_counter() - start
+
+
+def fetch_statements(ibans, date_from, date_to):
+    """Summaries and grouped transactions for all accounts in two queries
+
+    Returns:
+        list: (summary, transactions) tuples in IBAN order
+    """
+    from app.shared.database import bai_db
+
+    summaries = bai_db.get_bank_statement_summaries(ibans, date_from, date_to)
+    if not summaries:
+        return []
+
+    rows = bai_db.get_bank_statement_transactions_for_ibans(
+        [summary['iban'] for summary in summaries], date_from, date_to
+    )
+    transactions = {
+        iban: [dict(row) for row in group]
+        for iban, group in groupby(rows, key=lambda row: row['iban'])
+    }
+    return [(dict(summary), transactions.get(summary['iban'], [])) for summary in summaries]
+
+
+def generate_batch_statements(date_from, date_to, output, ibans=None, workers=None, log=print):
+    """Render statements for many accounts in parallel
+
+    Args:
+        date_from (str): Period start (YYYY-MM-DD)
+        date_to (str): Period end (YYYY-MM-DD)
+        output (str): Path ending in .zip for a ZIP file, otherwise an output directory
+        ibans (list): Accounts to include, or None for all accounts
+        workers (int): Render processes (default Config.BATCH_STATEMENT_WORKERS or CPU count)
+        log (callable): Receives one progress line per account
+
+    Returns:
+        dict: output path, total seconds and per-account timing
+    """
+    started = time.perf_counter()
+    as_zip = output.lower().endswith('.zip')
+    workers = workers or Config.BATCH_STATEMENT_WORKERS or os.cpu_count() or 1
+
+    fetch_start = time.perf_counter()
+    statements = fetch_statements(ibans, date_from, date_to)
+    fetch_seconds = time.perf_counter() - fetch_start
+    log(f"Fetched {len(statements)} accounts for {date_from} - {date_to} in {fetch_seconds:.2f}s")
+
+    if as_zip:
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        target_dir = tempfile.mkdtemp(prefix='cashapp_statements_')
+    else:
+        os.makedirs(output, exist_ok=True)
+        target_dir = output
+
+    accounts = []
+    try:
+        # spawn: pool processes must not inherit the parent's database connections
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = {}
+            for summary, transactions in statements:
+                filename = statement_filename(summary['iban'], date_from, date_to)
+                future = pool.submit(_render_statement, summary, transactions, os.path.join(target_dir, filename))
+                futures[future] = (summary['iban'], filename, len(transactions))
+
+            for future in as_completed(futures):
+                iban, filename, count = futures[future]
+                entry = {'iban': iban, 'file': filename, 'transactions': count, 'seconds': None, 'error': None}
+                try:
+                    entry['seconds'] = round(future.result(), 3)
+                    log(f"Statement {iban}: {count} transactions in {entry['seconds']:.2f}s")
+                except Exception as e:
+                    entry['error'] = str(e)
+                    log(f"Warning: statement {iban} failed: {e}")
+                accounts.append(entry)
+
+        accounts.sort(key=lambda entry: entry['iban'])
+        log_csv = _accounts_csv(accounts)
+
+        if as_zip:
+            with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+                for entry in accounts:
+                    if entry['error'] is None:
+                        archive.write(os.path.join(target_dir, entry['file']), entry['file'])
+                archive.writestr(LOG_FILENAME, log_csv)
+        else:
+            with open(os.path.join(target_dir, LOG_FILENAME), 'w', newline='') as f:
+                f.write(log_csv)
+    finally:
+        if as_zip:
+            shutil.rmtree(target_dir, ignore_errors=True)
+
+    total = time.perf_counter() - started
+    failed = sum(1 for entry in accounts if entry['error'])
+    log(f"Wrote {len(accounts) - failed} statements ({failed} failed) to {output} in {total:.2f}s with {workers} workers")
+    return {
+        'output': output,
+        'date_from': date_from,
+        'date_to': date_to,
+        'workers': workers,
+        'fetch_seconds': round(fetch_seconds, 3),
+        'seconds': round(total, 3),
+        'failed': failed,
+        'accounts': accounts
+    }
+
+
+def _accounts_csv(accounts):
+    """Per-account job log as CSV text"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=['iban', 'file', 'transactions', 'seconds', 'error'])
+    writer.writeheader()
+    writer.writerows(accounts)
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate PDF bank statements for many accounts')
+    parser.add_argument('--from', dest='date_from', required=True, help='period start (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='date_to', required=True, help='period end (YYYY-MM-DD)')
+    parser.add_argument('--output', required=True, help='ZIP file (*.zip) or output directory')
+    parser.add_argument('--iban', action='append', help='limit to this account (repeatable); default all')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    result = generate_batch_statements(args.date_from, args.date_to, args.output, ibans=args.iban, workers=args.workers)
+    sys.exit(1 if result['failed'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,6 @@
+"""
+Bank statement export engine (MT940, CAMT.053) for bai_exports configurations
+"""
+from app.bai.exports.engine import run_exports, export_filename, WRITERS
+
+__all__ = ['run_exports', 'export_filename', 'WRITERS']
@@ -0,0 +1,220 @@
+"""
+Bank statement export engine
+Builds one day's statement file for every enabled bai_exports configuration
+in a single pass: the balances for all configured IBANs come from one query,
+the transactions are streamed from one server-side cursor ordered by IBAN,
+and each account's file is written while its rows are read (CAMT.053
+TxsSummry totals are computed in the database up front).
+Every file is written to a temp name in the configured outputpath and renamed
+into place; all files of the run are recorded in bai_exports_audit_log in
+one insert.
+
+Usage:
+    python -m app.bai.exports.engine --date 2025-01-31 --format MT940
+    python -m app.bai.exports.engine --date 2025-01-31 --format CAMT053
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from itertools import groupby
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+from app.bai.exports import camt053, mt940
+
+# Statement writers per bai_exports.exportformat (upper case)
+WRITERS = {
+    'MT940': (mt940.write_statement, 'utf-8-sig', ''),
+    'CAMT053': (camt053.write_statement, 'utf-8', '\n'),
+}
+
+# bai_exports.dateformat tokens (YYYYMMDD style) to strftime
+_DATE_TOKENS = [('YYYY', '%Y'), ('yyyy', '%Y'), ('YY', '%y'), ('yy', '%y'),
+                ('MM', '%m'), ('DD', '%d'), ('dd', '%d')]
+
+
+def export_filename(config, closing_date):
+    """File name for a config: prefix + IBAN [+ _date] + extension"""
+    name = f"{config.get('fileprefix') or ''}{config['iban']}"
+    if config.get('includedate'):
+        date_format = config.get('dateformat') or 'YYYYMMDD'
+        for token, directive in _DATE_TOKENS:
+            date_format = date_format.replace(token, directive)
+        name += '_' + closing_date.strftime(date_format)
+    extension = config.get('fileextension') or ''
+    if extension and not extension.startswith('.'):
+        extension = '.' + extension
+    return name + extension
+
+
+def _write_file(config, closing_date, account, transactions, writer, encoding, newline):
+    """Write one export file atomically; returns (filename, path, record_count)"""
+    filename = export_filename(config, closing_date)
+    output_dir = config['outputpath']
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, filename)
+
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, prefix='.export_', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding=encoding, newline=newline) as stream:
+            count = writer(stream, account, transactions)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return filename, path, count
+
+
+def write_export(config, closing_date, account, transactions):
+    """Write the file of one bai_exports config; returns (filename, path, record_count)
+
+    Raises ValueError when the account's opening or closing balance is missing.
+    """
+    writer, encoding, newline = WRITERS[config['exportformat'].upper()]
+    if account is None or account.get('closing_balance') is None or account.get('opening_balance') is None:
+        raise ValueError(f"Missing closingBooked balance for {config['iban']} on {closing_date} or the day before")
+    return _write_file(config, closing_date, account, transactions, writer, encoding, newline)
+
+
+def export_summaries(db, ibans, closing_date):
+    """CAMT.053 TxsSummry totals per IBAN, computed in the database
+
+    IBANs without transactions get an empty summary.
+    """
+    totals = defaultdict(list)
+    for row in db.get_export_summaries(ibans, closing_date):
+        totals[row['iban']].append(row)
+    return {iban: camt053.summary_from_totals(totals.get(iban, ())) for iban in ibans}
+
+
+def audit_row(config, closing_date, entry, path, caller_id, attempts=1):
+    """bai_exports_audit_log row for one export entry (see Database.log_exports)"""
+    return (
+        config.get('bank'), config['iban'], config.get('destination'), config.get('exportformat'), closing_date,
+        entry['file'], path, entry['records'], entry['success'], entry['error'], caller_id,
+        round(entry['seconds'] * 1000), attempts
+    )
+
+
+def run_exports(closing_date=None, export_format='MT940', ibans=None, caller_id='cashapp', db=None, log=print):
+    """Generate the statement files for all enabled configs of one format
+
+    Args:
+        closing_date (date|str): Day to export (default yesterday)
+        export_format (str): bai_exports.exportformat to run (MT940, CAMT053)
+        ibans (list): Optional subset of configured IBANs
+        caller_id (str): Stored in bai_exports_audit_log.caller_id
+        db (Database): Connection to use; by default the run opens its own, since
+            the transactions are streamed through a server-side cursor that a
+            commit or rollback by another thread on a shared connection would close
+
+    Returns:
+        dict: Totals plus one entry per config with file, record count and timing
+    """
+    if db is not None:
+        return _run_exports(db, closing_date, export_format, ibans, caller_id, log)
+
+    from app.shared.database import Database
+    db = Database('bai')
+    try:
+        return _run_exports(db, closing_date, export_format, ibans, caller_id, log)
+    finally:
+        db.close()
+
+
+def _run_exports(db, closing_date, export_format, ibans, caller_id, log):
+    started = time.perf_counter()
+    if closing_date is None:
+        closing_date = date.today() - timedelta(days=1)
+    elif isinstance(closing_date, str):
+        closing_date = datetime.strptime(closing_date, '%Y-%m-%d').date()
+
+    export_format = export_format.upper()
+    if export_format not in WRITERS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    configs_by_iban = defaultdict(list)
+    for config in db.get_export_configs(export_format):
+        if not ibans or config['iban'] in ibans:
+            configs_by_iban[config['iban']].append(dict(config))
+    if not configs_by_iban:
+        log(f"No enabled {export_format} export configs")
+        return {'closing_date': closing_date, 'format': export_format, 'files': 0, 'failed': 0,
+                'seconds': 0, 'exports': []}
+
+    all_ibans = sorted(configs_by_iban)
+    accounts = {row['iban']: dict(row, closing_date=closing_date) for row in db.get_export_balances(all_ibans, closing_date)}
+    if export_format == 'CAMT053':
+        # TxsSummry precedes the entries; with the totals from SQL the rows are written in one pass
+        for iban, summary in export_summaries(db, list(accounts), closing_date).items():
+            accounts[iban]['summary'] = summary
+
+    exports = []
+    audit_rows = []
+
+    def export_account(iban, transactions):
+        account = accounts.get(iban)
+        for config in configs_by_iban[iban]:
+            entry_start = time.perf_counter()
+            entry = {'config_id': config['id'], 'iban': iban, 'destination': config.get('destination'),
+                     'file': None, 'records': 0, 'success': False, 'error': None}
+            try:
+                entry['file'], path, entry['records'] = write_export(config, closing_date, account, transactions)
+                entry['success'] = True
+            except Exception as e:
+                path = None
+                entry['error'] = str(e)
+                log(f"Warning: {export_format} export for {iban} failed: {e}")
+            entry['seconds'] = round(time.perf_counter() - entry_start, 3)
+            audit_rows.append(audit_row(config, closing_date, entry, path, caller_id))
+            exports.append(entry)
+
+    # One streaming pass over all transactions; IBANs without rows get an empty statement
+    remaining = set(all_ibans)
+    for iban, rows in groupby(db.iter_export_transactions(all_ibans, closing_date), key=lambda row: row['iban']):
+        # A single config writes straight from the stream; several configs share one list
+        export_account(iban, rows if len(configs_by_iban[iban]) == 1 else list(rows))
+        remaining.discard(iban)
+    for iban in sorted(remaining):
+        export_account(iban, [])
+
+    # Audit rows are written after the stream: a commit would close the server-side cursor
+    try:
+        db.log_exports(audit_rows)
+    except Exception as e:
+        log(f"Warning: could not write export audit log: {e}")
+
+    failed = sum(1 for entry in exports if not entry['success'])
+    seconds = round(time.perf_counter() - started, 3)
+    log(f"{export_format} export {closing_date}: {len(exports) - failed} files written, {failed} failed in {seconds}s")
+    return {
+        'closing_date': closing_date,
+        'format': export_format,
+        'files': len(exports) - failed,
+        'failed': failed,
+        'seconds': seconds,
+        'exports': exports
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate bank statement export files for bai_exports configs')
+    parser.add_argument('--date', default=None, help='closing date (YYYY-MM-DD), default yesterday')
+    parser.add_argument('--format', default='MT940', choices=sorted(WRITERS))
+    parser.add_argument('--iban', action='append', help='limit to this IBAN (repeatable)')
+    args = parser.parse_args()
+
+    result = run_exports(args.date, args.format, ibans=args.iban, caller_id='cli')
+    sys.exit(1 if result['failed'] else 0)
+
+
+if __name__ == '__main__':
+    main()
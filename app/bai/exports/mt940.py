@@ -0,0 +1,231 @@
+"""
+MT940 (Rabobank MT940S structured) statement writer
+Python port of the archived Autobank generator
+(Archive/BAI_Tool/Rabobank/UiPath/Autobank/Scripts/VB/autobank_rabobank_mt940_db.vb):
+same :20:/:25:/:28C:/:60F:/:61:/:86:/:62F:/:64:/:65: layout, 15-position
+amounts and Rabobank transaction type/reference mapping.
+"""
+import re
+
+# Lines are written with CRLF like the .NET generator did
+NEWLINE = '\r\n'
+
+# SWIFT X character set plus the underscore Rabobank uses
+_INVALID_CHARS = re.compile(r"[^A-Za-z0-9 /\-?:().,'_{}]")
+_REMI_ID_SUFFIX = re.compile(r'/ID\.(\d+)/?$')
+
+# Field 61 sub 6: four-digit Rabobank codes are truncated, full code goes to :86:/TRCD/
+_TYPE_CODES = {'64': 'N064', '93': 'N093', '2033': 'N033', '2065': 'N065', '1085': 'N085'}
+
+# Field 61 sub 7: reference type per Rabobank transaction code
+_REFERENCE_TYPES = {
+    '64': 'MARF',
+    '193': 'NONREF',
+    '93': 'NONREF',
+    '540': 'FT',
+    '586': 'PREF',
+    '626': 'NONREF',
+    '625': 'NONREF',
+}
+
+# Codes without an /ISDT/ (booking date) element in :86:
+_NO_ISDT = {'626', '625', '1085', '64', '193', '93', '2033', '2065', '540'}
+
+# Codes that always carry /OCMT/ when an instructed amount is known
+_FORCE_OCMT = {'2033', '2065', '540'}
+
+# Field 86 holds at most 6 lines of 65 characters
+MAX_86_LINES = 6
+LINE_LENGTH = 65
+
+
+def clean_text(value):
+    """Strip characters that are not allowed in MT940 text fields (case is preserved)"""
+    if not value:
+        return ''
+    return _INVALID_CHARS.sub('', str(value))
+
+
+def format_amount(amount):
+    """Absolute amount with decimal comma, zero-padded to 15 positions (000000000032,00)"""
+    return f'{abs(amount):.2f}'.replace('.', ',').rjust(15, '0')
+
+
+def cd_indicator(amount):
+    return 'C' if amount >= 0 else 'D'
+
+
+def wrap_86(text):
+    """Split :86: content into lines of max 65 characters, preferring / - or space breaks"""
+    lines = []
+    remaining = text
+    max_length = LINE_LENGTH - 4  # first line carries the ":86:" tag
+    while remaining:
+        if len(remaining) <= max_length:
+            lines.append(remaining)
+            break
+        break_point = max_length
+        for i in range(max_length - 1, max(max_length - 20, 0) - 1, -1):
+            if remaining[i] in ' /-':
+                break_point = i
+                break
+        lines.append(remaining[:break_point])
+        remaining = remaining[break_point:]
+        max_length = LINE_LENGTH
+    return lines
+
+
+def _value(tx, column):
+    value = tx.get(column)
+    return '' if value is None else str(value)
+
+
+def _statement_line(tx, code, amount):
+    """Field 61 content: value date, C/D, amount, type code, reference"""
+    entry_ref = _value(tx, 'entry_reference')
+    batch_ref = _value(tx, 'batch_entry_reference')
+    end_to_end = _value(tx, 'end_to_end_id')
+    payment_ref = _value(tx, 'payment_information_identification') or batch_ref or _value(tx, 'instruction_id')
+
+    reference = entry_ref or batch_ref or _value(tx, 'instruction_id')
+    if not reference and end_to_end and end_to_end != 'NOTPROVIDED':
+        reference = end_to_end
+
+    type_code = _TYPE_CODES.get(code) or 'N' + (code[:3] if len(code) >= 3 else code.ljust(3, '0'))
+    value_date = tx.get('value_date') or tx['booking_date']
+    head = f"{value_date.strftime('%y%m%d')}{cd_indicator(amount)}{format_amount(amount)}"
+
+    if code == '1085':
+        # Smart Pay: fixed reference plus the first 7 digits of the booking date
+        return f"{head}N08500203158 {tx['booking_date'].strftime('%Y%m%d')[:7]}//{reference}"
+
+    if code == '2033' and batch_ref.startswith(('OM1B', 'OM1T')):
+        return f"{head}{type_code}{batch_ref.replace('OM1B', 'OM1T')[:16]}"
+    if code == '2033' and reference.startswith('OO9T'):
+        return f"{head}{type_code}{reference[:20]}"
+    if code in ('2065', '065') and batch_ref.startswith(('OM1B', 'OM1T')):
+        short_ref = batch_ref.replace('OM1B', 'OM1T')[:16]
+        return f"{head}{type_code}{short_ref}//{batch_ref}"
+    if code in ('626', '625') and payment_ref.startswith(('OO9B', 'OO9T')):
+        short_ref = payment_ref.replace('OO9B', 'OO9T')[:16]
+        return f"{head}{type_code}{short_ref}//{batch_ref or reference}"
+
+    reference_type = _REFERENCE_TYPES.get(code, 'EREF')
+    if code == '501':
+        reference = batch_ref or reference
+    if code == '586' or not reference:
+        return f"{head}{type_code}{reference_type}"
+    return f"{head}{type_code}{reference_type}//{reference}"
+
+
+def _information(tx, code, amount, currency):
+    """Field 86 structured content (/EREF/.../TRCD/.../REMI/...)"""
+    parts = []
+    end_to_end = _value(tx, 'end_to_end_id')
+    if not end_to_end or end_to_end == 'NOTPROVIDED':
+        end_to_end = (_value(tx, 'payment_information_identification') or _value(tx, 'instruction_id')
+                      or _value(tx, 'entry_reference'))
+    payment_ref = (_value(tx, 'payment_information_identification') or _value(tx, 'batch_entry_reference')
+                   or _value(tx, 'instruction_id') or end_to_end)
+    has_eref = end_to_end and end_to_end != 'NOTPROVIDED'
+
+    if code == '64' and tx.get('mandate_id'):
+        parts.append(f"/MARF/{tx['mandate_id']}")
+    if code != '586' and has_eref:
+        parts.append(f'/EREF/{end_to_end}')
+    if code in ('544', '501', '586') and payment_ref:
+        parts.append(f'/PREF/{payment_ref}')
+    elif code == '541' and end_to_end.startswith('OO9B'):
+        parts.append(f'/PREF/{end_to_end}')
+
+    parts.append(f'/TRCD/{code.zfill(3)}')
+    if tx.get('reason_code'):
+        parts.append(f"/RTRN/{tx['reason_code']}")
+
+    if code not in ('193', '93'):
+        if code == '64' and tx.get('creditor_name'):
+            parts.append('/ORDP//NAME/' + clean_text(tx['creditor_name']))
+        elif amount >= 0 and tx.get('debtor_name'):
+            parts.append('/ORDP//NAME/' + clean_text(tx['debtor_name']))
+        elif amount < 0 and tx.get('creditor_name'):
+            parts.append('/BENM//NAME/' + clean_text(tx['creditor_name']))
+
+    remittance = clean_text(tx.get('remittance_information_unstructured'))
+    if remittance:
+        match = _REMI_ID_SUFFIX.search(remittance)
+        if match:
+            remittance = _REMI_ID_SUFFIX.sub('', remittance).rstrip('/')
+            parts.append(f'/REMI/{remittance}/ID.{match.group(1)}')
+        else:
+            parts.append(f'/REMI/{remittance}')
+
+    original_currency = _value(tx, 'instructed_amount_currency') or _value(tx, 'currency_exchange_source_currency')
+    original_amount = _value(tx, 'instructed_amount')
+    if original_currency and original_amount and (code in _FORCE_OCMT or original_currency != currency):
+        parts.append(f"/OCMT/{original_currency}{original_amount.replace('.', ',')}")
+    if tx.get('currency_exchange_rate') is not None and original_currency:
+        rate = f"{round(tx['currency_exchange_rate'], 5):f}".rstrip('0').rstrip('.')
+        parts.append(f"/EXCH/{rate.replace('.', ',')}")
+
+    if code in ('586', '2065', '065', '625') and tx.get('initiating_party_name'):
+        parts.append('/INIT//NAME/' + clean_text(tx['initiating_party_name']))
+    if tx.get('purpose_code'):
+        parts.append(f"/PURP//CD/{tx['purpose_code']}")
+    if code not in _NO_ISDT:
+        parts.append(f"/ISDT/{tx['booking_date'].strftime('%Y-%m-%d')}")
+    if code == '64' and tx.get('creditor_id'):
+        parts.append(f"/CSID/{tx['creditor_id']}")
+
+    return ''.join(parts)
+
+
+def write_statement(stream, account, transactions):
+    """Write one account's day statement as MT940 to a text stream
+
+    Args:
+        stream: Text file object
+        account (dict): iban, currency, closing_date, opening_balance, closing_balance
+        transactions (iterable): Transaction rows of that day (see Database.iter_export_transactions)
+
+    Returns:
+        int: Number of transactions written
+    """
+    day = account['closing_date']
+    currency = account['currency']
+    opening = account['opening_balance']
+    closing = account['closing_balance']
+    write = stream.write
+
+    write(':940:' + NEWLINE)
+    write(f":20:940S{day.strftime('%y%m%d')}" + NEWLINE)
+    write(f":25:{account['iban'].replace(' ', '')} {currency}" + NEWLINE)
+    write(f":28C:{day.strftime('%y')}{day.timetuple().tm_yday:03d}" + NEWLINE)
+    # Opening balance is the closingBooked balance of the previous day
+    previous_day = day.fromordinal(day.toordinal() - 1)
+    write(f":60F:{cd_indicator(opening)}{previous_day.strftime('%y%m%d')}{currency}{format_amount(opening)}" + NEWLINE)
+
+    count = 0
+    for tx in transactions:
+        amount = tx['transaction_amount']
+        code = _value(tx, 'rabo_detailed_transaction_type') or ('100' if amount >= 0 else '586')
+
+        write(':61:' + _statement_line(tx, code, amount) + NEWLINE)
+        counterparty = tx.get('debtor_iban') if amount >= 0 else tx.get('creditor_iban')
+        write((counterparty or '0000000000') + NEWLINE)
+
+        lines = wrap_86(_information(tx, code, amount, currency))[:MAX_86_LINES]
+        for i, line in enumerate(lines):
+            if i == 0:
+                write(':86:' + line + NEWLINE)
+            else:
+                # A continuation line must not look like a new tag
+                write((' ' + line[1:] if line.startswith(':') else line) + NEWLINE)
+        count += 1
+
+    closing_field = f"{cd_indicator(closing)}{day.strftime('%y%m%d')}{currency}{format_amount(closing)}"
+    write(':62F:' + closing_field + NEWLINE)
+    write(':64:' + closing_field + NEWLINE)
+    for offset in range(1, 5):
+        forward_day = day.fromordinal(day.toordinal() + offset)
+        write(f":65:{cd_indicator(closing)}{forward_day.strftime('%y%m%d')}{currency}{format_amount(closing)}" + NEWLINE)
+    return count
@@ -0,0 +1,231 @@
+"""
+Parallel export runs for all enabled bai_exports configurations
+Every config (one file per IBAN, format and destination) is its own task.
+Tasks run on one thread pool per destination, sized by
+EXPORT_DESTINATION_LIMITS, with at most EXPORT_WORKERS running overall; a
+failed export is retried with exponential backoff. Each task reads its own
+account's balances and transactions on a pooled connection and records its
+result, duration and attempts in bai_exports_audit_log, so a daily run takes
+about as long as its slowest account instead of the sum of all accounts.
+
+The daily run for the previous day is registered on the shared scheduler
+(app.shared.scheduler) at EXPORT_SCHEDULE_TIME.
+
+Usage:
+    python -m app.bai.exports.scheduler --date 2025-01-31
+"""
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+from app.bai.exports.engine import WRITERS, audit_row, export_summaries, write_export
+from config.config import Config
+
+DAILY_JOB_ID = 'bai_exports_daily'
+
+
+def parse_destination_limits(spec):
+    """'Autobank=4,Globes=2' -> {'autobank': 4, 'globes': 2}"""
+    limits = {}
+    for part in (spec or '').split(','):
+        if '=' not in part:
+            continue
+        name, limit = part.split('=', 1)
+        try:
+            limits[name.strip().lower()] = max(1, int(limit))
+        except ValueError:
+            print(f"Warning: ignoring export destination limit '{part.strip()}'")
+    return limits
+
+
+class DatabasePool:
+    """Fixed set of Database objects handed out to one task at a time
+
+    The shared bai_db has a single connection, and the server-side cursor of
+    iter_export_transactions must not be interleaved with other threads' commits.
+    """
+
+    def __init__(self, size, db_type='bai'):
+        from app.shared.database import Database
+        self._databases = [Database(db_type=db_type) for _ in range(size)]
+        self._free = queue.Queue()
+        for db in self._databases:
+            self._free.put(db)
+
+    @contextmanager
+    def connection(self):
+        db = self._free.get()
+        try:
+            yield db
+        finally:
+            self._free.put(db)
+
+    def close(self):
+        for db in self._databases:
+            db.close()
+
+
+def _export_task(config, closing_date, pool, slots, retries, backoff, caller_id, log):
+    """Export one config with retries; returns the result entry"""
+    iban = config['iban']
+    started = time.perf_counter()
+    entry = {'config_id': config['id'], 'iban': iban, 'format': config['exportformat'].upper(),
+             'destination': config.get('destination'), 'file': None, 'records': 0,
+             'success': False, 'error': None, 'attempts': 0}
+    path = None
+    while True:
+        entry['attempts'] += 1
+        try:
+            with slots, pool.connection() as db:
+                balances = db.get_export_balances([iban], closing_date)
+                account = dict(balances[0], closing_date=closing_date) if balances else None
+                if account is not None and entry['format'] == 'CAMT053':
+                    account['summary'] = export_summaries(db, [iban], closing_date)[iban]
+                transactions = db.iter_export_transactions([iban], closing_date)
+                entry['file'], path, entry['records'] = write_export(config, closing_date, account, transactions)
+            entry['success'] = True
+            entry['error'] = None
+            break
+        except ValueError as e:
+            # Missing balances are a data problem; retrying within the run does not help
+            entry['error'] = str(e)
+            log(f"Warning: {entry['format']} export for {iban} to {entry['destination']} failed: {e}")
+            break
+        except Exception as e:
+            entry['error'] = str(e)
+            if entry['attempts'] > retries:
+                log(f"Warning: {entry['format']} export for {iban} to {entry['destination']} failed "
+                    f"after {entry['attempts']} attempts: {e}")
+                break
+            delay = backoff * 2 ** (entry['attempts'] - 1)
+            log(f"Warning: {entry['format']} export for {iban} failed (attempt {entry['attempts']}): {e}; "
+                f"retrying in {delay:g}s")
+            time.sleep(delay)
+    entry['seconds'] = round(time.perf_counter() - started, 3)
+
+    try:
+        with pool.connection() as db:
+            db.log_exports([audit_row(config, closing_date, entry, path, caller_id, entry['attempts'])])
+    except Exception as e:
+        log(f"Warning: could not write export audit log for {iban}: {e}")
+    return entry
+
+
+def run_scheduled_exports(closing_date=None, ibans=None, caller_id='scheduler', workers=None,
+                          destination_limits=None, retries=None, backoff=None, log=print):
+    """Export every enabled bai_exports config for one closing date in parallel
+
+    Args:
+        closing_date (date|str): Day to export (default yesterday)
+        ibans (list): Optional subset of configured IBANs
+        workers (int): Exports running at the same time over all destinations
+        destination_limits (dict): Max concurrent exports per destination (lower case)
+
+    Returns:
+        dict: Totals, slowest export and one entry per config
+    """
+    from app.shared.database import bai_db
+
+    started = time.perf_counter()
+    if closing_date is None:
+        closing_date = date.today() - timedelta(days=1)
+    elif isinstance(closing_date, str):
+        closing_date = datetime.strptime(closing_date, '%Y-%m-%d').date()
+    workers = workers or Config.EXPORT_WORKERS
+    if destination_limits is None:
+        destination_limits = parse_destination_limits(Config.EXPORT_DESTINATION_LIMITS)
+    retries = Config.EXPORT_RETRIES if retries is None else retries
+    backoff = Config.EXPORT_RETRY_BACKOFF if backoff is None else backoff
+
+    by_destination = {}
+    for config in bai_db.get_export_configs():
+        if ibans and config['iban'] not in ibans:
+            continue
+        if (config['exportformat'] or '').upper() not in WRITERS:
+            log(f"Warning: skipping export config {config['id']} ({config['iban']}): "
+                f"unsupported format {config['exportformat']}")
+            continue
+        destination = (config.get('destination') or '').lower()
+        by_destination.setdefault(destination, []).append(dict(config))
+
+    total = sum(len(configs) for configs in by_destination.values())
+    if not total:
+        log("No enabled export configs")
+        return {'closing_date': closing_date, 'files': 0, 'failed': 0, 'seconds': 0,
+                'slowest_seconds': 0, 'exports': []}
+
+    workers = min(workers, total)
+    slots = threading.BoundedSemaphore(workers)
+    pool = DatabasePool(workers)
+    executors = []
+    futures = []
+    try:
+        for destination, configs in by_destination.items():
+            limit = destination_limits.get(destination, Config.EXPORT_DESTINATION_DEFAULT_LIMIT)
+            executor = ThreadPoolExecutor(max_workers=min(limit, len(configs)),
+                                          thread_name_prefix=f'export-{destination or "default"}')
+            executors.append(executor)
+            for config in configs:
+                futures.append(executor.submit(
+                    _export_task, config, closing_date, pool, slots, retries, backoff, caller_id, log
+                ))
+        exports = [future.result() for future in as_completed(futures)]
+    finally:
+        for executor in executors:
+            executor.shutdown(wait=True)
+        pool.close()
+
+    exports.sort(key=lambda entry: (entry['iban'], entry['config_id']))
+    failed = sum(1 for entry in exports if not entry['success'])
+    seconds = round(time.perf_counter() - started, 3)
+    slowest = max(entry['seconds'] for entry in exports)
+    log(f"Exports {closing_date}: {len(exports) - failed} files written, {failed} failed in {seconds}s "
+        f"(slowest {slowest}s, {workers} workers)")
+    return {
+        'closing_date': closing_date,
+        'files': len(exports) - failed,
+        'failed': failed,
+        'seconds': seconds,
+        'slowest_seconds': slowest,
+        'exports': exports
+    }
+
+
+def schedule_daily_exports(scheduler=None):
+    """Register the daily export run (previous day) on the shared scheduler"""
+    if scheduler is None:
+        from app.shared.scheduler import scheduler
+    hour, minute = (int(part) for part in Config.EXPORT_SCHEDULE_TIME.split(':'))
+    scheduler.add_job(
+        run_scheduled_exports,
+        'cron',
+        hour=hour,
+        minute=minute,
+        id=DAILY_JOB_ID,
+        name='Daily bai_exports run',
+        replace_existing=True
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run all enabled bai_exports configs in parallel')
+    parser.add_argument('--date', default=None, help='closing date (YYYY-MM-DD), default yesterday')
+    parser.add_argument('--iban', action='append', help='limit to this IBAN (repeatable)')
+    parser.add_argument('--workers', type=int, default=None, help=f'default {Config.EXPORT_WORKERS}')
+    args = parser.parse_args()
+
+    result = run_scheduled_exports(args.date, ibans=args.iban, caller_id='cli', workers=args.workers)
+    sys.exit(1 if result['failed'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+"""
+Reconciliation engines
+get_detailed_reconciliation and get_daily_reconciliation build the IBAN x day
+grid in one SQL statement. The pandas engine fetches the narrow inputs instead
+(IBANs, closing balances, daily transaction totals, audit pivot) and builds the
+grid with merges and vectorized NumPy operations on integer cents, which keeps
+long periods fast. Both engines return the same rows.
+
+RECONCILIATION_ENGINE selects the engine: sql, pandas or auto (pandas for
+periods of RECONCILIATION_PANDAS_MIN_DAYS days or more). compare_engines runs
+both and reports the rows that differ (see benchmarks/bench_reconciliation.py).
+reconciliation_page returns the status counts plus one page of rows, so the
+report never has to hold all rows of a long period.
+"""
+import time
+from collections import Counter
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+from config.config import Config
+
+ENGINES = ('sql', 'pandas', 'auto')
+
+# Status filters of the report; MISSING covers MISSING_OPENING and MISSING_CLOSING
+STATUS_FILTERS = ('PERFECT_MATCH', 'MINOR_DIFF', 'MAJOR_DIFF', 'MISSING')
+
+# Detailed rows: iban, day DESC, then tie-breakers for rows repeated by duplicate
+# balance records (ORDER BY of Database._detailed_reconciliation_rows)
+_DETAILED_ORDER = ['iban', 'day', 'opening_cents', 'closing_cents', 'audit_status']
+_SUMMARY_KEYS = {
+    'PERFECT_MATCH': 'perfect_matches',
+    'MINOR_DIFF': 'minor_diffs',
+    'MAJOR_DIFF': 'major_diffs',
+    'MISSING': 'missing_data',
+}
+
+ONE_DAY = timedelta(days=1)
+
+_ACCOUNT_COLUMNS = ['iban', 'owner_name']
+_CLOSING_COLUMNS = ['iban', 'day', 'currency', 'amount_cents']
+_MINIMUM_COLUMNS = ['iban', 'day', 'min_cents', 'balance_count']
+_TRANSACTION_COLUMNS = [
+    'iban', 'day', 'transaction_count', 'sum_cents', 'pos_tx_count', 'pos_cents',
+    'neg_tx_count', 'neg_cents', 'currency'
+]
+_AUDIT_COLUMNS = ['iban', 'day', 'balances_status', 'transactions_status']
+
+
+def choose_engine(days, engine=None):
+    """'sql' or 'pandas' for a period of `days` days"""
+    engine = engine or Config.RECONCILIATION_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown reconciliation engine: {engine}")
+    if engine == 'auto':
+        return 'pandas' if days >= Config.RECONCILIATION_PANDAS_MIN_DAYS else 'sql'
+    return engine
+
+
+def detailed_reconciliation(db, days=7, iban_filter=None, engine=None):
+    """Rows of Database.get_detailed_reconciliation from the selected engine"""
+    if choose_engine(days, engine) == 'pandas':
+        return pandas_detailed_reconciliation(db, days=days, iban_filter=iban_filter)
+    return db.get_detailed_reconciliation(days=days, iban_filter=iban_filter)
+
+
+def daily_reconciliation(db, days=7, iban_filter=None, engine=None):
+    """Rows of Database.get_daily_reconciliation from the selected engine"""
+    if choose_engine(days, engine) == 'pandas':
+        return pandas_daily_reconciliation(db, days=days, iban_filter=iban_filter)
+    return db.get_daily_reconciliation(iban_filter=iban_filter, days=days)
+
+
+def _summary(counts):
+    """Report summary (counts per status, match percentage) from a counts mapping"""
+    summary = {key: int(counts.get(key) or 0) for key in ('total_rows', *_SUMMARY_KEYS.values())}
+    total = summary['total_rows']
+    summary['match_percentage'] = round(summary['perfect_matches'] / total * 100 if total else 0, 1)
+    return summary
+
+
+def status_count(summary, status=None):
+    """Number of report rows matching a status filter"""
+    return summary[_SUMMARY_KEYS[status]] if status else summary['total_rows']
+
+
+def reconciliation_page(db, days=7, iban_filter=None, status=None, page=1, per_page=500, engine=None):
+    """Summary of the whole detailed report plus one page of its rows
+
+    Returns (summary, rows). The SQL engine counts in the database and only
+    fetches the page; the pandas engine counts on the status column and only
+    turns the page into dicts.
+    """
+    offset = (page - 1) * per_page
+    if choose_engine(days, engine) == 'sql':
+        summary = _summary(db.get_reconciliation_summary(days=days, iban_filter=iban_filter)[0])
+        rows = db.get_detailed_reconciliation(days=days, iban_filter=iban_filter, status=status,
+                                              limit=per_page, offset=offset, row_mode='tuple')
+        return summary, rows
+
+    grid = _detailed_frame(db, days, iban_filter)
+    if grid is None:
+        return _summary({}), []
+    statuses = grid['audit_status']
+    counts = statuses.value_counts()
+    summary = _summary({
+        'total_rows': len(grid),
+        'perfect_matches': counts.get('PERFECT_MATCH'),
+        'minor_diffs': counts.get('MINOR_DIFF'),
+        'major_diffs': counts.get('MAJOR_DIFF'),
+        'missing_data': counts.get('MISSING_OPENING', 0) + counts.get('MISSING_CLOSING', 0),
+    })
+    if status == 'MISSING':
+        grid = grid[statuses.str.startswith('MISSING')]
+    elif status:
+        grid = grid[statuses == status]
+    return summary, _detailed_records(grid.iloc[offset:offset + per_page])
+
+
+def _frame(rows, columns, days=('day',)):
+    """DataFrame of query rows; date columns become datetime64 for the merges"""
+    frame = pd.DataFrame.from_records(rows, columns=columns)
+    for column in days:
+        frame[column] = pd.to_datetime(frame[column])
+    return frame
+
+
+def _cents(frame, column):
+    """Float array of a cents column, NaN where the row had no match"""
+    return frame[column].to_numpy(dtype='float64', na_value=np.nan)
+
+
+def _amounts(cents):
+    """Decimal amounts (2 decimals, as numeric(18,2)) of a cents array, None for NaN"""
+    return [None if np.isnan(c) else Decimal(int(c)).scaleb(-2) for c in cents]
+
+
+def _records(columns):
+    """List of row dicts from a dict of equally long column sequences"""
+    keys = list(columns)
+    return [dict(zip(keys, values)) for values in zip(*columns.values())]
+
+
+def _detailed_frame(db, days, iban_filter, today=None):
+    """IBAN x day grid with the computed reconciliation columns, None if empty"""
+    if days < 1:
+        return None
+    end = (today or date.today()) - ONE_DAY
+    start = end - timedelta(days=days - 1)
+    ibans = [iban_filter] if iban_filter else None
+
+    accounts = _frame(db.get_reconciliation_ibans(ibans), _ACCOUNT_COLUMNS, days=())
+    if accounts.empty:
+        return None
+    closing = _frame(db.get_closing_balance_cents(start - ONE_DAY, end, ibans), _CLOSING_COLUMNS)
+    transactions = _frame(db.get_daily_transaction_cents(start, end, ibans), _TRANSACTION_COLUMNS)
+    audit = _frame(db.get_audit_pivot(start, end, ibans), _AUDIT_COLUMNS)
+
+    # IBAN x day grid, newest day first per IBAN
+    day_index = pd.date_range(end=pd.Timestamp(end), periods=days)[::-1]
+    grid = pd.DataFrame({
+        'iban': np.repeat(accounts['iban'].to_numpy(), days),
+        'owner_name': np.repeat(accounts['owner_name'].to_numpy(), days),
+        'day': np.tile(day_index.to_numpy(), len(accounts)),
+    })
+
+    # Opening balance of a day is the closing balance of the day before
+    opening = closing.rename(columns={'currency': 'opening_currency', 'amount_cents': 'opening_cents'})
+    opening['day'] = opening['day'] + pd.Timedelta(days=1)
+    closing = closing.rename(columns={'currency': 'closing_currency', 'amount_cents': 'closing_cents'})
+    transactions = transactions.rename(columns={'currency': 'transaction_currency'})
+
+    # Left merges keep the grid order and, like the SQL joins, repeat a grid row
+    # for every duplicate balance record
+    grid = (grid
+            .merge(audit, on=['iban', 'day'], how='left')
+            .merge(opening, on=['iban', 'day'], how='left')
+            .merge(closing, on=['iban', 'day'], how='left')
+            .merge(transactions, on=['iban', 'day'], how='left'))
+
+    opening_cents = _cents(grid, 'opening_cents')
+    closing_cents = _cents(grid, 'closing_cents')
+    sum_cents = np.nan_to_num(_cents(grid, 'sum_cents'))
+    expected = np.nan_to_num(opening_cents) + sum_cents
+    difference = np.nan_to_num(closing_cents) - expected
+    abs_difference = np.abs(difference)
+    grid['audit_status'] = np.select(
+        [np.isnan(opening_cents), np.isnan(closing_cents), abs_difference < 1, abs_difference < 100],
+        ['MISSING_OPENING', 'MISSING_CLOSING', 'PERFECT_MATCH', 'MINOR_DIFF'],
+        default='MAJOR_DIFF'
+    )
+    grid['currency'] = (grid['closing_currency']
+                        .fillna(grid['opening_currency'])
+                        .fillna(grid['transaction_currency'])
+                        .fillna(''))
+    grid['opening_cents'] = np.nan_to_num(opening_cents)
+    grid['closing_cents'] = np.nan_to_num(closing_cents)
+    grid['sum_cents'] = sum_cents
+    grid['expected_cents'] = expected
+    grid['difference_cents'] = difference
+    for column in ('pos_cents', 'neg_cents'):
+        grid[column] = np.nan_to_num(_cents(grid, column))
+    for column in ('transaction_count', 'pos_tx_count', 'neg_tx_count'):
+        grid[column] = grid[column].fillna(0).astype('int64')
+    for column in ('balances_status', 'transactions_status'):
+        grid[column] = grid[column].fillna('MISSING')
+    # Same total order as the SQL engine, so pages of duplicated rows are stable
+    return grid.sort_values(_DETAILED_ORDER, ascending=[True, False, True, True, True],
+                            kind='stable', ignore_index=True)
+
+
+def _detailed_records(grid):
+    """Row dicts (as returned by get_detailed_reconciliation) of a detailed frame"""
+    return _records({
+        'iban': grid['iban'].tolist(),
+        'owner_name': grid['owner_name'].tolist(),
+        'day': grid['day'].dt.date.tolist(),
+        'audit_status': grid['audit_status'].tolist(),
+        'balances_status': grid['balances_status'].tolist(),
+        'transactions_status': grid['transactions_status'].tolist(),
+        'currency': grid['currency'].tolist(),
+        'opening_balance': _amounts(_cents(grid, 'opening_cents')),
+        'sum_transactions': _amounts(_cents(grid, 'sum_cents')),
+        'transaction_count': grid['transaction_count'].tolist(),
+        'pos_tx_sum': _amounts(_cents(grid, 'pos_cents')),
+        'pos_tx_count': grid['pos_tx_count'].tolist(),
+        'neg_tx_sum': _amounts(_cents(grid, 'neg_cents')),
+        'neg_tx_count': grid['neg_tx_count'].tolist(),
+        'closing_balance': _amounts(_cents(grid, 'closing_cents')),
+        'expected_closing': _amounts(_cents(grid, 'expected_cents')),
+        'difference': _amounts(_cents(grid, 'difference_cents')),
+    })
+
+
+def pandas_detailed_reconciliation(db, days=7, iban_filter=None, today=None):
+    """Detailed reconciliation computed in pandas (same rows as the SQL engine)"""
+    grid = _detailed_frame(db, days, iban_filter, today)
+    return [] if grid is None else _detailed_records(grid)
+
+
+def pandas_daily_reconciliation(db, days=7, iban_filter=None, today=None):
+    """Daily reconciliation computed in pandas (same rows as the SQL engine)
+
+    The SQL query joins balances of every type on both days, so its sums are
+    multiplied by the number of balance records on the day before and on the
+    day itself; the multiplier is applied here too to keep the engines equal.
+    """
+    start = (today or date.today()) - timedelta(days=days)
+    ibans = [iban_filter] if iban_filter else None
+
+    transactions = _frame(db.get_daily_transaction_cents(start, None, ibans), _TRANSACTION_COLUMNS)
+    if transactions.empty:
+        return []
+    minimums = _frame(db.get_balance_minimum_cents(start - ONE_DAY, ibans), _MINIMUM_COLUMNS)
+    opening = minimums.rename(columns={'min_cents': 'opening_cents', 'balance_count': 'opening_count'})
+    opening['day'] = opening['day'] + pd.Timedelta(days=1)
+    closing = minimums.rename(columns={'min_cents': 'closing_cents', 'balance_count': 'closing_count'})
+
+    frame = (transactions
+             .merge(opening, on=['iban', 'day'], how='left')
+             .merge(closing, on=['iban', 'day'], how='left')
+             .sort_values(['day', 'iban'], ascending=[False, True], kind='stable'))
+
+    multiplier = (np.nan_to_num(_cents(frame, 'opening_count'), nan=1.0)
+                  * np.nan_to_num(_cents(frame, 'closing_count'), nan=1.0))
+    opening_cents = _cents(frame, 'opening_cents')
+    closing_cents = _cents(frame, 'closing_cents')
+    total = np.nan_to_num(_cents(frame, 'sum_cents')) * multiplier
+    calculated = opening_cents + total
+    difference = np.abs(calculated - np.nan_to_num(closing_cents))
+    # NaN < 1 is False: no opening balance gives MISMATCH, as in SQL
+    status = np.where(difference < 1, 'OK', 'MISMATCH')
+
+    return _records({
+        'date': frame['day'].dt.date.tolist(),
+        'iban': frame['iban'].tolist(),
+        'opening_balance': _amounts(opening_cents),
+        'total_credit': _amounts(np.nan_to_num(_cents(frame, 'pos_cents')) * multiplier),
+        'total_debit': _amounts(-np.nan_to_num(_cents(frame, 'neg_cents')) * multiplier),
+        'transaction_total': _amounts(total),
+        'calculated_closing': _amounts(calculated),
+        'closing_balance': _amounts(closing_cents),
+        'difference': _amounts(difference),
+        'status': status.tolist(),
+    })
+
+
+def _row_key(row):
+    return tuple(sorted(row.items()))
+
+
+def compare_engines(db, report='detailed', days=7, iban_filter=None, limit=20):
+    """Run the SQL and pandas engine for one report and compare their rows
+
+    Rows are compared as multisets (order is ignored, Decimal('1.00') equals
+    Decimal('1')). Returns the timings, row counts and up to `limit` rows that
+    only one engine produced.
+    """
+    compute = detailed_reconciliation if report == 'detailed' else daily_reconciliation
+    result = {'report': report, 'days': days, 'iban_filter': iban_filter}
+    rows = {}
+    for engine in ('sql', 'pandas'):
+        started = time.perf_counter()
+        rows[engine] = compute(db, days=days, iban_filter=iban_filter, engine=engine)
+        result[f'{engine}_seconds'] = time.perf_counter() - started
+        result[f'{engine}_rows'] = len(rows[engine])
+    sql_rows = Counter(_row_key(row) for row in rows['sql'])
+    pandas_rows = Counter(_row_key(row) for row in rows['pandas'])
+    differences = [('sql', dict(key)) for key in (sql_rows - pandas_rows).elements()]
+    differences += [('pandas', dict(key)) for key in (pandas_rows - sql_rows).elements()]
+    result['equal'] = not differences
+    result['differences'] = differences[:limit]
+    result['difference_count'] = len(differences)
+    return result
@@ -2,12 +2,37 @@
 BAI Monitor routes - Blueprint for BAI transaction monitoring
 Uses Production Database (bai_db)
 """
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, make_response
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, make_response, Response, stream_with_context, send_file
 from flask_login import login_required, current_user
 from app.shared.database import bai_db as db  # Use BAI production database
+from app.shared.database import Database
+from app.shared.database import REFERENCE_DATA_CACHE_TTL
+from app.shared.cache import query_cache
+from app.shared.report_jobs import report_jobs, DONE, FAILED
+from app.bai.statement_cache import statement_cache
+from app.bai.reconciliation import daily_reconciliation, reconciliation_page, status_count, STATUS_FILTERS
+from config.config import Config
 from app.shared.auth import User
-from app.shared.decorators import require_bai_access
+from app.shared.formatting import format_amount_nl
+from app.shared.decorators import require_bai_access, require_admin
 from datetime import datetime, timedelta, date
+import base64
+import csv
+import io
+import json
+import os
+import tempfile
+
+# PDF statements up to this size stay in memory; larger ones spill to disk
+PDF_SPOOL_MAX_BYTES = 5 * 1024 * 1024
+
+# Detail rows per page of the reconciliation report (the API accepts up to the max)
+RECONCILIATION_PAGE_SIZE = 500
+RECONCILIATION_MAX_PAGE_SIZE = 5000
+
+# Columns of the reconciliation CSV export
+RECONCILIATION_CSV_HEADER = ['IBAN', 'Owner', 'Date', 'Status', 'Balances', 'Transactions', 'Credit', 'Debit',
+                             'TX Count', 'Opening', 'Closing', 'Expected', 'Difference']
 
 # Create BAI blueprint
 bai_bp = Blueprint('bai', __name__, template_folder='templates', static_folder='static', static_url_path='/bai/static')
@@ -19,12 +44,81 @@ def nl_currency_filter(value):
     if value is None:
         return '0,00'
     try:
-        formatted = f"{float(value):,.2f}"
-        formatted = formatted.replace(',', 'TEMP').replace('.', ',').replace('TEMP', '.')
-        return formatted
+        return format_amount_nl(value)
     except (ValueError, TypeError):
         return '0,00'
 
+# Reports that can run as background jobs for long periods (see app.shared.report_jobs)
+def _compute_reconciliation_report(days, iban_filter, status=None, page=None, per_page=None):
+    summary, data = reconciliation_page(
+        db, days=days, iban_filter=iban_filter, status=status,
+        page=page or 1, per_page=per_page or RECONCILIATION_PAGE_SIZE
+    )
+    return {'summary': summary, 'data': data}
+
+def _compute_balances_report(days, iban_filter):
+    return {
+        'balance_data': db.get_balance_data(days=days, iban_filter=iban_filter),
+        'reconciliation': daily_reconciliation(db, days=days, iban_filter=iban_filter)
+    }
+
+def _compute_bank_statement(iban, date_from, date_to):
+    summary_data = db.get_bank_statement_summary(iban, date_from, date_to)
+    return {
+        'summary': summary_data[0] if summary_data else None,
+        'transactions': db.get_bank_statement_transactions(iban, date_from, date_to)
+    }
+
+def _compute_batch_statements(date_from, date_to, ibans):
+    from app.bai.batch_statements import generate_batch_statements, remove_expired_batches
+    # ZIPs are only downloadable while their job result exists
+    remove_expired_batches(Config.BATCH_STATEMENT_DIR, Config.REPORT_RESULT_TTL)
+    job_id = report_jobs.job_id('batch_statements', {'date_from': date_from, 'date_to': date_to, 'ibans': ibans})
+    output = os.path.join(Config.BATCH_STATEMENT_DIR, f'statements_{date_from}_{date_to}_{job_id[:12]}.zip')
+    result = generate_batch_statements(date_from, date_to, output, ibans=ibans or None)
+    accounts = result.pop('accounts')
+    return {'batch': result, 'accounts': accounts}
+
+def _compute_exports(closing_date, export_format):
+    from app.bai.exports import run_exports
+    result = run_exports(closing_date, export_format or 'MT940', caller_id='cashapp-web')
+    exports = result.pop('exports')
+    return {'run': result, 'exports': exports}
+
+report_jobs.register('reconciliation', _compute_reconciliation_report,
+                     params=('days', 'iban_filter', 'status', 'page', 'per_page'))
+report_jobs.register('balances', _compute_balances_report, params=('days', 'iban_filter'))
+report_jobs.register('bank_statement', _compute_bank_statement, params=('iban', 'date_from', 'date_to'))
+report_jobs.register('batch_statements', _compute_batch_statements, params=('date_from', 'date_to', 'ibans'))
+report_jobs.register('exports', _compute_exports, params=('closing_date', 'export_format'))
+
+def _run_report(report, params, run_async):
+    """Compute a report inline, or via a background job for long periods
+    
+    Returns:
+        tuple: (result, pending_job) - result is None while the job is still running
+    """
+    if not run_async:
+        return report_jobs.compute(report, params), None
+    job = report_jobs.submit(report, params)
+    if job.status == DONE:
+        result = report_jobs.load(job.id)
+        if result is not None:
+            return result, None
+        job = report_jobs.submit(report, params)
+    if job.status == FAILED:
+        raise RuntimeError(job.error)
+    return None, job
+
+def _period_days(date_from, date_to):
+    """Number of days in a YYYY-MM-DD period, 0 if it cannot be parsed"""
+    try:
+        start = datetime.strptime(date_from, '%Y-%m-%d').date()
+        end = datetime.strptime(date_to, '%Y-%m-%d').date()
+        return (end - start).days + 1
+    except (TypeError, ValueError):
+        return 0
+
 @bai_bp.route('/dashboard')
 @login_required
 @require_bai_access
@@ -71,7 +165,8 @@ def transaction_details():
             date_to=date_to,
             amount_min=amount_min,
             amount_max=amount_max,
-            counterparty_filter=counterparty
+            counterparty_filter=counterparty,
+            row_mode='tuple'
         )
         accounts = db.get_account_list()
         
@@ -104,13 +199,17 @@ def balances():
         iban = None
     
     try:
-        balance_data = db.get_balance_data(days=days, iban_filter=iban)
-        reconciliation = db.get_daily_reconciliation(iban_filter=iban, days=days)
+        result, pending_job = _run_report(
+            'balances',
+            {'days': days, 'iban_filter': iban},
+            run_async=days >= Config.REPORT_ASYNC_MIN_DAYS
+        )
         accounts = db.get_account_list()
         
         return render_template('balances.html',
-            balance_data=balance_data,
-            reconciliation=reconciliation,
+            balance_data=result['balance_data'] if result else [],
+            reconciliation=result['reconciliation'] if result else [],
+            pending_job=pending_job,
             accounts=accounts,
             selected_days=days,
             selected_iban=iban
@@ -157,10 +256,15 @@ def bank_statements():
         accounts = db.get_account_list()
         
         # Only fetch data if IBAN is selected
+        pending_job = None
         if iban and date_from and date_to:
-            summary_data = db.get_bank_statement_summary(iban, date_from, date_to)
-            summary = summary_data[0] if summary_data else None
-            transactions = db.get_bank_statement_transactions(iban, date_from, date_to)
+            result, pending_job = _run_report(
+                'bank_statement',
+                {'iban': iban, 'date_from': date_from, 'date_to': date_to},
+                run_async=_period_days(date_from, date_to) >= Config.REPORT_ASYNC_MIN_DAYS
+            )
+            summary = result['summary'] if result else None
+            transactions = result['transactions'] if result else []
         else:
             summary = None
             transactions = []
@@ -168,6 +272,7 @@ def bank_statements():
         return render_template('bank_statements.html',
             summary=summary,
             transactions=transactions,
+            pending_job=pending_job,
             accounts=accounts,
             selected_iban=iban,
             selected_date_from=date_from,
@@ -182,8 +287,6 @@ def bank_statements():
 @require_bai_access
 def bank_statements_pdf():
     """Generate PDF bank statement"""
-    from datetime import date, timedelta
-    from flask import make_response
     from app.bai.pdf_generator import generate_bank_statement_pdf
     
     # Get parameters
@@ -195,7 +298,18 @@ def bank_statements_pdf():
         flash('Please select account and date range first', 'warning')
         return redirect(url_for('bank_statements'))
     
+    download_name = f'bank_statement_{iban}_{date_from}_{date_to}.pdf'
+    
     try:
+        # Serve a previously rendered PDF when the underlying data is unchanged
+        cache_key = None
+        if statement_cache.enabled:
+            fingerprint = db.get_bank_statement_fingerprint(iban, date_from, date_to)
+            cache_key = statement_cache.key(iban, date_from, date_to, fingerprint)
+            cached_file = statement_cache.open(cache_key)
+            if cached_file:
+                return send_file(cached_file, mimetype='application/pdf', as_attachment=True, download_name=download_name)
+        
         summary_data = db.get_bank_statement_summary(iban, date_from, date_to)
         summary = summary_data[0] if summary_data else None
         transactions = db.get_bank_statement_transactions(iban, date_from, date_to)
@@ -204,19 +318,66 @@ def bank_statements_pdf():
             flash('No data found for the selected period', 'warning')
             return redirect(url_for('bank_statements'))
         
-        # Generate PDF
-        pdf_buffer = generate_bank_statement_pdf(summary, transactions)
+        if cache_key:
+            pdf_path = statement_cache.put(
+                cache_key,
+                lambda output: generate_bank_statement_pdf(summary, transactions, output=output)
+            )
+            try:
+                return send_file(open(pdf_path, 'rb'), mimetype='application/pdf', as_attachment=True, download_name=download_name)
+            except FileNotFoundError:
+                # Evicted by another worker in the meantime: render into the spool file instead
+                pass
         
-        # Create response
-        response = make_response(pdf_buffer.getvalue())
-        response.headers['Content-Type'] = 'application/pdf'
-        response.headers['Content-Disposition'] = f'attachment; filename=bank_statement_{iban}_{date_from}_{date_to}.pdf'
+        # Generate PDF into a spooled temp file and stream it from there,
+        # so large statements are not held (and copied) in memory
+        pdf_file = tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_BYTES)
+        try:
+            generate_bank_statement_pdf(summary, transactions, output=pdf_file)
+        except Exception:
+            pdf_file.close()
+            raise
+        del transactions
         
-        return response
+        return send_file(pdf_file, mimetype='application/pdf', as_attachment=True, download_name=download_name)
     except Exception as e:
         flash(f'Error generating PDF: {str(e)}', 'danger')
         return redirect(url_for('bank_statements'))
 
+@bai_bp.route('/bank-statements/batch', methods=['POST'])
+@login_required
+@require_bai_access
+def bank_statements_batch():
+    """Start a batch PDF statement job for all (or the selected) accounts"""
+    payload = request.get_json(silent=True) or request.form
+    date_from = payload.get('date_from')
+    date_to = payload.get('date_to')
+    ibans = payload.get('ibans') if request.is_json else request.form.getlist('ibans')
+    
+    if _period_days(date_from, date_to) <= 0:
+        return jsonify({'error': 'date_from and date_to (YYYY-MM-DD) are required'}), 400
+    
+    job = report_jobs.submit('batch_statements', {
+        'date_from': date_from,
+        'date_to': date_to,
+        'ibans': sorted(ibans) if ibans else []
+    })
+    return jsonify(job.to_dict()), 202
+
+@bai_bp.route('/bank-statements/batch/<job_id>/download')
+@login_required
+@require_bai_access
+def bank_statements_batch_download(job_id):
+    """Download the ZIP produced by a finished batch statement job"""
+    result = report_jobs.load(job_id)
+    if result is None or 'batch' not in result:
+        return jsonify({'error': 'Batch not available'}), 404
+    
+    output = result['batch']['output']
+    if not os.path.exists(output):
+        return jsonify({'error': 'Batch file no longer exists'}), 410
+    return send_file(output, mimetype='application/zip', as_attachment=True, download_name=os.path.basename(output))
+
 @bai_bp.route('/reports')
 @login_required
 @require_bai_access
@@ -224,44 +385,54 @@ def reports():
     """Reports page"""
     return render_template('reports.html')
 
-@bai_bp.route('/reports/reconciliation')
-@login_required
-@require_bai_access
-def reconciliation_report():
-    """Detailed reconciliation report"""
-    days = request.args.get('days', 7, type=int)
+def _reconciliation_args(per_page=RECONCILIATION_PAGE_SIZE):
+    """Report params from the query string: days, iban, status, page"""
     iban_filter = request.args.get('iban', None)
-    
     # Convert empty string to None
     if iban_filter == '' or iban_filter == 'None':
         iban_filter = None
+    status = request.args.get('status')
+    return {
+        'days': request.args.get('days', 7, type=int),
+        'iban_filter': iban_filter,
+        'status': status if status in STATUS_FILTERS else None,
+        'page': max(request.args.get('page', 1, type=int), 1),
+        'per_page': per_page,
+    }
+
+@bai_bp.route('/reports/reconciliation')
+@login_required
+@require_bai_access
+def reconciliation_report():
+    """Detailed reconciliation report (status summary plus one page of rows)"""
+    params = _reconciliation_args()
+    days = params['days']
+    iban_filter = params['iban_filter']
     
     try:
-        data = db.get_detailed_reconciliation(days=days, iban_filter=iban_filter)
+        result, pending_job = _run_report(
+            'reconciliation',
+            params,
+            run_async=days >= Config.REPORT_ASYNC_MIN_DAYS
+        )
+        data = result['data'] if result else []
+        summary = result['summary'] if result else {}
         accounts = db.get_account_list()
         
-        # Calculate summary statistics
-        total_rows = len(data)
-        perfect_matches = len([r for r in data if r['audit_status'] == 'PERFECT_MATCH'])
-        minor_diffs = len([r for r in data if r['audit_status'] == 'MINOR_DIFF'])
-        major_diffs = len([r for r in data if r['audit_status'] == 'MAJOR_DIFF'])
-        missing_data = len([r for r in data if 'MISSING' in r['audit_status']])
-        
-        summary = {
-            'total_rows': total_rows,
-            'perfect_matches': perfect_matches,
-            'minor_diffs': minor_diffs,
-            'major_diffs': major_diffs,
-            'missing_data': missing_data,
-            'match_percentage': round((perfect_matches / total_rows * 100) if total_rows > 0 else 0, 1)
-        }
+        matching_rows = status_count(summary, params['status']) if summary else 0
+        pages = max((matching_rows + params['per_page'] - 1) // params['per_page'], 1)
         
         return render_template('reconciliation_report.html',
             data=data,
             summary=summary,
+            pending_job=pending_job,
             accounts=accounts,
             selected_days=days,
-            selected_iban=iban_filter
+            selected_iban=iban_filter,
+            selected_status=params['status'],
+            page=params['page'],
+            pages=pages,
+            matching_rows=matching_rows
         )
     except Exception as e:
         flash(f'Error loading reconciliation report: {str(e)}', 'danger')
@@ -274,113 +445,199 @@ def reconciliation_report():
             selected_iban=iban_filter
         )
 
+@bai_bp.route('/api/reconciliation')
+@login_required
+@require_bai_access
+def reconciliation_api():
+    """Reconciliation summary plus one page of detail rows as JSON
+    
+    Query args: days, iban, status (PERFECT_MATCH, MINOR_DIFF, MAJOR_DIFF,
+    MISSING), page, per_page (max 5000). Long periods run as a report job:
+    the response is then 202 with the job to poll.
+    """
+    per_page = request.args.get('per_page', RECONCILIATION_PAGE_SIZE, type=int)
+    params = _reconciliation_args(per_page=min(max(per_page, 1), RECONCILIATION_MAX_PAGE_SIZE))
+    
+    try:
+        result, pending_job = _run_report(
+            'reconciliation',
+            params,
+            run_async=params['days'] >= Config.REPORT_ASYNC_MIN_DAYS
+        )
+        if pending_job:
+            return jsonify(pending_job.to_dict()), 202
+        body = {
+            'summary': result['summary'],
+            'status': params['status'],
+            'page': params['page'],
+            'per_page': params['per_page'],
+            'matching_rows': status_count(result['summary'], params['status']),
+            'rows': [dict(row) for row in result['data']],
+        }
+        return Response(json.dumps(body, default=str), mimetype='application/json')
+    except Exception as e:
+        print(f"Error in reconciliation_api: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@bai_bp.route('/reports/reconciliation/export')
+@login_required
+@require_bai_access
+def reconciliation_export():
+    """Stream every reconciliation row matching days/iban/status as CSV (all pages)"""
+    params = _reconciliation_args()
+    # Own connection: the server-side cursor must not share bai_db with other requests
+    export_db = Database('bai')
+    
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=';')
+        writer.writerow(RECONCILIATION_CSV_HEADER)
+        try:
+            rows = export_db.iter_detailed_reconciliation(params['days'], params['iban_filter'], params['status'])
+            for i, row in enumerate(rows, 1):
+                writer.writerow([
+                    row['iban'], row['owner_name'] or '', row['day'].strftime('%d-%m-%Y'), row['audit_status'],
+                    row['balances_status'], row['transactions_status'],
+                    format_amount_nl(row['pos_tx_sum']), format_amount_nl(row['neg_tx_sum']), row['transaction_count'],
+                    format_amount_nl(row['opening_balance']), format_amount_nl(row['closing_balance']),
+                    format_amount_nl(row['expected_closing']), format_amount_nl(row['difference'])
+                ])
+                if i % 1000 == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+        except Exception as e:
+            print(f"Error in reconciliation_export: {str(e)}")
+            raise
+        finally:
+            export_db.close()
+    
+    filename = f"reconciliation_report_{params['days']}d_{date.today().isoformat()}.csv"
+    return Response(stream_with_context(generate()), mimetype='text/csv',
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+def _encode_audit_cursor(row):
+    """Opaque, URL-safe keyset cursor for an audit log row (timestamp and id)"""
+    return base64.urlsafe_b64encode(f"{row['timestamp'].isoformat()}|{row['id']}".encode()).decode()
+
+def _decode_audit_cursor(value):
+    """(timestamp, id) from a cursor, or None when missing or malformed"""
+    if not value:
+        return None
+    try:
+        timestamp, row_id = base64.urlsafe_b64decode(value.encode()).decode().rsplit('|', 1)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except ValueError:
+        return None
+
+_EXPORT_AUDIT_FILTER_ARGS = ('iban', 'format', 'date_from', 'date_to')
+
+def _export_audit_args():
+    """Filter and cursor arguments shared by the export status page and API"""
+    filters = {
+        'iban': request.args.get('iban', ''),
+        'export_format': request.args.get('format', ''),
+        'date_from': request.args.get('date_from', ''),
+        'date_to': request.args.get('date_to', ''),
+    }
+    before = _decode_audit_cursor(request.args.get('before'))
+    after = None if before else _decode_audit_cursor(request.args.get('after'))
+    return filters, before, after
+
+def _export_audit_page(filters, before, after, per_page):
+    """Rows plus the cursors of the older and newer pages (None at either end)"""
+    logs, has_more = db.get_export_audit_page(before=before, after=after, limit=per_page, **filters)
+    older = newer = None
+    if logs:
+        # Moving forward from `after` always leaves older rows behind, and vice versa
+        if has_more or after:
+            older = _encode_audit_cursor(logs[-1])
+        if (has_more and after) or before:
+            newer = _encode_audit_cursor(logs[0])
+    return logs, older, newer
+
 @bai_bp.route('/exports/status')
 @login_required
 @require_bai_access
 def export_status():
     """Export status page - shows bai_exports_audit_log"""
-    page = request.args.get('page', 1, type=int)
     per_page = 50
-    
-    # Get filter parameters
-    iban_filter = request.args.get('iban', '')
-    format_filter = request.args.get('format', '')
-    date_from = request.args.get('date_from', '')
-    date_to = request.args.get('date_to', '')
+    filters, before, after = _export_audit_args()
     
     try:
-        # Build WHERE clause based on filters
-        where_conditions = []
-        query_params = []
+        logs, older_cursor, newer_cursor = _export_audit_page(filters, before, after, per_page)
+        summary = db.get_export_audit_summary(**filters)
         
-        if iban_filter:
-            where_conditions.append("iban = %s")
-            query_params.append(iban_filter)
-        
-        if format_filter:
-            where_conditions.append("export_format = %s")
-            query_params.append(format_filter)
-        
-        if date_from:
-            where_conditions.append("closingdate >= %s")
-            query_params.append(date_from)
-        
-        if date_to:
-            where_conditions.append("closingdate <= %s")
-            query_params.append(date_to)
-        
-        where_clause = " WHERE " + " AND ".join(where_conditions) if where_conditions else ""
-        
-        # Query export audit log with pagination and filters
-        query = f"""
-            SELECT 
-                id,
-                timestamp,
-                bank,
-                iban,
-                destination,
-                export_format,
-                closingdate,
-                filename,
-                outputfilepath,
-                record_count,
-                success,
-                error_message,
-                caller_id
-            FROM rpa_data.bai_exports_audit_log
-            {where_clause}
-            ORDER BY timestamp DESC
-            LIMIT %s OFFSET %s
-        """
-        offset = (page - 1) * per_page
-        query_params.extend([per_page, offset])
-        logs = db.execute_query(query, tuple(query_params))
-        
-        # Get total count with filters
-        count_query = f"SELECT COUNT(*) as total FROM rpa_data.bai_exports_audit_log{where_clause}"
-        total_result = db.execute_query(count_query, tuple(query_params[:-2])) if where_conditions else db.execute_query(count_query)
-        total_records = total_result[0]['total'] if total_result else 0
-        total_pages = (total_records + per_page - 1) // per_page
-        
-        # Get unique IBANs and formats for filter dropdowns
-        ibans_query = "SELECT DISTINCT iban FROM rpa_data.bai_exports_audit_log WHERE iban IS NOT NULL ORDER BY iban"
-        formats_query = "SELECT DISTINCT export_format FROM rpa_data.bai_exports_audit_log WHERE export_format IS NOT NULL ORDER BY export_format"
-        
-        ibans = [row['iban'] for row in db.execute_query(ibans_query)]
-        formats = [row['export_format'] for row in db.execute_query(formats_query)]
-        
-        # Get status counts with filters
-        status_query = f"""
-            SELECT 
-                SUM(CASE WHEN success = TRUE AND (record_count > 0 OR record_count IS NULL) THEN 1 ELSE 0 END) as success_count,
-                SUM(CASE WHEN success = TRUE AND record_count = 0 THEN 1 ELSE 0 END) as success_no_tx_count,
-                SUM(CASE WHEN success = FALSE THEN 1 ELSE 0 END) as failed_count
-            FROM rpa_data.bai_exports_audit_log
-            {where_clause}
-        """
-        status_result = db.execute_query(status_query, tuple(query_params[:-2])) if where_conditions else db.execute_query(status_query)
-        success_count = status_result[0]['success_count'] if status_result else 0
-        success_no_tx_count = status_result[0]['success_no_tx_count'] if status_result else 0
-        failed_count = status_result[0]['failed_count'] if status_result else 0
+        # Filter dropdowns come from the cached bai_exports configs
+        ibans, formats = db.get_export_filter_values()
         
         return render_template('export_status.html',
             logs=logs,
-            page=page,
-            total_pages=total_pages,
-            total_records=total_records,
+            older_cursor=older_cursor,
+            newer_cursor=newer_cursor,
+            total_records=summary['total_records'],
             ibans=ibans,
             formats=formats,
-            selected_iban=iban_filter,
-            selected_format=format_filter,
-            selected_date_from=date_from,
-            selected_date_to=date_to,
-            success_count=success_count,
-            success_no_tx_count=success_no_tx_count,
-            failed_count=failed_count
+            selected_iban=filters['iban'],
+            selected_format=filters['export_format'],
+            selected_date_from=filters['date_from'],
+            selected_date_to=filters['date_to'],
+            filter_args={key: value for key, value in request.args.items() if key in _EXPORT_AUDIT_FILTER_ARGS and value},
+            success_count=summary['success_count'],
+            success_no_tx_count=summary['success_no_tx_count'],
+            failed_count=summary['failed_count']
         )
     except Exception as e:
         flash(f'Error loading export status: {str(e)}', 'danger')
-        return render_template('export_status.html', logs=[], page=1, total_pages=0, total_records=0, ibans=[], formats=[])
+        return render_template('export_status.html', logs=[], total_records=0, ibans=[], formats=[])
+
+@bai_bp.route('/api/exports/audit-log')
+@login_required
+@require_bai_access
+def export_audit_log_api():
+    """Cursor-paginated export audit log (newest first)
+    
+    Query args: iban, format, date_from, date_to, limit (max 500),
+    before/after (cursors from a previous response), summary=1 for status counts
+    """
+    per_page = min(max(request.args.get('limit', 50, type=int), 1), 500)
+    filters, before, after = _export_audit_args()
+    
+    try:
+        logs, older_cursor, newer_cursor = _export_audit_page(filters, before, after, per_page)
+        result = {
+            'logs': [dict(log, timestamp=log['timestamp'].isoformat(),
+                          closingdate=log['closingdate'].isoformat() if log['closingdate'] else None)
+                     for log in logs],
+            'older_cursor': older_cursor,
+            'newer_cursor': newer_cursor,
+        }
+        if request.args.get('summary') == '1':
+            result['summary'] = db.get_export_audit_summary(**filters)
+        return jsonify(result)
+    except Exception as e:
+        print(f"Error in export_audit_log_api: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@bai_bp.route('/exports/run', methods=['POST'])
+@login_required
+@require_admin
+def run_exports_now():
+    """Start the export engine for one closing date as a background job"""
+    payload = request.get_json(silent=True) or request.form
+    closing_date = payload.get('closing_date')
+    export_format = (payload.get('export_format') or 'MT940').upper()
+    
+    if _period_days(closing_date, closing_date) != 1:
+        return jsonify({'error': 'closing_date (YYYY-MM-DD) is required'}), 400
+    
+    from app.bai.exports import WRITERS
+    if export_format not in WRITERS:
+        return jsonify({'error': f'Unsupported export format: {export_format}'}), 400
+    
+    job = report_jobs.submit('exports', {'closing_date': closing_date, 'export_format': export_format})
+    return jsonify(job.to_dict()), 202
 
 @bai_bp.route('/exports/config', methods=['GET', 'POST'])
 @login_required
@@ -442,6 +699,7 @@ def export_config():
                 
                 flash('Export configuration created successfully!', 'success')
             
+            query_cache.invalidate('bai_exports')
             return redirect(url_for('bai.export_config'))
         except Exception as e:
             flash(f'Error saving export config: {str(e)}', 'danger')
@@ -473,8 +731,8 @@ def export_config():
         banks_query = "SELECT DISTINCT bank FROM rpa_data.bai_exports_audit_log WHERE bank IS NOT NULL ORDER BY bank"
         ibans_query = "SELECT DISTINCT iban FROM rpa_data.bai_exports_audit_log WHERE iban IS NOT NULL ORDER BY iban"
         
-        banks = [row['bank'] for row in db.execute_query(banks_query)]
-        ibans = [row['iban'] for row in db.execute_query(ibans_query)]
+        banks = [row['bank'] for row in db.execute_query(banks_query, cache_ttl=REFERENCE_DATA_CACHE_TTL, cache_tags=('bai_exports_audit',))]
+        ibans = [row['iban'] for row in db.execute_query(ibans_query, cache_ttl=REFERENCE_DATA_CACHE_TTL, cache_tags=('bai_exports_audit',))]
         
         return render_template('export_config.html',
             configs=configs,
@@ -485,6 +743,52 @@ def export_config():
         flash(f'Error loading export config: {str(e)}', 'danger')
         return render_template('export_config.html', configs=[], banks=[], ibans=[])
 
+@bai_bp.route('/api/report-jobs', methods=['POST'])
+@login_required
+@require_bai_access
+def submit_report_job():
+    """Submit a report job; identical submissions share one job"""
+    payload = request.get_json(silent=True) or {}
+    report = payload.get('report')
+    if not report_jobs.is_registered(report):
+        return jsonify({'error': f'Unknown report: {report}'}), 400
+    job = report_jobs.submit(report, payload.get('params') or {})
+    return jsonify(job.to_dict()), 202
+
+@bai_bp.route('/api/report-jobs/<job_id>')
+@login_required
+@require_bai_access
+def report_job_status(job_id):
+    """Poll the status of a report job"""
+    job = report_jobs.get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found or expired'}), 404
+    return jsonify(job.to_dict())
+
+@bai_bp.route('/api/report-jobs/<job_id>/result')
+@login_required
+@require_bai_access
+def report_job_result(job_id):
+    """Stream the finished result of a report job as JSON"""
+    result = report_jobs.load(job_id)
+    if result is None:
+        return jsonify({'error': 'Result not available'}), 404
+    
+    def generate():
+        yield '{'
+        for i, (name, value) in enumerate(result.items()):
+            yield f'{"," if i else ""}{json.dumps(name)}:'
+            if isinstance(value, list):
+                yield '['
+                for j, row in enumerate(value):
+                    yield (',' if j else '') + json.dumps(dict(row), default=str)
+                yield ']'
+            else:
+                yield json.dumps(dict(value) if value else None, default=str)
+        yield '}'
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
 @bai_bp.route('/api/transaction-chart')
 @login_required
 @require_bai_access
@@ -548,7 +852,8 @@ def ops_status():
                 CASE WHEN bool_or(l.response_status = 200) FILTER (WHERE l.endpoint = 'transactions') 
                     THEN 'OK' ELSE 'MISSING' END AS transactions_status
             FROM rpa_data.bai_api_audit_log l
-            WHERE l.closingdate::date = %s
+            WHERE l.closingdate = %s
+                AND l."timestamp" >= %s::date - INTERVAL '1 day'
                 AND l.endpoint IN ('balances','transactions')
             GROUP BY l.iban
         ),
@@ -557,23 +862,23 @@ def ops_status():
                 iban,
                 amount AS closing_balance
             FROM rpa_data.bai_rabobank_balances
-            WHERE LOWER(balance_type) IN ('closingbooked', 'closing_booked')
-                AND reference_date::date = %s
+            WHERE balance_kind = 'closing_booked'
+                AND reference_date = %s
         ),
         daily_opening AS (
             SELECT
                 iban,
                 amount AS opening_balance
             FROM rpa_data.bai_rabobank_balances
-            WHERE LOWER(balance_type) IN ('closingbooked', 'closing_booked')
-                AND reference_date::date = %s
+            WHERE balance_kind = 'closing_booked'
+                AND reference_date = %s
         ),
         daily_transactions AS (
             SELECT
                 iban,
                 SUM(transaction_amount) AS total_transactions
             FROM rpa_data.bai_rabobank_transactions
-            WHERE booking_date::date = %s
+            WHERE booking_date = %s
             GROUP BY iban
         ),
         reconciliation AS (
@@ -600,9 +905,10 @@ def ops_status():
         LEFT JOIN audit_pivot a ON i.iban = a.iban
         LEFT JOIN reconciliation r ON r.iban = i.iban
         """
-        # Parameters: audit_log_date, closing_balance_date, opening_balance_date, transactions_date
+        # Parameters: audit_log_date (closingdate and timestamp lower bound), closing_balance_date,
+        # opening_balance_date, transactions_date
         day_before_yesterday = yesterday - timedelta(days=1)
-        result = db.execute_query(ops_query, (yesterday, yesterday, day_before_yesterday, yesterday))
+        result = db.execute_query(ops_query, (yesterday, yesterday, yesterday, day_before_yesterday, yesterday))
         
         if not result or len(result) == 0:
             # Fallback if query returns no results
@@ -646,7 +952,7 @@ def ops_status():
         sync_query = """
             SELECT MAX(created_at) as last_sync
             FROM rpa_data.bai_rabobank_transactions
-            WHERE created_at::date = CURRENT_DATE
+            WHERE created_at >= CURRENT_DATE
         """
         sync_data = db.execute_query(sync_query)
         last_sync = sync_data[0]['last_sync'] if sync_data and sync_data[0]['last_sync'] else None
@@ -672,7 +978,8 @@ def ops_status():
                 MAX(timestamp) as last_created
             FROM rpa_data.bai_exports_audit_log
             WHERE destination = 'Autobank'
-                AND timestamp::date = CURRENT_DATE - INTERVAL '1 day'
+                AND timestamp >= CURRENT_DATE - INTERVAL '1 day'
+                AND timestamp < CURRENT_DATE
         """
         autobank_data = db.execute_query(autobank_status_query)
         
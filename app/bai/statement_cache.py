@@ -0,0 +1,145 @@
+"""
+Content-addressed on-disk cache for rendered PDF bank statements
+Files are named after a hash of (iban, date_from, date_to, data fingerprint,
+layout version), so corrected or late-arriving data simply produces a new key
+and stale files age out through size-bounded LRU eviction (by mtime).
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from config.config import Config
+
+# Bump when the PDF layout changes so previously rendered statements are not served
+STATEMENT_LAYOUT_VERSION = 2
+
+
+class StatementCache:
+    """Directory of rendered statement PDFs bounded by total size"""
+
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024, enabled=True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, iban, date_from, date_to, fingerprint):
+        """Content address for a statement"""
+        payload = json.dumps(
+            [STATEMENT_LAYOUT_VERSION, iban, date_from, date_to, fingerprint],
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, f'{key}.pdf')
+
+    def get(self, key):
+        """Path of the cached PDF for key, or None"""
+        if not self.enabled:
+            return None
+        path = self.path(key)
+        try:
+            os.utime(path)  # mark as recently used for eviction
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def open(self, key):
+        """Open the cached PDF for key for reading, or None
+
+        An open file stays readable when another worker evicts it before it is sent.
+        """
+        path = self.get(key)
+        if path is None:
+            return None
+        try:
+            return open(path, 'rb')
+        except OSError:
+            return None
+
+    def put(self, key, render):
+        """Render a statement into the cache and return its path
+
+        Args:
+            render (callable): Called with a writable binary file object
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as output:
+                render(output)
+            path = self.path(key)
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep=None):
+        """Remove least recently used PDFs until the directory fits max_bytes
+
+        The file at `keep` (the one just written) is never removed, even when
+        it alone exceeds max_bytes.
+        """
+        with self._lock:
+            try:
+                files = [entry for entry in os.scandir(self.directory) if entry.name.endswith('.pdf')]
+            except OSError:
+                return 0
+            stats = []
+            for entry in files:
+                try:
+                    stats.append((entry.stat().st_mtime, entry.stat().st_size, entry.path))
+                except OSError:
+                    pass
+            total = sum(size for _, size, _ in stats)
+            removed = 0
+            for _, size, path in sorted(stats):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                    removed += 1
+                except OSError as e:
+                    print(f"Warning: could not evict cached statement {path}: {e}")
+            self.evictions += removed
+            return removed
+
+    def stats(self):
+        try:
+            sizes = [entry.stat().st_size for entry in os.scandir(self.directory) if entry.name.endswith('.pdf')]
+        except OSError:
+            sizes = []
+        return {
+            'enabled': self.enabled,
+            'files': len(sizes),
+            'bytes': sum(sizes),
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+# Module-level cache shared by all request threads in this process
+statement_cache = StatementCache(
+    Config.STATEMENT_CACHE_DIR,
+    max_bytes=Config.STATEMENT_CACHE_MAX_MB * 1024 * 1024,
+    enabled=Config.STATEMENT_CACHE_ENABLED
+)
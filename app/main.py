@@ -19,8 +19,18 @@ login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'shared.login'
 
+# Per-endpoint latency, DB time, template time and response size (app.shared.metrics)
+from app.shared.metrics import request_metrics
+request_metrics.init_app(app)
+
+# Admin-only request profiling with ?_profile=cprofile|sampling (app.shared.profiler)
+from app.shared.profiler import request_profiler
+request_profiler.init_app(app)
+
 # Import and register blueprints
 from app.shared.auth import shared_bp, User
+from app.shared import perf_routes  # noqa: F401 - registers admin perf routes on shared_bp
+from app.shared.cache import query_cache
 from app.bai.routes import bai_bp
 from app.recon.routes import recon_bp
 
@@ -28,8 +38,25 @@ app.register_blueprint(shared_bp)
 app.register_blueprint(bai_bp, url_prefix='/bai')
 app.register_blueprint(recon_bp, url_prefix='/recon')
 
+# Cross-process cache invalidation via PostgreSQL LISTEN/NOTIFY
+if Config.QUERY_CACHE_ENABLED and Config.QUERY_CACHE_NOTIFY_CHANNEL:
+    query_cache.listen('shared', Config.QUERY_CACHE_NOTIFY_CHANNEL)
+    query_cache.listen('bai', Config.QUERY_CACHE_NOTIFY_CHANNEL)
+    query_cache.listen('recon', Config.QUERY_CACHE_NOTIFY_CHANNEL)
+
+# Scheduled jobs (daily bai_exports run, audit log partitions); only started when SCHEDULER_ENABLED
+from app.shared.scheduler import start_scheduler
+from app.bai.exports.scheduler import schedule_daily_exports
+from database.audit_log_maintenance import schedule_maintenance as schedule_audit_log_maintenance
+from database.partition_manager import schedule_maintenance as schedule_partition_maintenance
+schedule_daily_exports()
+schedule_audit_log_maintenance()
+schedule_partition_maintenance()
+start_scheduler()
+
 @login_manager.user_loader
 def load_user(user_id):
+    # User.get is served from the query cache (Config.USER_CACHE_TTL)
     return User.get(user_id)
 
 # Root route - redirect to appropriate dashboard
@@ -4,6 +4,7 @@ import psycopg2
 from psycopg2.extras import execute_batch
 from datetime import datetime
 from config.config import Config
+from app.shared.cache import query_cache
 from typing import Dict, List, Tuple
 import re
 
@@ -250,6 +251,9 @@ class WorldlineCSVImporter:
             conn.rollback()
             print(f"Import failed: {str(e)}")
         
+        if imported:
+            self.invalidate_caches()
+        
         duration = time.time() - start_time
         return {
             'imported': imported,
@@ -258,6 +262,21 @@ class WorldlineCSVImporter:
             'duration': duration
         }
     
+    def invalidate_caches(self):
+        """Drop cached Recon query results in this process and notify other workers"""
+        query_cache.invalidate('recon')
+        channel = Config.QUERY_CACHE_NOTIFY_CHANNEL
+        if not channel:
+            return
+        conn = self.connect()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_notify(%s, 'recon')", (channel,))
+                conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"Warning: Could not send cache invalidation notify: {e}")
+    
     def log_import(self, filename: str, filesize: int, total_records: int, 
                    imported: int, failed: int, duplicates: int, status: str, 
                    error_msg: str = None, username: str = None):
@@ -1,8 +1,15 @@
+import time
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from config.config import Config
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
+from app.shared.cache import query_cache
+from app.shared.metrics import calling_method, query_metrics
+from app.shared.rows import ROW_MODES, convert_rows
+
+# Cache lifetime (seconds) for dashboard aggregates; imports invalidate the 'recon' tag
+DASHBOARD_CACHE_TTL = 600
 
 class ReconDatabase:
     """Database connection and query management for Recon module"""
@@ -25,16 +32,50 @@ class ReconDatabase:
         if self.conn and not self.conn.closed:
             self.conn.close()
     
-    def execute_query(self, query, params=None):
-        """Execute SELECT query and return results"""
+    def execute_query(self, query, params=None, cache_ttl=None, cache_tags=(), row_mode='dict'):
+        """Execute SELECT query and return results
+        
+        Args:
+            cache_ttl (int): Opt into the process-wide query cache for this many seconds
+            cache_tags (tuple): Extra invalidation tags ('recon' is always added)
+            row_mode (str): 'dict', 'tuple' or 'columns' (see app.shared.rows)
+        
+        Executions are recorded in query_metrics under the calling method's name.
+        """
+        if row_mode not in ROW_MODES:
+            raise ValueError(f"Unknown row mode: {row_mode}")
+        method = calling_method()
+        if cache_ttl:
+            key = query_cache.make_key('recon', query, params)
+            if row_mode != 'dict':
+                key += (row_mode,)
+            return query_cache.get_or_load(
+                key,
+                lambda: self._fetch_all(query, params, method, row_mode),
+                ttl=cache_ttl,
+                tags=('recon',) + tuple(cache_tags)
+            )
+        return self._fetch_all(query, params, method, row_mode)
+    
+    def _fetch_all(self, query, params=None, method='_fetch_all', row_mode='dict'):
+        """Run query on the connection and fetch all rows"""
         conn = self.connect()
+        started = time.perf_counter()
         try:
-            with conn.cursor() as cur:
-                cur.execute(query, params)
-                return cur.fetchall()
+            if row_mode == 'dict':
+                with conn.cursor() as cur:
+                    cur.execute(query, params)
+                    rows = cur.fetchall()
+            else:
+                with conn.cursor(cursor_factory=psycopg2.extensions.cursor) as cur:
+                    cur.execute(query, params)
+                    rows = convert_rows(cur.fetchall(), cur.description, row_mode)
         except Exception as e:
             conn.rollback()
+            query_metrics.record('recon', method, query, params, time.perf_counter() - started, error=e)
             raise e
+        query_metrics.record('recon', method, query, params, time.perf_counter() - started, rows=rows)
+        return rows
     
     # =====================================================
     # WORLDLINE PAYMENTS QUERIES
@@ -43,7 +84,7 @@ class ReconDatabase:
     def get_worldline_payments(self, start_date=None, end_date=None, brand=None, 
                                merchref=None, ref=None, status=None, limit=100, offset=0,
                                payment_id=None, order=None, owner=None, country=None, 
-                               amount_min=None, amount_max=None):
+                               amount_min=None, amount_max=None, row_mode='dict'):
         """Get Worldline payments with filters and pagination"""
         conditions = []
         params = []
@@ -111,7 +152,7 @@ class ReconDatabase:
         """
         params.extend([limit, offset])
         
-        return self.execute_query(query, tuple(params))
+        return self.execute_query(query, tuple(params), row_mode=row_mode)
     
     def get_worldline_payment_count(self, start_date=None, end_date=None, brand=None, 
                                     merchref=None, ref=None, status=None,
@@ -196,7 +237,7 @@ class ReconDatabase:
             FROM {self.schema}.recon_worldline_payments
             WHERE paydate >= CURRENT_DATE - INTERVAL '%s days'
         """
-        return self.execute_query(query, (days,))[0]
+        return self.execute_query(query, (days,), cache_ttl=DASHBOARD_CACHE_TTL)[0]
     
     def get_daily_volume(self, days=30):
         """Get daily transaction volume"""
@@ -213,7 +254,7 @@ class ReconDatabase:
             GROUP BY paydate
             ORDER BY paydate DESC
         """
-        return self.execute_query(query, (days,))
+        return self.execute_query(query, (days,), cache_ttl=DASHBOARD_CACHE_TTL)
     
     def get_brand_breakdown(self, days=30):
         """Get transaction breakdown by brand"""
@@ -230,7 +271,7 @@ class ReconDatabase:
             GROUP BY brand
             ORDER BY transaction_count DESC
         """
-        return self.execute_query(query, (days,))
+        return self.execute_query(query, (days,), cache_ttl=DASHBOARD_CACHE_TTL)
     
     def get_merchant_breakdown(self, days=30, limit=20):
         """Get top merchants by transaction volume"""
@@ -249,7 +290,7 @@ class ReconDatabase:
             ORDER BY transaction_count DESC
             LIMIT %s
         """
-        return self.execute_query(query, (days, limit))
+        return self.execute_query(query, (days, limit), cache_ttl=DASHBOARD_CACHE_TTL)
     
     def get_country_breakdown(self, days=30):
         """Get transaction breakdown by country"""
@@ -265,7 +306,7 @@ class ReconDatabase:
             GROUP BY country
             ORDER BY transaction_count DESC
         """
-        return self.execute_query(query, (days,))
+        return self.execute_query(query, (days,), cache_ttl=DASHBOARD_CACHE_TTL)
     
     def get_payment_details(self, payment_id: str, paydate: str):
         """Get full details of a single payment by ID and paydate"""
@@ -278,7 +319,7 @@ class ReconDatabase:
         result = self.execute_query(query, (payment_id, paydate))
         return result[0] if result else None
     
-    def search_payments(self, search_term: str, limit=50):
+    def search_payments(self, search_term: str, limit=50, row_mode='dict'):
         """Search payments by multiple fields"""
         query = f"""
             SELECT 
@@ -301,7 +342,7 @@ class ReconDatabase:
                  search_pattern, search_pattern, search_pattern, 
                  search_pattern, limit)
         
-        return self.execute_query(query, params)
+        return self.execute_query(query, params, row_mode=row_mode)
     
     # =====================================================
     # RECONCILIATION QUERIES
@@ -456,7 +497,7 @@ class ReconDatabase:
                 COUNT(DISTINCT paydate) as unique_dates
             FROM {self.schema}.recon_worldline_payments
         """
-        return self.execute_query(query)[0]
+        return self.execute_query(query, cache_ttl=DASHBOARD_CACHE_TTL)[0]
 
 
 # Singleton instance (not used in CashApp - use instance in routes.py instead)
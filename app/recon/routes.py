@@ -170,11 +170,11 @@ def payments():
         # Search takes precedence
         if search:
             # Try searching as-is first, then also try with underscore replaced by dot
-            payments_list = db.search_payments(search, limit=100)
+            payments_list = db.search_payments(search, limit=100, row_mode='tuple')
             if not payments_list and '_' in search:
                 # Also try with dot instead of underscore
                 search_alt = search.replace('_', '.')
-                payments_list = db.search_payments(search_alt, limit=100)
+                payments_list = db.search_payments(search_alt, limit=100, row_mode='tuple')
             total_count = len(payments_list)
         else:
             # Calculate offset
@@ -195,7 +195,8 @@ def payments():
                 amount_min=amount_min,
                 amount_max=amount_max,
                 limit=per_page,
-                offset=offset
+                offset=offset,
+                row_mode='tuple'
             )
             
             # Get total count for pagination
@@ -4,9 +4,10 @@ Handles login, logout, and user management
 """
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import UserMixin, login_user, logout_user, login_required, current_user
-import bcrypt
 from config.config import Config
 from app.shared.decorators import require_admin
+from app.shared.cache import query_cache
+from app.shared.passwords import password_hasher, LoginThrottledError
 
 # Create shared blueprint
 shared_bp = Blueprint('shared', __name__, template_folder='templates')
@@ -31,7 +32,9 @@ class User(UserMixin):
         try:
             result = shared_db.execute_query(
                 "SELECT id, username, email, full_name, is_admin, has_bai_access, has_recon_access FROM rpa_data.cashapp_users WHERE username = %s AND is_active = TRUE",
-                (username,)
+                (username,),
+                cache_ttl=Config.USER_CACHE_TTL,
+                cache_tags=('users',)
             )
             if result:
                 user_data = result[0]
@@ -62,13 +65,41 @@ class User(UserMixin):
             )
             if result and result[0]['is_active']:
                 password_hash = result[0]['password_hash']
-                return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+                valid = password_hasher.verify(password, password_hash)
+                if valid and password_hasher.needs_rehash(password_hash):
+                    password_hasher.rehash(password, lambda new_hash: User._store_password_hash(username, new_hash))
+                return valid
+        except LoginThrottledError:
+            raise
         except:
             pass
 
         env_password = getattr(Config, 'ADMIN_PASSWORD', 'admin')
         return username == getattr(Config, 'ADMIN_USERNAME', 'admin') and password == env_password
 
+    @staticmethod
+    def _store_password_hash(username, password_hash):
+        '''Store a password hash upgraded to the configured bcrypt cost factor'''
+        from app.shared.database import shared_db
+        try:
+            shared_db.execute_update(
+                'UPDATE rpa_data.cashapp_users SET password_hash = %s WHERE username = %s',
+                (password_hash, username)
+            )
+        except Exception as e:
+            print(f"Warning: Could not rehash password for {username}: {e}")
+
+    @staticmethod
+    def invalidate_cache():
+        '''Drop cached user/permission rows in this worker and notify the others'''
+        from app.shared.database import shared_db
+        query_cache.invalidate('users')
+        if Config.QUERY_CACHE_NOTIFY_CHANNEL:
+            try:
+                shared_db.execute_update("SELECT pg_notify(%s, 'users')", (Config.QUERY_CACHE_NOTIFY_CHANNEL,))
+            except Exception as e:
+                print(f"Warning: Could not send user cache invalidation notify: {e}")
+
     @staticmethod
     def get_all_users():
         """Get all users from database"""
@@ -86,12 +117,13 @@ class User(UserMixin):
     def create_user(username, password, email=None, full_name=None, is_admin=False, has_bai_access=True, has_recon_access=False):
         '''Create new user in database'''
         from app.shared.database import shared_db
-        password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        password_hash = password_hasher.hash(password)
         shared_db.execute_update(
             '''INSERT INTO rpa_data.cashapp_users (username, password_hash, email, full_name, is_admin, has_bai_access, has_recon_access, is_active) VALUES (%s, %s, %s, %s, %s, %s, %s, TRUE)''',
             (username, password_hash, email, full_name, is_admin, has_bai_access, has_recon_access),
             
         )
+        User.invalidate_cache()
 
     @staticmethod
     def update_user(user_id, email=None, full_name=None, is_admin=False, has_bai_access=True, has_recon_access=False, is_active=True):
@@ -102,6 +134,7 @@ class User(UserMixin):
             (email, full_name, is_admin, has_bai_access, has_recon_access, is_active, user_id),
             
         )
+        User.invalidate_cache()
 
     @staticmethod
     def delete_user(user_id):
@@ -112,17 +145,19 @@ class User(UserMixin):
             (user_id,),
             
         )
+        User.invalidate_cache()
 
     @staticmethod
     def change_password(user_id, new_password):
         '''Change user password'''
         from app.shared.database import shared_db
-        password_hash = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        password_hash = password_hasher.hash(new_password)
         shared_db.execute_update(
             'UPDATE rpa_data.cashapp_users SET password_hash = %s WHERE id = %s',
             (password_hash, user_id),
             
         )
+        User.invalidate_cache()
 
 
 @shared_bp.route('/login', methods=['GET', 'POST'])
@@ -132,7 +167,13 @@ def login():
         username = request.form.get('username')
         password = request.form.get('password')
 
-        if User.verify_password(username, password):
+        try:
+            valid = User.verify_password(username, password)
+        except LoginThrottledError:
+            flash('Too many login attempts at the moment, please try again shortly.', 'warning')
+            return render_template('login.html'), 429
+
+        if valid:
             user = User.get(username)
             if user:
                 login_user(user, remember=True)
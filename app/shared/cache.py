@@ -0,0 +1,182 @@
+"""
+Process-wide query result cache for CashApp
+Caches SELECT results keyed on (database, query, params) with a per-query TTL,
+LRU eviction and a memory cap. Entries carry tags so the importer or a
+PostgreSQL NOTIFY can invalidate them.
+"""
+import select
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import psycopg2
+from psycopg2 import sql
+
+from config.config import Config
+
+
+def _estimate_size(value):
+    """Rough in-memory size of a query result (list of rows) in bytes"""
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        for row in value:
+            size += sys.getsizeof(row)
+            values = row.values() if isinstance(row, dict) else row
+            try:
+                for item in values:
+                    size += sys.getsizeof(item)
+            except TypeError:
+                pass
+    return size
+
+
+class _CacheEntry:
+    __slots__ = ('value', 'expires_at', 'tags', 'size')
+
+    def __init__(self, value, expires_at, tags, size):
+        self.value = value
+        self.expires_at = expires_at
+        self.tags = tags
+        self.size = size
+
+
+class QueryCache:
+    """Thread-safe LRU cache with per-entry TTL, memory cap and tag invalidation"""
+
+    def __init__(self, max_entries=1000, max_bytes=64 * 1024 * 1024, default_ttl=300, enabled=True):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(namespace, query, params=None):
+        """Build a cache key from the database namespace, query text and params"""
+        return (namespace, ' '.join(query.split()), repr(params))
+
+    def get(self, key):
+        """Return (hit, value) for key, dropping the entry if it has expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, entry.value
+                self._remove(key)
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value, ttl=None, tags=()):
+        """Store value under key for ttl seconds"""
+        if not self.enabled:
+            return
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.default_ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _CacheEntry(value, expires_at, frozenset(tags), size)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader, ttl=None, tags=()):
+        """Return the cached value for key, calling loader() on a miss"""
+        if not self.enabled:
+            return loader()
+        hit, value = self.get(key)
+        if hit:
+            return value
+        value = loader()
+        self.set(key, value, ttl=ttl, tags=tags)
+        return value
+
+    def invalidate(self, tag=None):
+        """Drop all entries carrying tag, or everything when tag is None/'*'"""
+        with self._lock:
+            if tag in (None, '', '*'):
+                removed = len(self._entries)
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                keys = [key for key, entry in self._entries.items() if tag in entry.tags]
+                for key in keys:
+                    self._remove(key)
+                removed = len(keys)
+            self.invalidations += 1
+        return removed
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def listen(self, db_type, channel):
+        """Start a daemon thread that invalidates tags received via LISTEN/NOTIFY
+
+        The NOTIFY payload is the tag to invalidate ('bai', 'recon', 'users', ...);
+        an empty payload or '*' clears the whole cache.
+        """
+        def _run():
+            while True:
+                conn = None
+                try:
+                    conn = psycopg2.connect(Config.get_db_connection_string(db_type))
+                    conn.autocommit = True
+                    with conn.cursor() as cur:
+                        cur.execute(sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+                    while True:
+                        if select.select([conn], [], [], 60) == ([], [], []):
+                            continue
+                        conn.poll()
+                        while conn.notifies:
+                            notify = conn.notifies.pop(0)
+                            self.invalidate(notify.payload or None)
+                except Exception as e:
+                    print(f"Warning: cache NOTIFY listener on '{db_type}' failed: {e}")
+                    time.sleep(30)
+                finally:
+                    if conn is not None and not conn.closed:
+                        conn.close()
+
+        thread = threading.Thread(target=_run, name=f'cache-listen-{db_type}', daemon=True)
+        thread.start()
+        return thread
+
+
+# Module-level cache shared by all Database instances in this process
+query_cache = QueryCache(
+    max_entries=Config.QUERY_CACHE_MAX_ENTRIES,
+    max_bytes=Config.QUERY_CACHE_MAX_MB * 1024 * 1024,
+    default_ttl=Config.QUERY_CACHE_DEFAULT_TTL,
+    enabled=Config.QUERY_CACHE_ENABLED
+)
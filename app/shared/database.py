@@ -1,7 +1,27 @@
+import itertools
+import re
+import time
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 from config.config import Config
 from datetime import datetime, timedelta
+from app.shared.cache import query_cache
+from app.shared.metrics import calling_method, query_metrics
+from app.shared.rows import ROW_MODES, convert_rows
+from app.shared.singleflight import single_flight
+
+# Cache lifetimes (seconds) for queries that opt into the query cache
+DAILY_DATA_CACHE_TTL = 300       # BAI data, refreshed by the daily ingest
+REFERENCE_DATA_CACHE_TTL = 900   # Account lists and dropdown values
+
+# Upper bound for EXPLAIN ANALYZE of a logged slow query (milliseconds)
+EXPLAIN_TIMEOUT_MS = 120000
+
+# Only read-only statements are safe to coalesce across callers
+_READ_QUERY = re.compile(r'^\s*(SELECT|WITH)\b', re.IGNORECASE)
+
+# Unique names for server-side (streaming) cursors
+_STREAM_IDS = itertools.count()
 
 class Database:
     """Database connection and query management"""
@@ -29,26 +49,106 @@ class Database:
         if self.conn and not self.conn.closed:
             self.conn.close()
     
-    def execute_query(self, query, params=None):
-        """Execute SELECT query and return results"""
+    def execute_query(self, query, params=None, cache_ttl=None, cache_tags=(), row_mode='dict'):
+        """Execute SELECT query and return results
+        
+        Args:
+            cache_ttl (int): Opt into the process-wide query cache for this many seconds
+            cache_tags (tuple): Extra invalidation tags (the db_type is always added)
+            row_mode (str): 'dict' (RealDictRow per row), 'tuple' (compact Row
+                tuples) or 'columns' (one ColumnBatch), see app.shared.rows
+        
+        Identical concurrent SELECTs are coalesced into one execution whose
+        result list is shared by all callers, so callers must not mutate it.
+        Executions are recorded in query_metrics under the calling method's name.
+        """
+        if row_mode not in ROW_MODES:
+            raise ValueError(f"Unknown row mode: {row_mode}")
+        method = calling_method()
+        key = query_cache.make_key(self.db_type, query, params)
+        if row_mode != 'dict':
+            key += (row_mode,)
+        if Config.SINGLE_FLIGHT_ENABLED and _READ_QUERY.match(query):
+            loader = lambda: single_flight.do(key, lambda: self._fetch_all(query, params, method, row_mode))
+        else:
+            loader = lambda: self._fetch_all(query, params, method, row_mode)
+        if cache_ttl:
+            return query_cache.get_or_load(
+                key,
+                loader,
+                ttl=cache_ttl,
+                tags=(self.db_type,) + tuple(cache_tags)
+            )
+        return loader()
+    
+    def _fetch_all(self, query, params=None, method='_fetch_all', row_mode='dict'):
+        """Run query on the connection and fetch all rows"""
+        conn = self.connect()
+        started = time.perf_counter()
+        try:
+            if row_mode == 'dict':
+                with conn.cursor() as cur:
+                    cur.execute(query, params)
+                    rows = cur.fetchall()
+            else:
+                with conn.cursor(cursor_factory=psycopg2.extensions.cursor) as cur:
+                    cur.execute(query, params)
+                    rows = convert_rows(cur.fetchall(), cur.description, row_mode)
+        except Exception as e:
+            conn.rollback()
+            query_metrics.record(self.db_type, method, query, params, time.perf_counter() - started, error=e)
+            raise e
+        query_metrics.record(self.db_type, method, query, params, time.perf_counter() - started, rows=rows)
+        return rows
+    
+    def explain(self, query, params=None):
+        """EXPLAIN (ANALYZE, BUFFERS) a read-only query and return the plan lines
+        
+        ANALYZE really executes the query, so only SELECT/WITH statements are
+        accepted and the transaction is always rolled back.
+        """
+        if not _READ_QUERY.match(query):
+            raise ValueError("Only SELECT queries can be explained")
         conn = self.connect()
         try:
             with conn.cursor() as cur:
+                cur.execute("SET LOCAL statement_timeout = %s", (EXPLAIN_TIMEOUT_MS,))
+                cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + query, params)
+                return [row['QUERY PLAN'] for row in cur.fetchall()]
+        finally:
+            conn.rollback()
+    
+    def iter_query(self, query, params=None, itersize=2000):
+        """Stream SELECT rows through a server-side cursor
+        
+        Rows are fetched itersize at a time instead of all at once; results
+        are not cached or coalesced.
+        """
+        conn = self.connect()
+        try:
+            with conn.cursor(name=f'cashapp_stream_{next(_STREAM_IDS)}') as cur:
+                cur.itersize = itersize
                 cur.execute(query, params)
-                return cur.fetchall()
+                for row in cur:
+                    yield row
         except Exception as e:
             conn.rollback()
             raise e
     
     def execute_update(self, query, params=None):
         """Execute INSERT/UPDATE/DELETE query without fetching results"""
+        method = calling_method()
         conn = self.connect()
+        started = time.perf_counter()
         try:
             with conn.cursor() as cur:
                 cur.execute(query, params)
                 conn.commit()
+                query_metrics.record(self.db_type, method, query, params,
+                                     time.perf_counter() - started, row_count=cur.rowcount)
         except Exception as e:
             conn.rollback()
+            query_metrics.record(self.db_type, method, query, params, time.perf_counter() - started, error=e)
             raise e
     
     def get_transaction_summary(self, days=7, iban_filter=None):
@@ -104,7 +204,7 @@ class Database:
                 AND iban = %s
             ORDER BY reference_date DESC, iban, balance_type
             """
-            return self.execute_query(query, (days, iban_filter))
+            return self.execute_query(query, (days, iban_filter), cache_ttl=DAILY_DATA_CACHE_TTL)
         else:
             query = """
             SELECT 
@@ -119,7 +219,7 @@ class Database:
                 AND reference_date IS NOT NULL
             ORDER BY reference_date DESC, iban, balance_type
             """
-            return self.execute_query(query, (days,))
+            return self.execute_query(query, (days,), cache_ttl=DAILY_DATA_CACHE_TTL)
     
     def get_account_list(self):
         """Get list of all accounts"""
@@ -128,7 +228,7 @@ class Database:
         FROM rpa_data.bai_rabobank_transactions
         ORDER BY iban
         """
-        return self.execute_query(query)
+        return self.execute_query(query, cache_ttl=REFERENCE_DATA_CACHE_TTL)
     
     def get_transaction_types(self, days=7, iban_filter=None):
         """Get transaction type breakdown"""
@@ -145,7 +245,7 @@ class Database:
             GROUP BY rabo_detailed_transaction_type
             ORDER BY count DESC
             """
-            return self.execute_query(query, (days, iban_filter))
+            return self.execute_query(query, (days, iban_filter), cache_ttl=DAILY_DATA_CACHE_TTL)
         else:
             query = """
             SELECT 
@@ -158,7 +258,7 @@ class Database:
             GROUP BY rabo_detailed_transaction_type
             ORDER BY count DESC
             """
-            return self.execute_query(query, (days,))
+            return self.execute_query(query, (days,), cache_ttl=DAILY_DATA_CACHE_TTL)
     
     def get_data_quality_status(self, days=7):
         """Get data quality status per day/IBAN (for dashboard overview)"""
@@ -178,6 +278,7 @@ class Database:
                 SELECT DISTINCT iban FROM rpa_data.bai_rabobank_transactions
                 UNION
                 SELECT DISTINCT iban FROM rpa_data.bai_api_audit_log
+                WHERE "timestamp" >= CURRENT_DATE - INTERVAL '1 day' - INTERVAL '%s days'
             ) i
         ),
         date_iban_grid AS (
@@ -187,15 +288,18 @@ class Database:
         ),
         api_status AS (
             SELECT 
-                l.closingdate::date as day,
+                l.closingdate as day,
                 l.iban,
                 MAX(CASE WHEN l.endpoint = 'balances' AND l.response_status = 200 THEN 'OK' ELSE 'NOK' END) as balance_status,
                 MAX(CASE WHEN l.endpoint = 'transactions' AND l.response_status = 200 THEN 'OK' ELSE 'NOK' END) as transaction_status
             FROM rpa_data.bai_api_audit_log l
             WHERE l.closingdate >= CURRENT_DATE - INTERVAL '1 day' - INTERVAL '%s days' + INTERVAL '1 day'
                 AND l.closingdate < CURRENT_DATE
+                -- Closing dates are fetched once the day has started (plus a day of time zone
+                -- slack), so older timestamp partitions are pruned
+                AND l."timestamp" >= CURRENT_DATE - INTERVAL '1 day' - INTERVAL '%s days'
                 AND l.endpoint IN ('balances', 'transactions')
-            GROUP BY l.closingdate::date, l.iban
+            GROUP BY l.closingdate, l.iban
         ),
         transaction_count AS (
             SELECT 
@@ -224,7 +328,7 @@ class Database:
         LEFT JOIN transaction_count tc ON dig.day = tc.day AND dig.iban = tc.iban
         ORDER BY dig.day DESC, dig.iban
         """
-        return self.execute_query(query, (days, days, days))
+        return self.execute_query(query, (days, days, days, days, days))
     
     def get_daily_reconciliation(self, target_date=None, iban_filter=None, days=7):
         """Get daily reconciliation data (opening + transactions = closing)"""
@@ -307,8 +411,8 @@ class Database:
         """
         return self.execute_query(query, (days,))
     
-    def get_detailed_reconciliation(self, days=7, iban_filter=None):
-        """Get detailed balance/transaction reconciliation report"""
+    def _detailed_reconciliation_query(self, days, iban_filter):
+        """SQL and params of the detailed reconciliation rows (unordered)"""
         # Ensure empty string becomes None
         if iban_filter == '':
             iban_filter = None
@@ -352,7 +456,7 @@ class Database:
         ),
         audit_pivot AS (
             SELECT
-                l.closingdate::date AS day,
+                l.closingdate AS day,
                 l.iban,
                 CASE WHEN bool_or(l.response_status = 200) FILTER (WHERE l.endpoint = 'balances') 
                     THEN 'OK' ELSE 'MISSING' END AS balances_status,
@@ -362,12 +466,15 @@ class Database:
             CROSS JOIN range r
             CROSS JOIN params p
             WHERE l.closingdate BETWEEN r.start_date AND r.end_date
+                -- Closing dates are fetched once the day has started (plus a day of time zone
+                -- slack), so older timestamp partitions are pruned
+                AND l."timestamp" >= (SELECT start_date FROM range) - INTERVAL '1 day'
                 AND l.endpoint IN ('balances','transactions')
                 AND (
                     (SELECT cardinality(p.ibans)) = 0
                     OR l.iban = ANY(p.ibans)
                 )
-            GROUP BY l.closingdate::date, l.iban
+            GROUP BY l.closingdate, l.iban
         ),
         daily_closing AS (
             SELECT
@@ -379,7 +486,7 @@ class Database:
             FROM rpa_data.bai_rabobank_balances b
             CROSS JOIN range r
             CROSS JOIN params p
-            WHERE LOWER(b.balance_type) IN ('closingbooked', 'closing_booked')
+            WHERE b.balance_kind = 'closing_booked'
                 AND b.reference_date IS NOT NULL
                 AND b.reference_date BETWEEN r.start_date AND r.end_date
                 AND (
@@ -397,7 +504,7 @@ class Database:
             FROM rpa_data.bai_rabobank_balances b
             CROSS JOIN range r
             CROSS JOIN params p
-            WHERE LOWER(b.balance_type) IN ('closingbooked', 'closing_booked')
+            WHERE b.balance_kind = 'closing_booked'
                 AND b.reference_date IS NOT NULL
                 AND b.reference_date BETWEEN r.start_date - INTERVAL '1 day' 
                     AND r.end_date - INTERVAL '1 day'
@@ -460,11 +567,175 @@ class Database:
         LEFT JOIN daily_closing c ON c.iban = i.iban AND c.day = r.day
         LEFT JOIN daily_transactions dt ON dt.iban = i.iban AND dt.booking_date = r.day
         LEFT JOIN rpa_data.bai_rabobank_account_info ai ON ai.iban = i.iban
-        ORDER BY i.iban, r.day DESC
         """
-        return self.execute_query(query, (days, iban_filter, iban_filter, iban_filter))
+        return query, [days, iban_filter, iban_filter, iban_filter]
+
+    def _detailed_reconciliation_rows(self, days, iban_filter, status):
+        """Detailed reconciliation query filtered on status, ordered as the report"""
+        base, params = self._detailed_reconciliation_query(days, iban_filter)
+        where = ""
+        if status == 'MISSING':
+            where = "WHERE audit_status LIKE 'MISSING%%'"
+        elif status:
+            where = "WHERE audit_status = %s"
+            params.append(status)
+        query = f"""
+        SELECT * FROM ({base}) recon
+        {where}
+        ORDER BY iban, day DESC, opening_balance, closing_balance, audit_status
+        """
+        return query, params
+
+    def get_detailed_reconciliation(self, days=7, iban_filter=None, status=None, limit=None, offset=0,
+                                    row_mode='dict'):
+        """Get detailed balance/transaction reconciliation report
+        
+        Args:
+            status (str): Only rows with this audit_status ('MISSING' matches
+                MISSING_OPENING and MISSING_CLOSING)
+            limit (int): Page size; with offset returns one page of rows
+            row_mode (str): Result rows, see execute_query
+        """
+        query, params = self._detailed_reconciliation_rows(days, iban_filter, status)
+        if limit is not None:
+            query += "LIMIT %s OFFSET %s"
+            params.extend([limit, offset])
+        return self.execute_query(query, tuple(params), row_mode=row_mode)
+
+    def iter_detailed_reconciliation(self, days=7, iban_filter=None, status=None):
+        """Stream every row of the detailed reconciliation report (CSV export)
+        
+        Uses a server-side cursor: call on a Database of its own, not the shared bai_db.
+        """
+        query, params = self._detailed_reconciliation_rows(days, iban_filter, status)
+        return self.iter_query(query, tuple(params))
+
+    def get_reconciliation_summary(self, days=7, iban_filter=None):
+        """Row counts per audit status of the detailed reconciliation report"""
+        base, params = self._detailed_reconciliation_query(days, iban_filter)
+        query = f"""
+        SELECT
+            COUNT(*) AS total_rows,
+            COUNT(*) FILTER (WHERE audit_status = 'PERFECT_MATCH') AS perfect_matches,
+            COUNT(*) FILTER (WHERE audit_status = 'MINOR_DIFF') AS minor_diffs,
+            COUNT(*) FILTER (WHERE audit_status = 'MAJOR_DIFF') AS major_diffs,
+            COUNT(*) FILTER (WHERE audit_status LIKE 'MISSING%%') AS missing_data
+        FROM ({base}) recon
+        """
+        return self.execute_query(query, tuple(params), cache_ttl=DAILY_DATA_CACHE_TTL)
     
-    def get_transaction_details(self, days=7, iban_filter=None, date_from=None, date_to=None, amount_min=None, amount_max=None, counterparty_filter=None):
+    def _iban_condition(self, column, ibans, params):
+        """'column = ANY(%s)' for a non-empty IBAN list, else no condition"""
+        if not ibans:
+            return ""
+        params.append(list(ibans))
+        return f"AND {column} = ANY(%s)"
+
+    # Narrow inputs of the pandas reconciliation engine (app.bai.reconciliation).
+    # Amounts are returned as integer cents so the engine can sum them exactly.
+
+    def get_reconciliation_ibans(self, ibans=None):
+        """All known IBANs (balances, transactions, account info) with owner name"""
+        params = []
+        iban_condition = self._iban_condition("i.iban", ibans, params)
+        query = f"""
+        SELECT i.iban, COALESCE(ai.owner_name, '') AS owner_name
+        FROM (
+            SELECT DISTINCT iban FROM rpa_data.bai_rabobank_balances
+            UNION
+            SELECT DISTINCT iban FROM rpa_data.bai_rabobank_transactions
+            UNION
+            SELECT DISTINCT iban FROM rpa_data.bai_rabobank_account_info
+        ) i
+        LEFT JOIN rpa_data.bai_rabobank_account_info ai ON ai.iban = i.iban
+        WHERE TRUE {iban_condition}
+        ORDER BY i.iban
+        """
+        return self.execute_query(query, tuple(params))
+
+    def get_closing_balance_cents(self, start_date, end_date, ibans=None):
+        """Closing booked balances per IBAN and day, one row per balance record"""
+        params = [start_date, end_date]
+        iban_condition = self._iban_condition("iban", ibans, params)
+        query = f"""
+        SELECT
+            iban,
+            reference_date::date AS day,
+            currency,
+            ROUND(amount * 100)::bigint AS amount_cents
+        FROM rpa_data.bai_rabobank_balances
+        WHERE balance_kind = 'closing_booked'
+            AND reference_date BETWEEN %s AND %s
+            {iban_condition}
+        """
+        return self.execute_query(query, tuple(params))
+
+    def get_balance_minimum_cents(self, start_date, ibans=None):
+        """Lowest balance of any type and number of balance records per IBAN and day"""
+        params = [start_date]
+        iban_condition = self._iban_condition("iban", ibans, params)
+        query = f"""
+        SELECT
+            iban,
+            reference_date::date AS day,
+            ROUND(MIN(amount) * 100)::bigint AS min_cents,
+            COUNT(*) AS balance_count
+        FROM rpa_data.bai_rabobank_balances
+        WHERE reference_date >= %s
+            {iban_condition}
+        GROUP BY iban, reference_date
+        """
+        return self.execute_query(query, tuple(params))
+
+    def get_daily_transaction_cents(self, start_date, end_date=None, ibans=None):
+        """Transaction count and totals per IBAN and booking day"""
+        params = [start_date]
+        end_condition = ""
+        if end_date is not None:
+            end_condition = "AND booking_date <= %s"
+            params.append(end_date)
+        iban_condition = self._iban_condition("iban", ibans, params)
+        query = f"""
+        SELECT
+            iban,
+            booking_date AS day,
+            COUNT(*) AS transaction_count,
+            ROUND(SUM(transaction_amount) * 100)::bigint AS sum_cents,
+            COUNT(*) FILTER (WHERE transaction_amount > 0) AS pos_tx_count,
+            ROUND(COALESCE(SUM(transaction_amount) FILTER (WHERE transaction_amount > 0), 0) * 100)::bigint AS pos_cents,
+            COUNT(*) FILTER (WHERE transaction_amount < 0) AS neg_tx_count,
+            ROUND(COALESCE(SUM(transaction_amount) FILTER (WHERE transaction_amount < 0), 0) * 100)::bigint AS neg_cents,
+            MAX(currency) AS currency
+        FROM rpa_data.bai_rabobank_transactions
+        WHERE booking_date >= %s
+            {end_condition}
+            {iban_condition}
+        GROUP BY iban, booking_date
+        """
+        return self.execute_query(query, tuple(params))
+
+    def get_audit_pivot(self, start_date, end_date, ibans=None):
+        """Balances/transactions API status per IBAN and closing date"""
+        params = [start_date, end_date, start_date]
+        iban_condition = self._iban_condition("iban", ibans, params)
+        query = f"""
+        SELECT
+            closingdate AS day,
+            iban,
+            CASE WHEN bool_or(response_status = 200) FILTER (WHERE endpoint = 'balances')
+                THEN 'OK' ELSE 'MISSING' END AS balances_status,
+            CASE WHEN bool_or(response_status = 200) FILTER (WHERE endpoint = 'transactions')
+                THEN 'OK' ELSE 'MISSING' END AS transactions_status
+        FROM rpa_data.bai_api_audit_log
+        WHERE closingdate BETWEEN %s AND %s
+            AND "timestamp" >= %s::date - INTERVAL '1 day'
+            AND endpoint IN ('balances', 'transactions')
+            {iban_condition}
+        GROUP BY closingdate, iban
+        """
+        return self.execute_query(query, tuple(params))
+    
+    def get_transaction_details(self, days=7, iban_filter=None, date_from=None, date_to=None, amount_min=None, amount_max=None, counterparty_filter=None, row_mode='dict'):
         """Get individual transaction details with filters"""
         params = []
         where_clauses = []
@@ -533,7 +804,7 @@ class Database:
         LIMIT 10000
         """
         
-        return self.execute_query(query, tuple(params))
+        return self.execute_query(query, tuple(params), row_mode=row_mode)
     
     def get_bank_statement_summary(self, iban, date_from, date_to):
         """Get bank statement summary including opening/closing balance and totals"""
@@ -554,7 +825,7 @@ class Database:
                 reference_date
             FROM rpa_data.bai_rabobank_balances
             WHERE iban = %s
-                AND balance_type = 'closingBooked'
+                AND balance_kind = 'closing_booked'
                 AND reference_date = %s::date - INTERVAL '1 day'
             LIMIT 1
         ),
@@ -564,7 +835,7 @@ class Database:
                 reference_date
             FROM rpa_data.bai_rabobank_balances
             WHERE iban = %s
-                AND balance_type = 'closingBooked'
+                AND balance_kind = 'closing_booked'
                 AND reference_date = %s
             LIMIT 1
         ),
@@ -631,6 +902,409 @@ class Database:
         
         return self.execute_query(query, (iban, date_from, date_to))
 
+    def get_bank_statement_fingerprint(self, iban, date_from, date_to):
+        """Cheap fingerprint of the data behind a bank statement
+        
+        Transaction count, sum and latest updated_at for the period plus the
+        opening/closing balance rows; any late-arriving or corrected data
+        changes at least one of these values.
+        """
+        query = """
+        SELECT 
+            t.transaction_count,
+            t.transaction_sum,
+            t.last_updated,
+            b.balance_count,
+            b.balance_sum,
+            b.last_retrieved
+        FROM (
+            SELECT 
+                COUNT(*) as transaction_count,
+                COALESCE(SUM(transaction_amount), 0) as transaction_sum,
+                MAX(updated_at) as last_updated
+            FROM rpa_data.bai_rabobank_transactions
+            WHERE iban = %s
+                AND booking_date >= %s
+                AND booking_date <= %s
+        ) t
+        CROSS JOIN (
+            SELECT 
+                COUNT(*) as balance_count,
+                COALESCE(SUM(amount), 0) as balance_sum,
+                MAX(retrieved_at) as last_retrieved
+            FROM rpa_data.bai_rabobank_balances
+            WHERE iban = %s
+                AND balance_kind = 'closing_booked'
+                AND reference_date IN (%s::date - INTERVAL '1 day', %s::date)
+        ) b
+        """
+        
+        result = self.execute_query(query, (iban, date_from, date_to, iban, date_from, date_to))
+        return dict(result[0]) if result else None
+    
+    def get_bank_statement_summaries(self, ibans, date_from, date_to):
+        """Bank statement summaries for many accounts in one set-based query
+        
+        Args:
+            ibans (list): Accounts to include, or None for every account in account_info
+        
+        Returns the same columns as get_bank_statement_summary, one row per IBAN.
+        """
+        query = """
+        WITH accounts AS (
+            SELECT DISTINCT ON (iban)
+                iban,
+                owner_name,
+                currency
+            FROM rpa_data.bai_rabobank_account_info
+            WHERE (%(ibans)s::text[] IS NULL OR iban = ANY(%(ibans)s::text[]))
+            ORDER BY iban
+        ),
+        statement_totals AS (
+            SELECT 
+                iban,
+                SUM(CASE WHEN transaction_amount < 0 THEN ABS(transaction_amount) ELSE 0 END) as total_debited,
+                SUM(CASE WHEN transaction_amount > 0 THEN transaction_amount ELSE 0 END) as total_credited,
+                COUNT(transaction_amount) as transaction_count
+            FROM rpa_data.bai_rabobank_transactions
+            WHERE iban IN (SELECT iban FROM accounts)
+                AND booking_date >= %(date_from)s
+                AND booking_date <= %(date_to)s
+            GROUP BY iban
+        ),
+        closing_balances AS (
+            SELECT DISTINCT ON (iban, reference_date)
+                iban,
+                reference_date,
+                amount as balance
+            FROM rpa_data.bai_rabobank_balances
+            WHERE iban IN (SELECT iban FROM accounts)
+                AND balance_kind = 'closing_booked'
+                AND reference_date IN (%(date_from)s::date - INTERVAL '1 day', %(date_to)s::date)
+            ORDER BY iban, reference_date
+        )
+        SELECT 
+            a.owner_name as account_name,
+            a.iban,
+            a.currency,
+            COALESCE(ob.balance, 0) as opening_balance,
+            COALESCE(cb.balance, 0) as closing_balance,
+            COALESCE(st.total_debited, 0) as total_debited,
+            COALESCE(st.total_credited, 0) as total_credited,
+            COALESCE(st.transaction_count, 0) as transaction_count,
+            %(statement_date)s as statement_date,
+            %(date_from)s as date_from,
+            %(date_to)s as date_to
+        FROM accounts a
+        LEFT JOIN statement_totals st ON st.iban = a.iban
+        LEFT JOIN closing_balances ob ON ob.iban = a.iban AND ob.reference_date = %(date_from)s::date - INTERVAL '1 day'
+        LEFT JOIN closing_balances cb ON cb.iban = a.iban AND cb.reference_date = %(date_to)s::date
+        ORDER BY a.iban
+        """
+        
+        from datetime import date
+        return self.execute_query(query, {
+            'ibans': list(ibans) if ibans else None,
+            'date_from': date_from,
+            'date_to': date_to,
+            'statement_date': date.today()
+        })
+    
+    def get_bank_statement_transactions_for_ibans(self, ibans, date_from, date_to):
+        """Bank statement transaction details for many accounts in one query
+        
+        Rows carry an extra iban column and are ordered by iban, then entry
+        reference, so they can be grouped per account in a single pass.
+        """
+        query = """
+        SELECT 
+            iban,
+            value_date as valuedate,
+            rabo_detailed_transaction_type,
+            rabo_transaction_type_name,
+            debtor_iban,
+            debtor_name,
+            creditor_iban,
+            creditor_name,
+            remittance_information_unstructured as description,
+            booking_date as processdate,
+            end_to_end_id,
+            transaction_amount
+        FROM rpa_data.bai_rabobank_transactions
+        WHERE iban = ANY(%s)
+            AND booking_date >= %s
+            AND booking_date <= %s
+        ORDER BY iban, entry_reference ASC
+        """
+        
+        return self.execute_query(query, (list(ibans), date_from, date_to))
+
+    def get_export_configs(self, export_format=None):
+        """Enabled export configurations from bai_exports, optionally for one format"""
+        query = """
+        SELECT 
+            id,
+            bank,
+            iban,
+            exportformat,
+            exportformatversion,
+            destination,
+            outputpath,
+            fileprefix,
+            fileextension,
+            includedate,
+            dateformat
+        FROM rpa_data.bai_exports
+        WHERE enabled = true
+            AND (%s::text IS NULL OR UPPER(exportformat) = UPPER(%s::text))
+        ORDER BY iban, id
+        """
+        return self.execute_query(query, (export_format, export_format))
+    
+    def get_export_balances(self, ibans, closing_date):
+        """Opening (closingBooked D-1) and closing (closingBooked D) balance per IBAN for one day"""
+        query = """
+        SELECT 
+            i.iban,
+            COALESCE(ai.owner_name, '') as owner_name,
+            COALESCE(cb.currency, ob.currency, ai.currency, 'EUR') as currency,
+            ob.amount as opening_balance,
+            cb.amount as closing_balance
+        FROM unnest(%(ibans)s::text[]) AS i(iban)
+        LEFT JOIN LATERAL (
+            SELECT owner_name, currency
+            FROM rpa_data.bai_rabobank_account_info
+            WHERE iban = i.iban
+            LIMIT 1
+        ) ai ON true
+        LEFT JOIN LATERAL (
+            SELECT amount, currency
+            FROM rpa_data.bai_rabobank_balances
+            WHERE iban = i.iban
+                AND balance_kind = 'closing_booked'
+                AND reference_date = %(closing_date)s::date - INTERVAL '1 day'
+            ORDER BY retrieved_at DESC
+            LIMIT 1
+        ) ob ON true
+        LEFT JOIN LATERAL (
+            SELECT amount, currency
+            FROM rpa_data.bai_rabobank_balances
+            WHERE iban = i.iban
+                AND balance_kind = 'closing_booked'
+                AND reference_date = %(closing_date)s::date
+            ORDER BY retrieved_at DESC
+            LIMIT 1
+        ) cb ON true
+        ORDER BY i.iban
+        """
+        return self.execute_query(query, {'ibans': list(ibans), 'closing_date': closing_date})
+    
+    def get_export_summaries(self, ibans, closing_date):
+        """One day's CAMT.053 TxsSummry totals per IBAN and transaction code
+
+        One row per (iban, code), codes in booking order of their first entry,
+        with the entry count, absolute and net sum, credit and debit counts and
+        sums, and the amount of entries with a value date after the day
+        (pending). Codes default to 100/586 like camt053.transaction_code.
+        """
+        query = """
+        WITH tx AS (
+            SELECT 
+                iban,
+                transaction_amount,
+                value_date,
+                COALESCE(NULLIF(rabo_detailed_transaction_type::text, ''),
+                         CASE WHEN transaction_amount >= 0 THEN '100' ELSE '586' END) as code,
+                ROW_NUMBER() OVER (PARTITION BY iban ORDER BY rabo_booking_datetime, entry_reference) as seq
+            FROM rpa_data.bai_rabobank_transactions
+            WHERE iban = ANY(%(ibans)s)
+                AND booking_date = %(closing_date)s
+        )
+        SELECT 
+            iban,
+            code,
+            COUNT(*) as entries,
+            SUM(ABS(transaction_amount)) as abs_sum,
+            SUM(transaction_amount) as net_sum,
+            COUNT(*) FILTER (WHERE transaction_amount >= 0) as credit_count,
+            COALESCE(SUM(transaction_amount) FILTER (WHERE transaction_amount >= 0), 0) as credit_sum,
+            COUNT(*) FILTER (WHERE transaction_amount < 0) as debit_count,
+            COALESCE(-SUM(transaction_amount) FILTER (WHERE transaction_amount < 0), 0) as debit_sum,
+            COALESCE(SUM(transaction_amount) FILTER (WHERE value_date > %(closing_date)s::date), 0) as pending
+        FROM tx
+        GROUP BY iban, code
+        ORDER BY iban, MIN(seq)
+        """
+        return self.execute_query(query, {'ibans': list(ibans), 'closing_date': closing_date})
+    
+    def iter_export_transactions(self, ibans, closing_date):
+        """Stream one day's transactions for many IBANs, ordered by IBAN then booking time"""
+        query = """
+        SELECT 
+            iban,
+            booking_date,
+            value_date,
+            entry_reference,
+            transaction_amount,
+            end_to_end_id,
+            batch_entry_reference,
+            instruction_id,
+            payment_information_identification,
+            mandate_id,
+            creditor_id,
+            debtor_iban,
+            debtor_name,
+            creditor_iban,
+            creditor_name,
+            initiating_party_name,
+            remittance_information_unstructured,
+            purpose_code,
+            reason_code,
+            instructed_amount,
+            instructed_amount_currency,
+            currency_exchange_rate,
+            currency_exchange_source_currency,
+            rabo_detailed_transaction_type,
+            acctsvcr_ref,
+            interbank_settlement_date,
+            debtor_agent_bic,
+            creditor_agent_bic
+        FROM rpa_data.bai_rabobank_transactions
+        WHERE iban = ANY(%s)
+            AND booking_date = %s
+        ORDER BY iban, rabo_booking_datetime, entry_reference
+        """
+        return self.iter_query(query, (list(ibans), closing_date))
+    
+    def log_exports(self, rows):
+        """Write rows to bai_exports_audit_log in one statement
+        
+        Args:
+            rows (list): Tuples of (bank, iban, destination, export_format, closingdate,
+                filename, outputfilepath, record_count, success, error_message, caller_id,
+                duration_ms, attempts)
+        """
+        if not rows:
+            return
+        query = """
+        INSERT INTO rpa_data.bai_exports_audit_log 
+        (timestamp, bank, iban, destination, export_format, closingdate, filename, 
+         outputfilepath, record_count, success, error_message, caller_id, duration_ms, attempts)
+        VALUES %s
+        """
+        conn = self.connect()
+        try:
+            with conn.cursor() as cur:
+                execute_values(cur, query, rows,
+                               template="(NOW(), %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)")
+                conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        # Dropdown values read from the audit log (other workers: migration 008)
+        query_cache.invalidate('bai_exports_audit')
+
+    def _export_audit_filters(self, iban=None, export_format=None, date_from=None, date_to=None):
+        """WHERE clause and params for bai_exports_audit_log filters"""
+        conditions = []
+        params = []
+        if iban:
+            conditions.append("iban = %s")
+            params.append(iban)
+        if export_format:
+            conditions.append("export_format = %s")
+            params.append(export_format)
+        if date_from:
+            # A closing date is exported after it has started: the timestamp bound prunes older partitions
+            conditions.append("closingdate >= %s")
+            conditions.append("\"timestamp\" >= %s::date - INTERVAL '1 day'")
+            params.extend([date_from, date_from])
+        if date_to:
+            conditions.append("closingdate <= %s")
+            params.append(date_to)
+        return conditions, params
+    
+    def get_export_audit_page(self, iban=None, export_format=None, date_from=None, date_to=None,
+                              before=None, after=None, limit=50):
+        """One page of bai_exports_audit_log, newest first, by keyset on (timestamp, id)
+        
+        Args:
+            before (tuple): (timestamp, id) of the last row of the previous page (older rows)
+            after (tuple): (timestamp, id) of the first row of the next page (newer rows)
+        
+        Returns:
+            tuple: (rows, has_more) where has_more means another page exists in that direction
+        """
+        conditions, params = self._export_audit_filters(iban, export_format, date_from, date_to)
+        order = "DESC"
+        if before:
+            conditions.append("(timestamp, id) < (%s, %s)")
+            params.extend(before)
+        elif after:
+            conditions.append("(timestamp, id) > (%s, %s)")
+            params.extend(after)
+            order = "ASC"
+        where_clause = " WHERE " + " AND ".join(conditions) if conditions else ""
+        query = f"""
+        SELECT 
+            id,
+            timestamp,
+            bank,
+            iban,
+            destination,
+            export_format,
+            closingdate,
+            filename,
+            outputfilepath,
+            record_count,
+            success,
+            error_message,
+            caller_id,
+            duration_ms,
+            attempts
+        FROM rpa_data.bai_exports_audit_log
+        {where_clause}
+        ORDER BY timestamp {order}, id {order}
+        LIMIT %s
+        """
+        params.append(limit + 1)
+        rows = list(self.execute_query(query, tuple(params)))
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if order == "ASC":
+            rows.reverse()
+        return rows, has_more
+    
+    def get_export_audit_summary(self, iban=None, export_format=None, date_from=None, date_to=None):
+        """Total and per-status counts of the filtered audit log in one pass"""
+        conditions, params = self._export_audit_filters(iban, export_format, date_from, date_to)
+        where_clause = " WHERE " + " AND ".join(conditions) if conditions else ""
+        query = f"""
+        SELECT 
+            COUNT(*) AS total_records,
+            COUNT(*) FILTER (WHERE success = TRUE AND (record_count > 0 OR record_count IS NULL)) AS success_count,
+            COUNT(*) FILTER (WHERE success = TRUE AND record_count = 0) AS success_no_tx_count,
+            COUNT(*) FILTER (WHERE success = FALSE) AS failed_count
+        FROM rpa_data.bai_exports_audit_log
+        {where_clause}
+        """
+        result = self.execute_query(query, tuple(params))
+        return result[0] if result else {
+            'total_records': 0, 'success_count': 0, 'success_no_tx_count': 0, 'failed_count': 0
+        }
+    
+    def get_export_filter_values(self):
+        """IBANs and export formats for audit log filters, from the (cached) bai_exports configs"""
+        query = """
+        SELECT DISTINCT iban, exportformat
+        FROM rpa_data.bai_exports
+        WHERE iban IS NOT NULL
+        """
+        rows = self.execute_query(query, cache_ttl=REFERENCE_DATA_CACHE_TTL, cache_tags=('bai_exports',))
+        ibans = sorted({row['iban'] for row in rows})
+        formats = sorted({row['exportformat'] for row in rows if row['exportformat']})
+        return ibans, formats
+
 # Module-level database instances for each environment
 # Shared database for users, authentication, audit logs (used by all modules)
 shared_db = Database(db_type='shared')
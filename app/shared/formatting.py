@@ -0,0 +1,19 @@
+"""
+Number formatting helpers shared by templates and PDF generation
+"""
+
+
+def format_amount_nl(value):
+    """Format a number in Dutch notation with two decimals (1.234,56)
+
+    Decimals are formatted exactly; strings and other values go through float().
+    Raises ValueError/TypeError for values that are not numbers.
+    """
+    try:
+        text = f"{value:,.2f}"
+    except (ValueError, TypeError):
+        if value is None:
+            return '0,00'
+        text = f"{float(value):,.2f}"
+    # Swap separators: 1,234.56 -> 1X234.56 -> 1X234,56 -> 1.234,56
+    return text.replace(',', 'X').replace('.', ',').replace('X', '.')
@@ -0,0 +1,442 @@
+"""
+In-process query and request metrics for CashApp
+Database.execute_query and ReconDatabase.execute_query report every query
+they send to PostgreSQL, tagged with the calling method (for example
+get_detailed_reconciliation): duration, row count and result size go into
+per-method histograms. Queries slower than SLOW_QUERY_MS are logged and kept
+in a ring buffer, so an admin can run EXPLAIN (ANALYZE, BUFFERS) on them.
+
+request_metrics (installed on the Flask app in app/main.py) measures every
+request per endpoint: total latency, time in those DB calls, time rendering
+Jinja templates and response size, with p50/p95/p99 over the last
+REQUEST_METRICS_WINDOW requests. render_prometheus() exposes both.
+
+Counters are per worker process; cache hits and coalesced callers do not
+reach the database and are not counted.
+"""
+import itertools
+import math
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+
+from flask import before_render_template, g, request, template_rendered
+
+from config.config import Config
+from app.shared.cache import _estimate_size
+
+DURATION_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+
+# Timer of the request being handled in this context (None outside requests)
+_current_request = ContextVar('cashapp_request_timer', default=None)
+
+# Result size is estimated from the first rows only; sizing every row of a
+# large result would cost more than the query metrics are worth
+_SIZE_SAMPLE_ROWS = 200
+
+
+def estimate_payload_bytes(rows):
+    """Approximate in-memory size of a result, extrapolated from a sample of rows"""
+    if not rows:
+        return 0
+    if len(rows) <= _SIZE_SAMPLE_ROWS:
+        return _estimate_size(rows)
+    sample = _estimate_size(rows[:_SIZE_SAMPLE_ROWS])
+    return int(sample * len(rows) / _SIZE_SAMPLE_ROWS)
+
+
+def calling_method(depth=2):
+    """Name of the function `depth` frames up from the caller of this helper
+
+    From execute_query, depth 2 is the query method that called it.
+    """
+    return sys._getframe(depth).f_code.co_name
+
+
+class Histogram:
+    """Fixed-bucket histogram with percentile estimates (not thread-safe on its own)"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q):
+        """Estimate of the q-th percentile (0-100), interpolated within its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for index, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def cumulative(self):
+        """(upper bound, observations <= bound) pairs, ending with +Inf"""
+        return list(zip(self.buckets + (float('inf'),), itertools.accumulate(self.counts)))
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 3),
+            'mean': round(self.sum / self.count, 3) if self.count else 0,
+            'max': round(self.max, 3),
+            'p50': round(self.percentile(50), 3),
+            'p95': round(self.percentile(95), 3),
+            'p99': round(self.percentile(99), 3),
+        }
+
+
+class _MethodStats:
+    __slots__ = ('duration_ms', 'rows', 'total_bytes', 'max_bytes', 'errors', 'slow')
+
+    def __init__(self):
+        self.duration_ms = Histogram(DURATION_BUCKETS_MS)
+        self.rows = Histogram(ROW_BUCKETS)
+        self.total_bytes = 0
+        self.max_bytes = 0
+        self.errors = 0
+        self.slow = 0
+
+
+class QueryMetrics:
+    """Thread-safe per-method query histograms plus a ring buffer of slow queries"""
+
+    def __init__(self, slow_ms=500, slow_log_size=100, enabled=True):
+        self.slow_ms = slow_ms
+        self.enabled = enabled
+        self._stats = {}
+        self._slow = deque(maxlen=slow_log_size)
+        self._slow_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.started_at = datetime.now()
+
+    def record(self, db_type, method, query, params, seconds, rows=None, row_count=None, error=None):
+        """Record one executed query
+
+        Args:
+            rows (list): Fetched rows, used for the row count and payload size
+            row_count (int): Row count when nothing was fetched (cursor.rowcount)
+            error (Exception): Set when the query failed
+        """
+        timer = _current_request.get()
+        if timer is not None:
+            timer.db_seconds += seconds
+            timer.queries += 1
+        if not self.enabled:
+            return
+        duration_ms = seconds * 1000
+        if row_count is None:
+            row_count = len(rows) if rows is not None else 0
+        payload = estimate_payload_bytes(rows)
+        slow = duration_ms >= self.slow_ms
+        with self._lock:
+            stats = self._stats.get((db_type, method))
+            if stats is None:
+                stats = self._stats[(db_type, method)] = _MethodStats()
+            stats.duration_ms.observe(duration_ms)
+            stats.rows.observe(max(row_count, 0))
+            stats.total_bytes += payload
+            stats.max_bytes = max(stats.max_bytes, payload)
+            if error is not None:
+                stats.errors += 1
+            if slow:
+                stats.slow += 1
+                self._slow.append({
+                    'id': next(self._slow_ids),
+                    'at': datetime.now(),
+                    'db_type': db_type,
+                    'method': method,
+                    'duration_ms': round(duration_ms, 1),
+                    'rows': row_count,
+                    'bytes': payload,
+                    'error': str(error) if error is not None else None,
+                    'query': query,
+                    'params': params,
+                    'plan': None,
+                })
+        if slow:
+            print(f"Warning: slow query {db_type}.{method} took {duration_ms:.0f} ms "
+                  f"({row_count} rows, {payload // 1024} KB)")
+
+    def snapshot(self):
+        """Per-method summary, slowest total time first"""
+        with self._lock:
+            methods = [
+                {
+                    'db_type': db_type,
+                    'method': method,
+                    'duration_ms': stats.duration_ms.snapshot(),
+                    'rows': stats.rows.snapshot(),
+                    'total_bytes': stats.total_bytes,
+                    'mean_bytes': stats.total_bytes // stats.duration_ms.count if stats.duration_ms.count else 0,
+                    'max_bytes': stats.max_bytes,
+                    'errors': stats.errors,
+                    'slow': stats.slow,
+                }
+                for (db_type, method), stats in self._stats.items()
+            ]
+        methods.sort(key=lambda item: item['duration_ms']['sum'], reverse=True)
+        return methods
+
+    def histograms(self):
+        """Cumulative duration buckets (seconds) per method, for render_prometheus"""
+        with self._lock:
+            return [
+                {
+                    'db_type': db_type,
+                    'method': method,
+                    'buckets': [(bound / 1000, count) for bound, count in stats.duration_ms.cumulative()],
+                    'sum': stats.duration_ms.sum / 1000,
+                    'count': stats.duration_ms.count,
+                    'errors': stats.errors,
+                }
+                for (db_type, method), stats in self._stats.items()
+            ]
+
+    def slow_queries(self):
+        """Slow query log, newest first"""
+        with self._lock:
+            return list(reversed(self._slow))
+
+    def get_slow_query(self, entry_id):
+        with self._lock:
+            return next((entry for entry in self._slow if entry['id'] == entry_id), None)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+            self.started_at = datetime.now()
+
+    def stats(self):
+        """Totals for the cache-stats endpoint"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'slow_ms': self.slow_ms,
+                'methods': len(self._stats),
+                'queries': sum(stats.duration_ms.count for stats in self._stats.values()),
+                'slow_logged': len(self._slow),
+            }
+
+
+def _percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+class _RequestTimer:
+    __slots__ = ('started', 'db_seconds', 'queries', 'render_seconds', 'render_started', 'render_depth')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.render_seconds = 0.0
+        self.render_started = 0.0
+        self.render_depth = 0
+
+
+class _EndpointStats:
+    __slots__ = ('window', 'count', 'seconds', 'db_seconds', 'render_seconds', 'bytes', 'queries', 'errors')
+
+    def __init__(self, window):
+        self.window = deque(maxlen=window)  # (total, db, render) ms and bytes of recent requests
+        self.count = 0
+        self.seconds = 0.0
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+        self.bytes = 0
+        self.queries = 0
+        self.errors = 0
+
+
+class RequestMetrics:
+    """Per-endpoint latency, DB time, template time and response size
+
+    Totals are cumulative since start (or reset); percentiles are taken
+    over the last `window` requests of each endpoint.
+    """
+
+    def __init__(self, window=1000, enabled=True, skip_endpoints=('static',)):
+        self.window = window
+        self.enabled = enabled
+        self.skip_endpoints = set(skip_endpoints)
+        self._stats = {}
+        self._lock = threading.Lock()
+        self.started_at = datetime.now()
+
+    def init_app(self, app):
+        """Register the request hooks and template signals on the Flask app"""
+        if not self.enabled:
+            return
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._end_request)
+        before_render_template.connect(self._start_render, app)
+        template_rendered.connect(self._finish_render, app)
+
+    def _start_request(self):
+        g._request_timer_token = _current_request.set(_RequestTimer())
+
+    def _finish_request(self, response):
+        timer = _current_request.get()
+        endpoint = request.endpoint or '<unmatched>'
+        if timer is not None and endpoint not in self.skip_endpoints:
+            # Streamed responses have no length up front and count as 0 bytes
+            self.record(endpoint, time.perf_counter() - timer.started, timer.db_seconds,
+                        timer.render_seconds, response.content_length or 0,
+                        response.status_code, timer.queries)
+        return response
+
+    def _end_request(self, error=None):
+        token = g.pop('_request_timer_token', None)
+        if token is not None:
+            _current_request.reset(token)
+
+    def _start_render(self, sender, template, context, **extra):
+        timer = _current_request.get()
+        if timer is not None:
+            if not timer.render_depth:
+                timer.render_started = time.perf_counter()
+            timer.render_depth += 1
+
+    def _finish_render(self, sender, template, context, **extra):
+        timer = _current_request.get()
+        if timer is not None and timer.render_depth:
+            timer.render_depth -= 1
+            if not timer.render_depth:
+                timer.render_seconds += time.perf_counter() - timer.render_started
+
+    def record(self, endpoint, seconds, db_seconds=0.0, render_seconds=0.0, size=0, status=200, queries=0):
+        with self._lock:
+            stats = self._stats.get(endpoint)
+            if stats is None:
+                stats = self._stats[endpoint] = _EndpointStats(self.window)
+            stats.window.append((seconds * 1000, db_seconds * 1000, render_seconds * 1000, size))
+            stats.count += 1
+            stats.seconds += seconds
+            stats.db_seconds += db_seconds
+            stats.render_seconds += render_seconds
+            stats.bytes += size
+            stats.queries += queries
+            if status >= 500:
+                stats.errors += 1
+
+    def snapshot(self):
+        """Per-endpoint summary, largest share of worker time first"""
+        with self._lock:
+            items = [(endpoint, stats, list(stats.window)) for endpoint, stats in self._stats.items()]
+            total_seconds = sum(stats.seconds for stats in self._stats.values())
+        endpoints = []
+        for endpoint, stats, window in items:
+            total_ms, db_ms, render_ms, sizes = (sorted(values) for values in zip(*window))
+            endpoints.append({
+                'endpoint': endpoint,
+                'count': stats.count,
+                'errors': stats.errors,
+                'seconds': round(stats.seconds, 3),
+                'db_seconds': round(stats.db_seconds, 3),
+                'render_seconds': round(stats.render_seconds, 3),
+                'bytes_total': stats.bytes,
+                'share': round(stats.seconds / total_seconds, 4) if total_seconds else 0,
+                'db_share': round(stats.db_seconds / stats.seconds, 4) if stats.seconds else 0,
+                'render_share': round(stats.render_seconds / stats.seconds, 4) if stats.seconds else 0,
+                'queries_per_request': round(stats.queries / stats.count, 1),
+                'mean_bytes': stats.bytes // stats.count,
+                'window': len(window),
+                'total_ms': {f'p{q}': round(_percentile(total_ms, q), 1) for q in (50, 95, 99)},
+                'db_ms': {f'p{q}': round(_percentile(db_ms, q), 1) for q in (50, 95, 99)},
+                'render_ms': {f'p{q}': round(_percentile(render_ms, q), 1) for q in (50, 95, 99)},
+                'bytes': {f'p{q}': _percentile(sizes, q) for q in (50, 95, 99)},
+            })
+        endpoints.sort(key=lambda item: item['seconds'], reverse=True)
+        return endpoints
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.started_at = datetime.now()
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus():
+    """Request and query metrics of this worker in the Prometheus text format"""
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for suffix, labels, value in samples:
+            label_text = ','.join(f'{key}="{_label(val)}"' for key, val in labels.items())
+            value = value if isinstance(value, int) else format(value, '.9g')
+            lines.append(f'{name}{suffix}{{{label_text}}} {value}')
+
+    endpoints = request_metrics.snapshot()
+    metric('cashapp_http_requests_total', 'counter', 'Requests handled',
+           [('', {'endpoint': e['endpoint']}, e['count']) for e in endpoints])
+    metric('cashapp_http_request_errors_total', 'counter', 'Requests answered with a 5xx status',
+           [('', {'endpoint': e['endpoint']}, e['errors']) for e in endpoints])
+    latency = []
+    for e in endpoints:
+        for q in (50, 95, 99):
+            latency.append(('', {'endpoint': e['endpoint'], 'quantile': q / 100}, e['total_ms'][f'p{q}'] / 1000))
+        latency.append(('_sum', {'endpoint': e['endpoint']}, e['seconds']))
+        latency.append(('_count', {'endpoint': e['endpoint']}, e['count']))
+    metric('cashapp_http_request_duration_seconds', 'summary',
+           'Request latency, quantiles over the recent window', latency)
+    metric('cashapp_http_request_db_seconds_total', 'counter', 'Time spent in database queries',
+           [('', {'endpoint': e['endpoint']}, e['db_seconds']) for e in endpoints])
+    metric('cashapp_http_request_render_seconds_total', 'counter', 'Time spent rendering templates',
+           [('', {'endpoint': e['endpoint']}, e['render_seconds']) for e in endpoints])
+    metric('cashapp_http_response_bytes_total', 'counter', 'Response body bytes (streamed responses excluded)',
+           [('', {'endpoint': e['endpoint']}, e['bytes_total']) for e in endpoints])
+
+    queries = query_metrics.histograms()
+    buckets = []
+    for h in queries:
+        labels = {'db': h['db_type'], 'method': h['method']}
+        for bound, count in h['buckets']:
+            buckets.append(('_bucket', dict(labels, le='+Inf' if bound == float('inf') else f'{bound:g}'), count))
+        buckets.append(('_sum', labels, h['sum']))
+        buckets.append(('_count', labels, h['count']))
+    metric('cashapp_db_query_duration_seconds', 'histogram', 'Database query duration per query method', buckets)
+    metric('cashapp_db_query_errors_total', 'counter', 'Failed database queries per query method',
+           [('', {'db': h['db_type'], 'method': h['method']}, h['errors']) for h in queries])
+    return '\n'.join(lines) + '\n'
+
+
+# Module-level singletons shared by all Database instances in this process
+request_metrics = RequestMetrics(
+    window=Config.REQUEST_METRICS_WINDOW,
+    enabled=Config.REQUEST_METRICS_ENABLED
+)
+
+query_metrics = QueryMetrics(
+    slow_ms=Config.SLOW_QUERY_MS,
+    slow_log_size=Config.SLOW_QUERY_LOG_SIZE,
+    enabled=Config.QUERY_METRICS_ENABLED
+)
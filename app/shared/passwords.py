@@ -0,0 +1,134 @@
+"""
+Password hashing for CashApp
+Runs bcrypt on a bounded worker pool so a burst of logins cannot pin every
+request thread, and tells callers when a stored hash uses an outdated cost.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import bcrypt
+
+from config.config import Config
+
+
+class LoginThrottledError(Exception):
+    """Raised when the password verification queue is full or too slow"""
+
+
+class PasswordHasher:
+    """bcrypt hashing/verification on a bounded thread pool"""
+
+    def __init__(self, rounds=12, workers=2, max_queue=16, timeout=10):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        # One slot per running + queued verification; beyond that logins are rejected
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._active = 0
+        self.verified = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.rehash_skipped = 0
+
+    def hash(self, password):
+        """Hash password with the configured cost factor"""
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=self.rounds)).decode('utf-8')
+
+    def verify(self, password, password_hash):
+        """Check password against password_hash on the worker pool
+
+        Raises:
+            LoginThrottledError: the queue is full or the check timed out
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise LoginThrottledError('Password verification queue is full')
+        future = self._submit(bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            with self._lock:
+                self.rejected += 1
+            raise LoginThrottledError('Password verification timed out')
+        with self._lock:
+            self.verified += 1
+        return result
+
+    def _submit(self, fn, *args):
+        """Run fn on the pool in a slot the caller has acquired; the slot is released when done"""
+        with self._lock:
+            self._active += 1
+        try:
+            future = self._executor.submit(self._run, fn, *args)
+        except Exception:
+            with self._lock:
+                self._active -= 1
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda f: self._slots.release())
+        return future
+
+    def _run(self, fn, *args):
+        # Counted down before the result is set, so a caller sees its own task as finished
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def needs_rehash(self, password_hash):
+        """True if password_hash was created with a lower cost factor (never downgrades)"""
+        try:
+            return int(password_hash.split('$')[2]) < self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def rehash(self, password, store):
+        """Hash password again on the worker pool in the background and call store(new_hash)
+
+        Skipped (returns False) while no worker is idle, so upgrading a hash
+        never delays or crowds out logins; it is retried at the next login.
+        """
+        with self._lock:
+            idle = self._active < self.workers
+        if not idle or not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rehash_skipped += 1
+            return False
+        self._submit(self._rehash, password, store)
+        return True
+
+    def _rehash(self, password, store):
+        try:
+            store(self.hash(password))
+        except Exception as e:
+            print(f"Warning: Could not store rehashed password: {e}")
+            return
+        with self._lock:
+            self.rehashed += 1
+
+    def stats(self):
+        """Verification counters for the admin pages"""
+        with self._lock:
+            return {
+                'rounds': self.rounds,
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'verified': self.verified,
+                'rejected': self.rejected,
+                'rehashed': self.rehashed,
+                'rehash_skipped': self.rehash_skipped,
+            }
+
+
+# Module-level hasher shared by all request threads in this process
+password_hasher = PasswordHasher(
+    rounds=Config.BCRYPT_ROUNDS,
+    workers=Config.BCRYPT_WORKERS,
+    max_queue=Config.BCRYPT_MAX_QUEUE,
+    timeout=Config.BCRYPT_TIMEOUT
+)
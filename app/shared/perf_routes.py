@@ -0,0 +1,186 @@
+"""
+Performance and monitoring routes for CashApp admins
+Registered on the shared blueprint
+"""
+import hmac
+
+from flask import Response, abort, flash, jsonify, redirect, render_template, request, send_file, url_for
+from flask_login import current_user, login_required
+from config.config import Config
+from app.shared.auth import shared_bp
+from app.shared.decorators import require_admin
+from app.shared.cache import query_cache
+from app.shared.metrics import query_metrics, render_prometheus, request_metrics
+from app.shared.profiler import request_profiler
+from app.shared.report_jobs import report_jobs
+from app.shared.singleflight import single_flight
+
+
+@shared_bp.route('/admin/cache-stats')
+@login_required
+@require_admin
+def admin_cache_stats():
+    '''Query cache, single-flight and report job counters'''
+    return jsonify({
+        'query_cache': query_cache.stats(),
+        'single_flight': single_flight.stats(),
+        'report_jobs': report_jobs.stats(),
+        'query_metrics': query_metrics.stats()
+    })
+
+
+@shared_bp.route('/admin/cache-stats/clear', methods=['POST'])
+@login_required
+@require_admin
+def admin_cache_clear():
+    '''Drop all cached query results in this worker'''
+    removed = query_cache.invalidate()
+    return jsonify({'removed': removed})
+
+
+@shared_bp.route('/admin/queries')
+@login_required
+@require_admin
+def admin_queries():
+    '''Per-method query timings and the slow query log of this worker'''
+    return render_template(
+        'admin/queries.html',
+        methods=query_metrics.snapshot(),
+        slow_queries=query_metrics.slow_queries(),
+        stats=query_metrics.stats(),
+        started_at=query_metrics.started_at
+    )
+
+
+@shared_bp.route('/admin/queries/stats')
+@login_required
+@require_admin
+def admin_query_stats():
+    '''Per-method query timings as JSON'''
+    return jsonify({
+        'started_at': query_metrics.started_at.isoformat(),
+        'methods': query_metrics.snapshot()
+    })
+
+
+@shared_bp.route('/admin/queries/slow/<int:entry_id>/explain', methods=['POST'])
+@login_required
+@require_admin
+def admin_explain_slow_query(entry_id):
+    '''Run EXPLAIN (ANALYZE, BUFFERS) for a logged slow query on its own connection'''
+    from app.shared.database import Database
+
+    entry = query_metrics.get_slow_query(entry_id)
+    if entry is None:
+        flash('Slow query is no longer in the log', 'warning')
+        return redirect(url_for('shared.admin_queries'))
+    explain_db = Database(db_type=entry['db_type'])
+    try:
+        entry['plan'] = '\n'.join(explain_db.explain(entry['query'], entry['params']))
+    except Exception as e:
+        flash(f'EXPLAIN failed: {e}', 'danger')
+    finally:
+        explain_db.close()
+    return redirect(url_for('shared.admin_queries', _anchor=f'slow-{entry_id}'))
+
+
+@shared_bp.route('/admin/queries/reset', methods=['POST'])
+@login_required
+@require_admin
+def admin_queries_reset():
+    '''Clear the query histograms and slow query log of this worker'''
+    query_metrics.reset()
+    return redirect(url_for('shared.admin_queries'))
+
+
+@shared_bp.route('/admin/perf')
+@login_required
+@require_admin
+def admin_perf():
+    '''Per-endpoint latency percentiles with DB and template time of this worker'''
+    endpoints = request_metrics.snapshot()
+    return render_template(
+        'admin/perf.html',
+        endpoints=endpoints,
+        total_requests=sum(e['count'] for e in endpoints),
+        total_seconds=sum(e['seconds'] for e in endpoints),
+        enabled=request_metrics.enabled,
+        window=request_metrics.window,
+        started_at=request_metrics.started_at
+    )
+
+
+@shared_bp.route('/admin/perf/stats')
+@login_required
+@require_admin
+def admin_perf_stats():
+    '''Per-endpoint request metrics as JSON'''
+    return jsonify({
+        'started_at': request_metrics.started_at.isoformat(),
+        'endpoints': request_metrics.snapshot()
+    })
+
+
+@shared_bp.route('/admin/perf/reset', methods=['POST'])
+@login_required
+@require_admin
+def admin_perf_reset():
+    '''Clear the request metrics of this worker'''
+    request_metrics.reset()
+    return redirect(url_for('shared.admin_perf'))
+
+
+@shared_bp.route('/metrics')
+def prometheus_metrics():
+    '''Prometheus scrape endpoint: METRICS_TOKEN as bearer token, or an admin session'''
+    token = Config.METRICS_TOKEN
+    authorization = request.headers.get('Authorization', '')
+    if not (token and hmac.compare_digest(authorization, f'Bearer {token}')):
+        if not (current_user.is_authenticated and current_user.is_admin):
+            abort(401)
+    return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+
+@shared_bp.route('/admin/profiles')
+@login_required
+@require_admin
+def admin_profiles():
+    '''Stored request profiles (?_profile=cprofile|sampling)'''
+    return render_template(
+        'admin/profiles.html',
+        profiles=request_profiler.list(),
+        enabled=request_profiler.enabled,
+        keep=request_profiler.keep
+    )
+
+
+@shared_bp.route('/admin/profiles/<filename>')
+@login_required
+@require_admin
+def admin_profile_download(filename):
+    '''Download a stored profile (pstats or speedscope JSON)'''
+    path = request_profiler.path(filename)
+    if path is None:
+        abort(404)
+    return send_file(path, as_attachment=True, download_name=filename)
+
+
+@shared_bp.route('/admin/profiles/<filename>/summary')
+@login_required
+@require_admin
+def admin_profile_summary(filename):
+    '''Top functions of a cProfile profile by cumulative time'''
+    summary = request_profiler.summary(filename)
+    if summary is None:
+        abort(404)
+    return Response(summary, mimetype='text/plain')
+
+
+@shared_bp.route('/admin/profiles/clear', methods=['POST'])
+@login_required
+@require_admin
+def admin_profiles_clear():
+    '''Delete all stored profiles'''
+    removed = request_profiler.clear()
+    flash(f'{removed} profiles deleted', 'info')
+    return redirect(url_for('shared.admin_profiles'))
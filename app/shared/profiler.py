@@ -0,0 +1,227 @@
+"""
+On-demand profiling of single requests for admins
+Add ?_profile=cprofile or ?_profile=sampling (or the X-Profile header) to any
+URL while logged in as admin. The request then runs under cProfile (pstats
+file) or a stack sampler (speedscope JSON, open at https://www.speedscope.app)
+and the profile is stored in PROFILE_DIR for download from /admin/profiles.
+Requests without the switch only pay for one dictionary lookup.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+
+from flask import g, request
+from flask_login import current_user
+from config.config import Config
+
+MODES = ('cprofile', 'sampling')
+QUERY_ARG = '_profile'
+HEADER = 'X-Profile'
+
+# Files are named <timestamp>_<mode>_<endpoint>_<ms>ms.<ext> so every worker can list them
+_EXTENSIONS = {'cprofile': '.prof', 'sampling': '.speedscope.json'}
+_FILENAME = re.compile(
+    r'^(?P<at>\d{8}-\d{6}-\d{6})_(?P<mode>cprofile|sampling)_(?P<endpoint>[\w.]+)_(?P<ms>\d+)ms'
+    r'(?P<ext>\.prof|\.speedscope\.json)$'
+)
+
+
+class _Sampler(threading.Thread):
+    """Samples the call stack of one thread at a fixed interval"""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name='cashapp-profiler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.frames = {}      # (name, file, line) -> index
+        self.samples = []     # frame indices, root first
+        self.weights = []     # milliseconds per sample
+        self._stop_event = threading.Event()
+
+    def run(self):
+        last = time.perf_counter()
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                key = (code.co_name, code.co_filename, code.co_firstlineno)
+                stack.append(self.frames.setdefault(key, len(self.frames)))
+                frame = frame.f_back
+            stack.reverse()
+            self.samples.append(stack)
+            self.weights.append(round((now - last) * 1000, 3))
+            last = now
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def speedscope(self, name):
+        """Profile in the speedscope file format (sampled profile)"""
+        frames = [None] * len(self.frames)
+        for (func, filename, line), index in self.frames.items():
+            frames[index] = {'name': func, 'file': filename, 'line': line}
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': name,
+            'exporter': 'cashapp',
+            'activeProfileIndex': 0,
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': round(sum(self.weights), 3),
+                'samples': self.samples,
+                'weights': self.weights,
+            }],
+        }
+
+
+class RequestProfiler:
+    """Profiles admin requests that ask for it and keeps the last profiles on disk"""
+
+    def __init__(self, directory, keep=50, sample_interval_ms=5, enabled=True):
+        self.directory = directory
+        self.keep = keep
+        self.sample_interval = sample_interval_ms / 1000
+        self.enabled = enabled
+
+    def init_app(self, app):
+        """Register the request hooks on the Flask app"""
+        if not self.enabled:
+            return
+        app.before_request(self._start)
+        app.after_request(self._add_header)
+        app.teardown_request(self._stop)
+
+    def requested_mode(self):
+        mode = request.args.get(QUERY_ARG) or request.headers.get(HEADER)
+        if mode not in MODES:
+            return None
+        if not (current_user.is_authenticated and current_user.is_admin):
+            return None
+        return mode
+
+    def _start(self):
+        if QUERY_ARG not in request.args and HEADER not in request.headers:
+            return
+        mode = self.requested_mode()
+        if mode is None:
+            return
+        if mode == 'cprofile':
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError as e:
+                # Another profiler (or debugger) is active in this thread
+                print(f"Warning: Could not start profiler: {e}")
+                return
+        else:
+            profiler = _Sampler(threading.get_ident(), self.sample_interval)
+            profiler.start()
+        g._profile = (mode, profiler, time.perf_counter(), datetime.now())
+
+    def _add_header(self, response):
+        if '_profile' in g:
+            response.headers['X-Profile-Mode'] = g._profile[0]
+        return response
+
+    def _stop(self, error=None):
+        state = g.pop('_profile', None)
+        if state is None:
+            return
+        mode, profiler, started, at = state
+        if mode == 'cprofile':
+            profiler.disable()
+        else:
+            profiler.stop()
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        endpoint = re.sub(r'[^\w.]', '_', request.endpoint or 'unmatched')
+        filename = f"{at:%Y%m%d-%H%M%S-%f}_{mode}_{endpoint}_{elapsed_ms}ms{_EXTENSIONS[mode]}"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, filename)
+            if mode == 'cprofile':
+                profiler.dump_stats(path)
+            else:
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(profiler.speedscope(f'{request.method} {request.full_path}'), f)
+            self._evict()
+        except OSError as e:
+            print(f"Warning: Could not store profile {filename}: {e}")
+
+    def _evict(self):
+        for profile in self.list()[self.keep:]:
+            try:
+                os.remove(os.path.join(self.directory, profile['filename']))
+            except OSError:
+                pass
+
+    def list(self):
+        """Stored profiles, newest first"""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        profiles = []
+        for name in names:
+            match = _FILENAME.match(name)
+            if match:
+                profiles.append({
+                    'filename': name,
+                    'at': datetime.strptime(match['at'], '%Y%m%d-%H%M%S-%f'),
+                    'mode': match['mode'],
+                    'endpoint': match['endpoint'],
+                    'duration_ms': int(match['ms']),
+                    'bytes': os.path.getsize(os.path.join(self.directory, name)),
+                })
+        return sorted(profiles, key=lambda p: p['at'], reverse=True)
+
+    def path(self, filename):
+        """Full path of a stored profile, or None for unknown names"""
+        if not _FILENAME.match(filename):
+            return None
+        path = os.path.join(self.directory, filename)
+        return path if os.path.exists(path) else None
+
+    def summary(self, filename, limit=40):
+        """Top functions of a cProfile profile by cumulative time, as text"""
+        path = self.path(filename)
+        if path is None or not filename.endswith('.prof'):
+            return None
+        out = io.StringIO()
+        stats = pstats.Stats(path, stream=out)
+        stats.strip_dirs().sort_stats('cumulative').print_stats(limit)
+        return out.getvalue()
+
+    def clear(self):
+        removed = 0
+        for profile in self.list():
+            try:
+                os.remove(os.path.join(self.directory, profile['filename']))
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+# Module-level profiler shared by all request threads in this process
+request_profiler = RequestProfiler(
+    Config.PROFILE_DIR,
+    keep=Config.PROFILE_KEEP,
+    sample_interval_ms=Config.PROFILE_SAMPLE_INTERVAL_MS,
+    enabled=Config.PROFILER_ENABLED
+)
@@ -0,0 +1,293 @@
+"""
+Background report jobs for CashApp
+Heavy report queries are submitted as jobs, computed on a worker pool and
+stored zlib-compressed keyed by (report, params). Identical submissions
+share one job, so concurrent requests for the same report collapse into a
+single computation; the browser polls the job status and then reloads.
+
+Job state and results live in a directory shared by all worker processes
+(REPORT_JOB_DIR, like the statement cache), named after the deterministic
+job id, so a status poll or reload answered by another gunicorn worker sees
+the same job instead of starting it again. With several hosts the directory
+must be on a shared mount.
+"""
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from config.config import Config
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class ReportJob:
+    """State of one report computation"""
+
+    def __init__(self, job_id, report, params):
+        self.id = job_id
+        self.report = report
+        self.params = params
+        self.status = QUEUED
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.expires_at = None
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'report': self.report,
+            'params': self.params,
+            'status': self.status,
+            'error': self.error,
+            'submitted_at': self.submitted_at,
+            'duration': round(self.finished_at - self.started_at, 3) if self.finished_at and self.started_at else None,
+        }
+
+    def state(self):
+        """Everything needed to restore the job in another process"""
+        return dict(self.to_dict(), started_at=self.started_at, finished_at=self.finished_at,
+                    expires_at=self.expires_at)
+
+    @classmethod
+    def from_state(cls, state):
+        job = cls(state['job_id'], state['report'], state['params'])
+        for name in ('status', 'error', 'submitted_at', 'started_at', 'finished_at', 'expires_at'):
+            setattr(job, name, state.get(name))
+        return job
+
+
+class ReportJobManager:
+    """Runs registered report functions on a thread pool and keeps their results
+
+    Args:
+        directory (str): Job state (<id>.json) and result (<id>.result) files, shared by all workers
+        job_timeout (int): Seconds after which a queued/running job counts as lost
+            (its worker was restarted) and a new submission computes it again
+    """
+
+    def __init__(self, directory, workers=2, result_ttl=600, max_results=50, job_timeout=3600):
+        self.directory = directory
+        self.result_ttl = result_ttl
+        self.max_results = max_results
+        self.job_timeout = job_timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='report-job')
+        self._reports = {}
+        self._lock = threading.Lock()
+        self.computed = 0
+        self.collapsed = 0
+
+    def register(self, report, fn, params=()):
+        """Register a report function; only the listed keyword params are accepted"""
+        self._reports[report] = (fn, tuple(params))
+
+    def is_registered(self, report):
+        return report in self._reports
+
+    def job_id(self, report, params):
+        """Stable id for a report + params combination"""
+        payload = json.dumps({'report': report, 'params': params}, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def compute(self, report, params):
+        """Run a report synchronously in the calling thread"""
+        fn, allowed = self._reports[report]
+        return fn(**{key: params.get(key) for key in allowed})
+
+    def submit(self, report, params):
+        """Return the job for (report, params), starting a computation if needed"""
+        fn, allowed = self._reports[report]
+        params = {key: params.get(key) for key in allowed}
+        job_id = self.job_id(report, params)
+        with self._lock:
+            job = self._read_job(job_id)
+            if job is not None and self._is_live(job):
+                self.collapsed += 1
+                return job
+            new_job = ReportJob(job_id, report, params)
+            if job is None and not self._write_job(new_job, create=True):
+                # Another worker claimed the job between the read and the write
+                self.collapsed += 1
+                return self._read_job(job_id) or new_job
+            if job is not None:
+                self._write_job(new_job)
+        self._executor.submit(self._run, new_job, fn)
+        return new_job
+
+    def get_job(self, job_id):
+        """Job state from any worker, or None when unknown or expired"""
+        job = self._read_job(job_id)
+        if job is None or (job.status in (DONE, FAILED) and job.expires_at <= time.time()):
+            return None
+        if job.status == DONE and not os.path.exists(self._result_path(job_id)):
+            return None
+        return job
+
+    def load(self, job_id):
+        """Return the stored result for job_id, or None if missing/expired"""
+        job = self._read_job(job_id)
+        if job is None or job.status != DONE or job.expires_at <= time.time():
+            return None
+        path = self._result_path(job_id)
+        try:
+            with open(path, 'rb') as f:
+                blob = f.read()
+            os.utime(path)  # most recently used results survive the max_results bound
+        except OSError:
+            return None
+        return pickle.loads(zlib.decompress(blob))
+
+    def cleanup(self):
+        """Remove expired and lost jobs, then the oldest results beyond max_results
+
+        Returns:
+            int: Jobs removed
+        """
+        now = time.time()
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return 0
+        removed = 0
+        results = []
+        for entry in entries:
+            name = entry.name
+            try:
+                if name.endswith('.json'):
+                    job = self._read_job(name[:-len('.json')])
+                    lost = job is None or job.status in (QUEUED, RUNNING) and not self._is_live(job, now)
+                    if lost or job.status in (DONE, FAILED) and job.expires_at <= now:
+                        self._remove(name[:-len('.json')])
+                        removed += 1
+                elif name.endswith('.result'):
+                    results.append((entry.stat().st_mtime, name[:-len('.result')]))
+                elif name.endswith('.tmp') and entry.stat().st_mtime < now - self.job_timeout:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+        results = [(mtime, job_id) for mtime, job_id in results if os.path.exists(self._result_path(job_id))]
+        for _, job_id in sorted(results)[:max(len(results) - self.max_results, 0)]:
+            self._remove(job_id)
+            removed += 1
+        return removed
+
+    def stats(self):
+        jobs = []
+        stored_bytes = 0
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.json'):
+                    jobs.append(self._read_job(entry.name[:-len('.json')]))
+                elif entry.name.endswith('.result'):
+                    stored_bytes += entry.stat().st_size
+        except OSError:
+            pass
+        jobs = [job for job in jobs if job is not None]
+        return {
+            'directory': self.directory,
+            'jobs': len(jobs),
+            'running': sum(1 for job in jobs if job.status == RUNNING),
+            'stored_results': sum(1 for job in jobs if job.status == DONE),
+            'stored_bytes': stored_bytes,
+            'computed': self.computed,
+            'collapsed': self.collapsed,
+        }
+
+    def _state_path(self, job_id):
+        return os.path.join(self.directory, f'{job_id}.json')
+
+    def _result_path(self, job_id):
+        return os.path.join(self.directory, f'{job_id}.result')
+
+    def _is_live(self, job, now=None):
+        """Job that a new submission should join: in progress, or done with its result stored"""
+        now = now or time.time()
+        if job.status in (QUEUED, RUNNING):
+            return (job.started_at or job.submitted_at) > now - self.job_timeout
+        return (job.status == DONE and job.expires_at > now
+                and os.path.exists(self._result_path(job.id)))
+
+    def _read_job(self, job_id):
+        try:
+            with open(self._state_path(job_id), encoding='utf-8') as f:
+                return ReportJob.from_state(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_file(self, path, data, create=False):
+        """Write data to path atomically; with create, only if path does not exist yet"""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            if create:
+                try:
+                    os.link(tmp_path, path)
+                except FileExistsError:
+                    return False
+                finally:
+                    os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        return True
+
+    def _write_job(self, job, create=False):
+        data = json.dumps(job.state(), default=str).encode('utf-8')
+        return self._write_file(self._state_path(job.id), data, create=create)
+
+    def _remove(self, job_id):
+        for path in (self._result_path(job_id), self._state_path(job_id)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _run(self, job, fn):
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            self._write_job(job)
+            result = fn(**job.params)
+            blob = zlib.compress(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+            self._write_file(self._result_path(job.id), blob)
+            with self._lock:
+                self.computed += 1
+            job.status = DONE
+        except Exception as e:
+            print(f"Report job {job.report} {job.params} failed: {e}")
+            job.error = str(e)
+            job.status = FAILED
+        job.finished_at = time.time()
+        job.expires_at = job.finished_at + self.result_ttl
+        try:
+            self._write_job(job)
+            self.cleanup()
+        except Exception as e:
+            print(f"Warning: could not store report job {job.id}: {e}")
+
+
+# Module-level manager; all worker processes share its directory
+report_jobs = ReportJobManager(
+    Config.REPORT_JOB_DIR,
+    workers=Config.REPORT_JOB_WORKERS,
+    result_ttl=Config.REPORT_RESULT_TTL,
+    max_results=Config.REPORT_RESULT_MAX,
+    job_timeout=Config.REPORT_JOB_TIMEOUT
+)
@@ -0,0 +1,153 @@
+"""
+Compact query result rows
+By default the Database classes return RealDictCursor rows: one ordered dict
+per row, with its own copy of the key table. execute_query(row_mode=...) can
+return lighter results instead:
+
+    'tuple'    list of Row objects: plain tuples with one shared class per
+               column list, readable as row.iban, row['iban'] and row[1]
+    'columns'  one ColumnBatch holding a tuple of values per column
+
+Both work in Jinja templates (row.iban and row['iban']), with dict(row) and
+with pickle (report jobs); use rows_to_json for JSON responses.
+
+Columns named like a Row method (count, index, keys, values, items, get) or
+that are not identifiers get no attribute: row.count is still tuple.count,
+also in Jinja, so read such columns as row['count'] or alias them in the query.
+"""
+from functools import lru_cache
+from operator import itemgetter
+
+ROW_MODES = ('dict', 'tuple', 'columns')
+
+# Row/tuple methods that a column of the same name must not shadow; such
+# columns are readable as row['name'] only
+_RESERVED = frozenset({'keys', 'items', 'values', 'get', 'count', 'index'})
+
+
+class Row(tuple):
+    """Tuple of column values with access by column name"""
+    __slots__ = ()
+    _fields = ()
+    _index = {}
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return tuple.__getitem__(self, self._index[key])
+        return tuple.__getitem__(self, key)
+
+    def __reduce__(self):
+        return (_make_row, (self._fields, tuple(self)))
+
+    def __repr__(self):
+        return f"Row({', '.join(f'{name}={value!r}' for name, value in zip(self._fields, self))})"
+
+    def get(self, key, default=None):
+        index = self._index.get(key)
+        return default if index is None else tuple.__getitem__(self, index)
+
+    def keys(self):
+        return self._fields
+
+    def values(self):
+        return tuple(self)
+
+    def items(self):
+        return zip(self._fields, self)
+
+    def _asdict(self):
+        return dict(zip(self._fields, self))
+
+
+@lru_cache(maxsize=256)
+def row_class(fields):
+    """Row subclass for a tuple of column names (one class per distinct column list)
+
+    Only identifier columns outside _RESERVED become attributes.
+    """
+    namespace = {
+        '__slots__': (),
+        '_fields': fields,
+        '_index': {name: i for i, name in enumerate(fields)},
+    }
+    for i, name in enumerate(fields):
+        if name.isidentifier() and name not in _RESERVED:
+            namespace[name] = property(itemgetter(i))
+    return type('Row', (Row,), namespace)
+
+
+def _make_row(fields, values):
+    return row_class(fields)(values)
+
+
+class ColumnBatch:
+    """Column-oriented query result: one tuple of values per column
+
+    Iterating yields Row objects created on the fly, so templates can loop
+    over a batch as over a list of rows; batch['iban'] is a whole column.
+    """
+    __slots__ = ('fields', 'columns', '_length')
+
+    def __init__(self, fields, columns, length=None):
+        self.fields = tuple(fields)
+        self.columns = tuple(columns)
+        self._length = length if length is not None else (len(self.columns[0]) if self.columns else 0)
+
+    @classmethod
+    def from_rows(cls, fields, rows):
+        """Batch from a list of value tuples (as fetched by a tuple cursor)"""
+        columns = tuple(zip(*rows)) if rows else tuple(() for _ in fields)
+        return cls(fields, columns, len(rows))
+
+    def __len__(self):
+        return self._length
+
+    def __repr__(self):
+        return f"ColumnBatch({self._length} rows: {', '.join(self.fields)})"
+
+    def __iter__(self):
+        cls = row_class(self.fields)
+        return map(cls, zip(*self.columns))
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.columns[self.fields.index(key)]
+        if isinstance(key, slice):
+            cls = row_class(self.fields)
+            return [cls(values) for values in zip(*(column[key] for column in self.columns))]
+        cls = row_class(self.fields)
+        return cls(column[key] for column in self.columns)
+
+    def __sizeof__(self):
+        size = object.__sizeof__(self)
+        for column in self.columns:
+            size += column.__sizeof__() + sum(value.__sizeof__() for value in column)
+        return size
+
+    def __getstate__(self):
+        return (self.fields, self.columns, self._length)
+
+    def __setstate__(self, state):
+        self.fields, self.columns, self._length = state
+
+    def to_dict(self):
+        """{column: [values]} for JSON responses"""
+        return {name: list(column) for name, column in zip(self.fields, self.columns)}
+
+
+def convert_rows(rows, description, row_mode):
+    """Turn the value tuples of a plain cursor into the requested row mode"""
+    fields = tuple(column.name for column in description)
+    if row_mode == 'columns':
+        return ColumnBatch.from_rows(fields, rows)
+    return list(map(row_class(fields), rows))
+
+
+def rows_to_json(rows):
+    """JSON-ready form of any row mode: list of dicts, or {column: [values]} for a batch"""
+    if isinstance(rows, ColumnBatch):
+        return rows.to_dict()
+    if rows and isinstance(rows[0], Row):
+        fields = rows[0]._fields
+        return [dict(zip(fields, row)) for row in rows]
+    return [dict(row) for row in rows]
@@ -0,0 +1,45 @@
+"""
+In-process job scheduler for CashApp (APScheduler)
+Modules add their recurring jobs with scheduler.add_job(...) at import time;
+start_scheduler() starts the scheduler once, and only when SCHEDULER_ENABLED
+is set, so that with several app processes exactly one of them runs the jobs.
+"""
+import atexit
+import threading
+
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from config.config import Config
+
+# Jobs missed while the process was down still run if it comes back within an hour;
+# overlapping runs of the same job are not started.
+scheduler = BackgroundScheduler(
+    job_defaults={'coalesce': True, 'max_instances': 1, 'misfire_grace_time': 3600},
+    timezone='Europe/Amsterdam'
+)
+
+_start_lock = threading.Lock()
+
+
+def start_scheduler():
+    """Start the shared scheduler if enabled; returns True when it is running"""
+    if not Config.SCHEDULER_ENABLED:
+        return False
+    with _start_lock:
+        if not scheduler.running:
+            scheduler.start()
+            atexit.register(lambda: scheduler.shutdown(wait=False))
+            print(f"Scheduler started with {len(scheduler.get_jobs())} jobs")
+    return True
+
+
+def scheduler_status():
+    """Running state plus the next run time of every job"""
+    return {
+        'enabled': Config.SCHEDULER_ENABLED,
+        'running': scheduler.running,
+        'jobs': [
+            {'id': job.id, 'name': job.name, 'next_run_time': job.next_run_time}
+            for job in scheduler.get_jobs()
+        ],
+    }
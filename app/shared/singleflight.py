@@ -0,0 +1,79 @@
+"""
+Request coalescing (single-flight) for CashApp
+Concurrent callers asking for the same key wait on one in-flight execution
+and share its result instead of each running the same query.
+"""
+import threading
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Collapse concurrent identical calls into one execution"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+        self.max_waiters = 0
+
+    def do(self, key, fn):
+        """Run fn() once for all concurrent callers with the same key
+
+        Followers receive the leader's result object (shared, do not mutate)
+        or re-raise the leader's exception.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                self.max_waiters = max(self.max_waiters, call.waiters)
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def stats(self):
+        """Execution and coalescing counters"""
+        with self._lock:
+            total = self.executions + self.coalesced
+            return {
+                'in_flight': len(self._calls),
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'coalesced_ratio': round(self.coalesced / total, 3) if total else 0,
+                'max_waiters': self.max_waiters,
+            }
+
+
+# Module-level instance shared by all Database objects in this process
+single_flight = SingleFlight()
@@ -0,0 +1,4 @@
+"""
+CashApp benchmarks
+Run individual scripts with: python -m benchmarks.<name> --help
+"""
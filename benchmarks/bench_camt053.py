@@ -0,0 +1,176 @@
+"""
+CAMT.053 export benchmark
+Writes synthetic day statements of 1k/10k/50k entries with the streaming
+writer and with an element tree (DOM) built in memory and serialized at the
+end. Both run the same document code in app.bai.exports.camt053; only the
+writer differs. Reports wall time, entries/s, file size and (with --memory)
+peak Python memory.
+
+The input rows are produced inside the measurement, so time and memory
+include them:
+    list    all rows of the account in a list, TxsSummry counted from it
+            (the export engine before the totals moved to SQL)
+    stream  rows from a generator with the TxsSummry totals given up front,
+            as run_exports does with Database.get_export_summaries
+The totals for 'stream' are computed outside the measurement, standing in for
+the database query.
+No database is needed: transactions are generated in memory.
+
+Usage:
+    python -m benchmarks.bench_camt053 --sizes 1000 10000 50000
+    python -m benchmarks.bench_camt053 --sizes 10000 --memory --inputs list stream
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from datetime import date
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.bai.exports.camt053 import XMLStream, summarize, write_document
+
+IBAN = 'NL00RABO0123456789'
+DAY = date(2025, 1, 31)
+
+
+class TreeBuilderWriter:
+    """XMLStream interface that builds an ElementTree and writes it on end_document"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._stack = []
+        self.root = None
+
+    def start_document(self):
+        pass
+
+    def end_document(self):
+        ET.indent(self.root)
+        ET.ElementTree(self.root).write(self._stream, encoding='unicode', xml_declaration=True)
+
+    def _append(self, name, attrs):
+        if self._stack:
+            element = ET.SubElement(self._stack[-1], name, attrs or {})
+        else:
+            element = self.root = ET.Element(name, attrs or {})
+        return element
+
+    @contextmanager
+    def element(self, name, attrs=None):
+        self._stack.append(self._append(name, attrs))
+        yield
+        self._stack.pop()
+
+    def leaf(self, name, text, attrs=None):
+        self._append(name, attrs).text = text
+
+
+WRITERS = {'stream': XMLStream, 'dom': TreeBuilderWriter}
+
+
+def synthetic_rows(count, seed=42):
+    """Yield `count` transaction rows shaped like Database.iter_export_transactions"""
+    rng = random.Random(seed)
+    codes = ['100', '541', '586', '625', '2033', '64']
+    for i in range(count):
+        amount = Decimal(rng.randint(-500000, 500000)) / 100
+        yield {
+            'iban': IBAN,
+            'booking_date': DAY,
+            'value_date': DAY,
+            'entry_reference': str(4000000 + i),
+            'transaction_amount': amount,
+            'end_to_end_id': f'E2E-{i:08d}',
+            'batch_entry_reference': None,
+            'instruction_id': None,
+            'payment_information_identification': None,
+            'debtor_iban': f'NL{rng.randint(10, 99)}BANK{rng.randint(10**9, 10**10 - 1)}',
+            'debtor_name': f'Debtor {i % 991}',
+            'creditor_iban': f'NL{rng.randint(10, 99)}BANK{rng.randint(10**9, 10**10 - 1)}',
+            'creditor_name': f'Creditor {i % 977} & Zn',
+            'remittance_information_unstructured': f'Invoice {100000 + i} reservation {rng.randint(10**6, 10**7)}',
+            'purpose_code': None,
+            'rabo_detailed_transaction_type': rng.choice(codes),
+            'acctsvcr_ref': None,
+            'interbank_settlement_date': None,
+            'debtor_agent_bic': 'RABONL2U',
+            'creditor_agent_bic': None,
+        }
+
+
+def synthetic_account(summary):
+    """Account dict whose closing balance matches the day's totals"""
+    return {
+        'iban': IBAN,
+        'owner_name': 'Benchmark account',
+        'currency': 'EUR',
+        'closing_date': DAY,
+        'opening_balance': Decimal('100000.00'),
+        'closing_balance': Decimal('100000.00') + summary['credit_sum'] - summary['debit_sum'],
+    }
+
+
+INPUTS = ('list', 'stream')
+
+
+def run(count, writer, source='list', trace_memory=False):
+    """Write one statement to a temp file; returns a result dict"""
+    # The day's totals, as Database.get_export_summaries would return them
+    summary = summarize(synthetic_rows(count), DAY)
+    account = synthetic_account(summary)
+    if source == 'stream':
+        account['summary'] = summary
+    peak = None
+    with tempfile.TemporaryFile('w+', encoding='utf-8') as output:
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        rows = synthetic_rows(count)
+        transactions = rows if source == 'stream' else list(rows)
+        write_document(WRITERS[writer](output), account, transactions)
+        output.flush()
+        elapsed = time.perf_counter() - start
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        del transactions
+        size = output.seek(0, os.SEEK_END)
+    return {
+        'entries': count,
+        'writer': writer,
+        'input': source,
+        'seconds': round(elapsed, 2),
+        'entries_per_second': round(count / elapsed) if elapsed else 0,
+        'peak_mb': round(peak / 1024 / 1024, 1) if peak is not None else '-',
+        'xml_kb': round(size / 1024),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CAMT.053 export benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--writers', nargs='+', choices=sorted(WRITERS), default=['stream', 'dom'])
+    parser.add_argument('--inputs', nargs='+', choices=INPUTS, default=list(INPUTS),
+                        help='rows as a list or from a generator with the totals given up front')
+    parser.add_argument('--memory', action='store_true', help='trace peak Python memory (several times slower)')
+    args = parser.parse_args()
+
+    print(f"{'Entries':>8} {'Writer':>7} {'Input':>7} {'Seconds':>9} {'Entries/s':>10} {'Peak MB':>8} {'XML KB':>8}")
+    print('-' * 64)
+    for count in args.sizes:
+        for writer in args.writers:
+            for source in args.inputs:
+                r = run(count, writer, source, args.memory)
+                print(f"{r['entries']:>8} {r['writer']:>7} {r['input']:>7} {r['seconds']:>9} "
+                      f"{r['entries_per_second']:>10} {r['peak_mb']:>8} {r['xml_kb']:>8}")
+
+
+if __name__ == '__main__':
+    main()
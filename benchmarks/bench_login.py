@@ -0,0 +1,68 @@
+"""
+Login throughput benchmark
+Measures bcrypt password verifications (logins) per second through the
+PasswordHasher pool for different worker counts and cost factors.
+No database is needed: hashes are generated up front.
+
+Usage:
+    python -m benchmarks.bench_login --rounds 10 12 --workers 1 2 4 --logins 40
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.shared.passwords import PasswordHasher, LoginThrottledError
+
+
+def run(rounds, workers, logins, concurrency):
+    """Verify `logins` passwords with `concurrency` request threads; returns a result dict"""
+    hasher = PasswordHasher(rounds=rounds, workers=workers, max_queue=logins, timeout=600)
+    password = 'correct horse battery staple'
+    password_hash = hasher.hash(password)
+
+    rejected = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as requests:
+        futures = [requests.submit(hasher.verify, password, password_hash) for _ in range(logins)]
+        for future in futures:
+            try:
+                assert future.result()
+            except LoginThrottledError:
+                rejected += 1
+    elapsed = time.perf_counter() - start
+
+    completed = logins - rejected
+    return {
+        'rounds': rounds,
+        'workers': workers,
+        'logins': completed,
+        'rejected': rejected,
+        'seconds': round(elapsed, 3),
+        'logins_per_second': round(completed / elapsed, 2) if elapsed else 0,
+        'logins_per_second_per_worker': round(completed / elapsed / workers, 2) if elapsed else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='bcrypt login throughput benchmark')
+    parser.add_argument('--rounds', type=int, nargs='+', default=[12])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--logins', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=16, help='simulated request threads')
+    args = parser.parse_args()
+
+    print(f"{'Rounds':>6} {'Workers':>8} {'Logins':>7} {'Seconds':>9} {'Logins/s':>9} {'Per worker':>11}")
+    print('-' * 56)
+    for rounds in args.rounds:
+        for workers in args.workers:
+            r = run(rounds, workers, args.logins, args.concurrency)
+            print(f"{r['rounds']:>6} {r['workers']:>8} {r['logins']:>7} {r['seconds']:>9} "
+                  f"{r['logins_per_second']:>9} {r['logins_per_second_per_worker']:>11}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+PDF bank statement benchmark
+Renders synthetic statements of 1k/10k/50k transactions with the chunked
+per-page renderer and, optionally, the old single-table layout, and reports
+wall time, output size and (with --memory) peak Python memory.
+No database is needed: transactions are generated in memory.
+
+Usage:
+    python -m benchmarks.bench_pdf --sizes 1000 10000 50000
+    python -m benchmarks.bench_pdf --sizes 1000 5000 --compare --memory
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.bai.pdf_generator import generate_bank_statement_pdf, ROWS_PER_TABLE
+
+IBAN = 'NL00RABO0123456789'
+
+
+def synthetic_statement(count, seed=42):
+    """Summary dict plus `count` transaction dicts shaped like the bai_db queries"""
+    rng = random.Random(seed)
+    start = date(2025, 1, 1)
+    types = ['SEPA Credit Transfer', 'SEPA Direct Debit', 'Card payment', 'Batch payment']
+    transactions = []
+    for i in range(count):
+        amount = Decimal(rng.randint(-500000, 500000)) / 100
+        day = start + timedelta(days=i * 30 // max(count, 1))
+        transactions.append({
+            'valuedate': day,
+            'processdate': day,
+            'transaction_amount': amount,
+            'rabo_transaction_type_name': rng.choice(types),
+            'rabo_detailed_transaction_type': '',
+            'creditor_iban': f'NL{rng.randint(10, 99)}BANK{rng.randint(10**9, 10**10 - 1)}',
+            'creditor_name': f'Creditor {i % 977}',
+            'debtor_iban': f'NL{rng.randint(10, 99)}BANK{rng.randint(10**9, 10**10 - 1)}',
+            'debtor_name': f'Debtor {i % 991}',
+            'description': f'Invoice {100000 + i} reservation {rng.randint(10**6, 10**7)} park De Eemhof',
+            'end_to_end_id': f'E2E-{i:08d}',
+        })
+    credits = sum(t['transaction_amount'] for t in transactions if t['transaction_amount'] > 0)
+    debits = sum(t['transaction_amount'] for t in transactions if t['transaction_amount'] < 0)
+    summary = {
+        'iban': IBAN,
+        'account_name': 'Benchmark account',
+        'currency': 'EUR',
+        'opening_balance': Decimal('100000.00'),
+        'closing_balance': Decimal('100000.00') + credits + debits,
+        'total_credited': credits,
+        'total_debited': debits,
+        'transaction_count': count,
+        'date_from': start,
+        'date_to': start + timedelta(days=30),
+    }
+    return summary, transactions
+
+
+def run(count, rows_per_table, trace_memory=False):
+    """Render one statement to a temp file; returns a result dict"""
+    summary, transactions = synthetic_statement(count)
+    peak = None
+    with tempfile.TemporaryFile() as output:
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        generate_bank_statement_pdf(summary, transactions, output=output, rows_per_table=rows_per_table)
+        elapsed = time.perf_counter() - start
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        output.seek(0, os.SEEK_END)
+        size = output.tell()
+    return {
+        'transactions': count,
+        'mode': f'chunked/{rows_per_table}' if rows_per_table else 'single table',
+        'seconds': round(elapsed, 2),
+        'rows_per_second': round(count / elapsed) if elapsed else 0,
+        'peak_mb': round(peak / 1024 / 1024, 1) if peak is not None else '-',
+        'pdf_kb': round(size / 1024),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='PDF bank statement benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--rows-per-table', type=int, default=ROWS_PER_TABLE)
+    parser.add_argument('--compare', action='store_true', help='also render with one single table (slow for large sizes)')
+    parser.add_argument('--memory', action='store_true', help='trace peak Python memory (several times slower)')
+    args = parser.parse_args()
+
+    modes = [args.rows_per_table] + ([0] if args.compare else [])
+    print(f"{'Transactions':>12} {'Mode':>14} {'Seconds':>9} {'Rows/s':>8} {'Peak MB':>8} {'PDF KB':>8}")
+    print('-' * 64)
+    for count in args.sizes:
+        for rows_per_table in modes:
+            r = run(count, rows_per_table, args.memory)
+            print(f"{r['transactions']:>12} {r['mode']:>14} {r['seconds']:>9} {r['rows_per_second']:>8} "
+                  f"{r['peak_mb']:>8} {r['pdf_kb']:>8}")
+
+
+if __name__ == '__main__':
+    main()
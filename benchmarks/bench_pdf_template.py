@@ -0,0 +1,121 @@
+"""
+PDF statement template micro-benchmark
+Quantifies what building the StatementTemplate once per process saves per
+statement, and compares format_amount_nl against the plain str.replace
+chain and the previous version with an up-front type check.
+
+Usage:
+    python -m benchmarks.bench_pdf_template --statements 20 --transactions 25 --rounds 3
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+from io import BytesIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.bai.pdf_generator import StatementTemplate, generate_bank_statement_pdf
+from app.shared.formatting import format_amount_nl
+from benchmarks.bench_pdf import synthetic_statement
+
+
+def _replace_format(value):
+    """Original formatter: three chained str.replace calls"""
+    return f"{value:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+
+
+def _checked_replace_format(value):
+    """Earlier format_amount_nl: isinstance check plus three chained str.replace calls"""
+    if value is None:
+        value = 0
+    elif not isinstance(value, (int, float, Decimal)):
+        value = float(value)
+    return f"{value:,.2f}".replace(',', ' ').replace('.', ',').replace(' ', '.')
+
+
+FORMATTERS = (
+    ('str.replace x3', _replace_format),
+    ('checked replace x3', _checked_replace_format),
+    ('format_amount_nl', format_amount_nl),
+)
+
+
+def bench_formatter(count, rounds):
+    """Seconds (best of rounds) to format count Decimal amounts per formatter
+
+    Formatters are interleaved per round and the cyclic GC is paused while timing.
+    """
+    rng = random.Random(1)
+    values = [Decimal(rng.randint(-10**9, 10**9)) / 100 for _ in range(count)]
+    results = {name: float('inf') for name, _ in FORMATTERS}
+    for _ in range(rounds):
+        for name, fn in FORMATTERS:
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                for value in values:
+                    fn(value)
+                results[name] = min(results[name], time.perf_counter() - start)
+            finally:
+                gc.enable()
+    return results
+
+
+def bench_statements(statements, transactions, rounds):
+    """Per-statement seconds (best of rounds) for template build, fresh and shared template
+
+    Fresh and shared runs are interleaved so machine noise hits both alike.
+    """
+    summary, rows = synthetic_statement(transactions)
+    shared = StatementTemplate()
+    build = fresh = reused = float('inf')
+
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(statements):
+            StatementTemplate()
+        build = min(build, (time.perf_counter() - start) / statements)
+
+        start = time.perf_counter()
+        for _ in range(statements):
+            generate_bank_statement_pdf(summary, rows, output=BytesIO(), template=StatementTemplate())
+        fresh = min(fresh, (time.perf_counter() - start) / statements)
+
+        start = time.perf_counter()
+        for _ in range(statements):
+            generate_bank_statement_pdf(summary, rows, output=BytesIO(), template=shared)
+        reused = min(reused, (time.perf_counter() - start) / statements)
+
+    return build, fresh, reused
+
+
+def main():
+    parser = argparse.ArgumentParser(description='PDF statement template micro-benchmark')
+    parser.add_argument('--statements', type=int, default=20)
+    parser.add_argument('--rounds', type=int, default=3, help='best of this many rounds')
+    parser.add_argument('--transactions', type=int, default=25, help='transactions per statement')
+    parser.add_argument('--amounts', type=int, default=200000, help='amounts for the formatter benchmark')
+    args = parser.parse_args()
+
+    formatter = bench_formatter(args.amounts, args.rounds)
+    base = formatter['str.replace x3']
+    print(f"Formatting {args.amounts} amounts, best of {args.rounds}")
+    for name, seconds in formatter.items():
+        print(f"  {name:<18} {seconds * 1000:>9.1f} ms  {seconds / args.amounts * 1e9:>7.0f} ns/amount"
+              f"  {(seconds / base - 1) * 100:>+6.1f}%")
+
+    build, fresh, reused = bench_statements(args.statements, args.transactions, args.rounds)
+    print(f"\n{args.statements} statements of {args.transactions} transactions, best of {args.rounds}")
+    print(f"  template build     {build * 1000:>9.2f} ms")
+    print(f"  fresh template     {fresh * 1000:>9.2f} ms/statement")
+    print(f"  shared template    {reused * 1000:>9.2f} ms/statement")
+    print(f"  saved              {(fresh - reused) * 1000:>9.2f} ms/statement ({(fresh - reused) / fresh * 100:.1f}%)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Reconciliation engine benchmark
+Runs the detailed and daily reconciliation with the SQL and the pandas engine
+(app.bai.reconciliation) for several periods, reports the median time of both
+and checks that they return the same rows. Exits with status 1 when any
+period gives different rows.
+
+Usage:
+    python -m benchmarks.bench_reconciliation
+    python -m benchmarks.bench_reconciliation --days 7 90 365 --repeat 5
+    python -m benchmarks.bench_reconciliation --report detailed --iban NL00RABO0123456789 --show 5
+"""
+import argparse
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.shared.cache import query_cache
+from app.shared.database import Database
+from app.bai.reconciliation import compare_engines
+
+
+def run(days_list, reports=('detailed', 'daily'), iban_filter=None, repeat=3, log=print):
+    """Compare both engines per report and period; returns the result dicts"""
+    query_cache.enabled = False
+    db = Database('bai')
+    results = []
+    try:
+        for report in reports:
+            for days in days_list:
+                runs = [compare_engines(db, report, days, iban_filter) for _ in range(repeat)]
+                result = runs[-1]
+                result['sql_ms'] = round(statistics.median(r['sql_seconds'] for r in runs) * 1000, 1)
+                result['pandas_ms'] = round(statistics.median(r['pandas_seconds'] for r in runs) * 1000, 1)
+                results.append(result)
+                speedup = result['sql_ms'] / result['pandas_ms'] if result['pandas_ms'] else 0
+                log(f"{report:<9} {days:>5}d {result['sql_rows']:>8} rows "
+                    f"{result['sql_ms']:>10} ms sql {result['pandas_ms']:>10} ms pandas "
+                    f"{speedup:>6.1f}x {'equal' if result['equal'] else 'DIFFERENT'}")
+        return results
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the SQL and pandas reconciliation engines')
+    parser.add_argument('--days', type=int, nargs='+', default=[7, 90, 365], help='periods in days')
+    parser.add_argument('--report', choices=['detailed', 'daily'], nargs='+', default=['detailed', 'daily'])
+    parser.add_argument('--iban', help='only this IBAN')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per period (median is reported)')
+    parser.add_argument('--show', type=int, default=10, help='differing rows to print per period')
+    args = parser.parse_args()
+
+    results = run(args.days, args.report, args.iban, args.repeat)
+    different = [r for r in results if not r['equal']]
+    for result in different:
+        print(f"\n{result['report']} {result['days']}d: {result['difference_count']} rows differ "
+              f"({result['sql_rows']} sql, {result['pandas_rows']} pandas)")
+        for engine, row in result['differences'][:args.show]:
+            print(f"  only {engine}: {row}")
+    sys.exit(1 if different else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""
+Row mode benchmark
+Compares the result row modes of execute_query (app.shared.rows): RealDictRow
+dicts, compact Row tuples and a column-oriented ColumnBatch. For every mode it
+reports the time to build the result from fetched value tuples, the memory the
+result keeps alive, and the time to render it with Jinja and serialize it to
+JSON. By default the rows are synthetic transaction rows (13 columns, as
+get_transaction_details) and the memory is that of the row containers only,
+since the values are the same objects in every mode. With --db the real
+queries run against the database and build time and memory include the
+query and the values.
+
+Usage:
+    python -m benchmarks.bench_rows --rows 10000 50000
+    python -m benchmarks.bench_rows --db --repeat 5
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from jinja2 import Environment
+from psycopg2.extras import RealDictRow
+
+from app.shared.rows import ROW_MODES, convert_rows, rows_to_json
+
+FIELDS = (
+    'booking_date', 'iban', 'transaction_amount', 'creditor_iban', 'creditor_name', 'debtor_iban',
+    'debtor_name', 'remittance_information_unstructured', 'rabo_detailed_transaction_type',
+    'rabo_transaction_type_name', 'entry_reference', 'end_to_end_id', 'created_at'
+)
+
+# Same attribute access pattern as transaction_details.html
+TEMPLATE = Environment().from_string(
+    '{% for tx in rows %}{{ tx.booking_date }}|{{ tx.iban }}|{{ tx.transaction_amount }}|'
+    '{{ tx.debtor_name or tx.creditor_name }}|{{ tx.remittance_information_unstructured }}|'
+    '{{ tx.rabo_transaction_type_name }}|{{ tx.end_to_end_id }}\n{% endfor %}'
+)
+
+_Column = namedtuple('_Column', 'name')
+
+
+def synthetic_rows(count, seed=42):
+    """Value tuples shaped like the rows of get_transaction_details"""
+    rng = random.Random(seed)
+    start = date(2025, 1, 1)
+    rows = []
+    for i in range(count):
+        day = start + timedelta(days=i % 365)
+        rows.append((
+            day,
+            f'NL{10 + i % 90}RABO0{rng.randint(10**8, 10**9 - 1)}',
+            Decimal(rng.randint(-500000, 500000)) / 100,
+            f'NL{rng.randint(10, 99)}BANK{rng.randint(10**9, 10**10 - 1)}',
+            f'Creditor {i % 977}',
+            f'NL{rng.randint(10, 99)}BANK{rng.randint(10**9, 10**10 - 1)}',
+            f'Debtor {i % 991}',
+            f'Invoice {100000 + i} reservation {rng.randint(10**6, 10**7)}',
+            'SEPA',
+            'SEPA Credit Transfer',
+            f'{rng.getrandbits(64):016x}',
+            f'E2E-{i:08d}',
+            datetime(day.year, day.month, day.day, 6, 30),
+        ))
+    return rows
+
+
+def build(rows, fields, row_mode):
+    """Result of one row mode from fetched value tuples, as the cursor would return it"""
+    if row_mode == 'dict':
+        return [RealDictRow(zip(fields, values)) for values in rows]
+    return convert_rows(rows, [_Column(name) for name in fields], row_mode)
+
+
+def measure(make, repeat):
+    """Median seconds of make() plus the memory its result keeps alive"""
+    timings = [_timed(make) for _ in range(repeat)]
+    gc.collect()
+    tracemalloc.start()
+    result = make()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, statistics.median(timings), retained
+
+
+def run_mode(make, repeat):
+    """Timings and memory of one row mode"""
+    result, build_seconds, retained = measure(make, repeat)
+    render = statistics.median(_timed(lambda: TEMPLATE.render(rows=result)) for _ in range(repeat))
+    to_json = statistics.median(_timed(lambda: json.dumps(rows_to_json(result), default=str)) for _ in range(repeat))
+    return {
+        'rows': len(result),
+        'build_ms': round(build_seconds * 1000, 1),
+        'memory_kb': retained // 1024,
+        'render_ms': round(render * 1000, 1),
+        'json_ms': round(to_json * 1000, 1),
+    }
+
+
+def _timed(fn):
+    """Seconds of one fn() call with the cyclic GC paused, as timeit does"""
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        fn()
+        return time.perf_counter() - started
+    finally:
+        gc.enable()
+
+
+def report(name, results):
+    base = results['dict']
+    print(f"\n{name}")
+    print(f"{'Mode':<8} {'Rows':>8} {'Build':>10} {'Memory':>12} {'Render':>10} {'JSON':>10}")
+    for mode, r in results.items():
+        ratio = f" ({r['memory_kb'] / base['memory_kb']:.0%})" if base['memory_kb'] else ''
+        print(f"{mode:<8} {r['rows']:>8} {r['build_ms']:>8} ms {r['memory_kb']:>8} KB{ratio:<7} "
+              f"{r['render_ms']:>7} ms {r['json_ms']:>7} ms")
+
+
+def run_synthetic(sizes, repeat):
+    for count in sizes:
+        rows = synthetic_rows(count)
+        results = {mode: run_mode(lambda: build(rows, FIELDS, mode), repeat) for mode in ROW_MODES}
+        report(f"Synthetic transaction rows ({count} x {len(FIELDS)} columns)", results)
+
+
+def run_database(repeat):
+    """Run the opt-in query methods against the database in every row mode"""
+    from app.shared.cache import query_cache
+    from app.shared.database import Database
+    from app.recon.database import ReconDatabase
+
+    query_cache.enabled = False
+    bai = Database('bai')
+    recon = ReconDatabase()
+    cases = [
+        ('get_transaction_details[365d]', lambda mode: bai.get_transaction_details(days=365, row_mode=mode)),
+        ('get_detailed_reconciliation[90d]', lambda mode: bai.get_detailed_reconciliation(days=90, row_mode=mode)),
+        ('get_worldline_payments[10k]', lambda mode: recon.get_worldline_payments(limit=10000, row_mode=mode)),
+    ]
+    try:
+        for name, fetch in cases:
+            try:
+                results = {mode: run_mode(lambda: fetch(mode), repeat) for mode in ROW_MODES}
+            except Exception as e:
+                print(f"Warning: {name} failed: {e}")
+                bai.close()
+                recon.close()
+                continue
+            report(name, results)
+    finally:
+        bai.close()
+        recon.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare dict, tuple and columnar query result rows')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 50000], help='synthetic row counts')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per mode (median is reported)')
+    parser.add_argument('--db', action='store_true', help='run the real queries instead of synthetic rows')
+    args = parser.parse_args()
+
+    if args.db:
+        run_database(args.repeat)
+    else:
+        run_synthetic(args.rows, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,353 @@
+"""
+Database benchmark suite
+Times every public query method of Database (BAI) and ReconDatabase, the
+Worldline CSV importer and the PDF bank statement generator against the data
+of benchmarks.datagen, with the query cache disabled. Results can be written
+as JSON and compared against an earlier run (e.g. from the main branch).
+
+Usage:
+    python -m benchmarks.datagen --scale medium --reset
+    python -m benchmarks.bench_suite --repeat 5 --output main.json
+    python -m benchmarks.bench_suite --repeat 5 --output branch.json --compare main.json
+    python -m benchmarks.bench_suite --only get_detailed_reconciliation get_export_audit_page
+"""
+import argparse
+import contextlib
+import inspect
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.shared.cache import query_cache
+from app.shared.database import Database
+from app.recon.database import ReconDatabase
+from app.recon.data_import import WorldlineCSVImporter
+from app.bai.pdf_generator import generate_bank_statement_pdf
+from benchmarks.datagen import write_worldline_csv
+
+# Plumbing and write methods that have no case of their own
+SKIPPED_METHODS = {'connect', 'close', 'execute_query', 'execute_update', 'iter_query', 'explain', 'log_exports'}
+
+# Changes within this fraction of the baseline are reported as unchanged
+NOISE = 0.05
+
+
+def _count(result):
+    """Row count of a method result (list, (rows, has_more) page, dict or scalar)"""
+    if isinstance(result, tuple) and result and isinstance(result[0], list):
+        return len(result[0])
+    if isinstance(result, (list, dict)):
+        return len(result)
+    return 1 if result is not None else 0
+
+
+def bai_cases(db, ibans, last_day):
+    """(name, method, callable) per benchmark case of the BAI Database"""
+    iban = ibans[0]
+    month_start = last_day.replace(day=1) if last_day.day > 1 else (last_day - timedelta(days=1)).replace(day=1)
+    quarter_ago = last_day - timedelta(days=89)
+    year_ago = last_day - timedelta(days=364)
+    return [
+        ('get_transaction_summary[7d]', 'get_transaction_summary', lambda: db.get_transaction_summary(days=7)),
+        ('get_transaction_summary[365d]', 'get_transaction_summary', lambda: db.get_transaction_summary(days=365)),
+        ('get_transaction_summary[iban]', 'get_transaction_summary',
+         lambda: db.get_transaction_summary(days=30, iban_filter=iban)),
+        ('get_balance_data[7d]', 'get_balance_data', lambda: db.get_balance_data(days=7)),
+        ('get_balance_data[365d]', 'get_balance_data', lambda: db.get_balance_data(days=365)),
+        ('get_account_list', 'get_account_list', db.get_account_list),
+        ('get_transaction_types[30d]', 'get_transaction_types', lambda: db.get_transaction_types(days=30)),
+        ('get_data_quality_status[7d]', 'get_data_quality_status', lambda: db.get_data_quality_status(days=7)),
+        ('get_data_quality_status[90d]', 'get_data_quality_status', lambda: db.get_data_quality_status(days=90)),
+        ('get_daily_reconciliation[7d]', 'get_daily_reconciliation', lambda: db.get_daily_reconciliation(days=7)),
+        ('get_daily_reconciliation[day]', 'get_daily_reconciliation',
+         lambda: db.get_daily_reconciliation(target_date=last_day)),
+        ('get_missing_days[30d]', 'get_missing_days', lambda: db.get_missing_days(days=30)),
+        ('get_missing_days[365d]', 'get_missing_days', lambda: db.get_missing_days(days=365)),
+        ('get_detailed_reconciliation[7d]', 'get_detailed_reconciliation',
+         lambda: db.get_detailed_reconciliation(days=7)),
+        ('get_detailed_reconciliation[90d]', 'get_detailed_reconciliation',
+         lambda: db.get_detailed_reconciliation(days=90)),
+        ('get_detailed_reconciliation[365d page]', 'get_detailed_reconciliation',
+         lambda: db.get_detailed_reconciliation(days=365, status='MAJOR_DIFF', limit=500, offset=500)),
+        ('get_reconciliation_summary[365d]', 'get_reconciliation_summary',
+         lambda: db.get_reconciliation_summary(days=365)),
+        ('get_reconciliation_ibans', 'get_reconciliation_ibans', db.get_reconciliation_ibans),
+        ('get_closing_balance_cents[90d]', 'get_closing_balance_cents',
+         lambda: db.get_closing_balance_cents(quarter_ago, last_day)),
+        ('get_balance_minimum_cents[90d]', 'get_balance_minimum_cents',
+         lambda: db.get_balance_minimum_cents(quarter_ago)),
+        ('get_daily_transaction_cents[90d]', 'get_daily_transaction_cents',
+         lambda: db.get_daily_transaction_cents(quarter_ago, last_day)),
+        ('get_audit_pivot[90d]', 'get_audit_pivot', lambda: db.get_audit_pivot(quarter_ago, last_day)),
+        ('get_transaction_details[7d]', 'get_transaction_details', lambda: db.get_transaction_details(days=7)),
+        ('get_transaction_details[filtered]', 'get_transaction_details',
+         lambda: db.get_transaction_details(days=90, iban_filter=iban, amount_min=100, counterparty_filter='Relation 1')),
+        ('get_bank_statement_summary[month]', 'get_bank_statement_summary',
+         lambda: db.get_bank_statement_summary(iban, month_start, last_day)),
+        ('get_bank_statement_summary[year]', 'get_bank_statement_summary',
+         lambda: db.get_bank_statement_summary(iban, year_ago, last_day)),
+        ('get_bank_statement_transactions[month]', 'get_bank_statement_transactions',
+         lambda: db.get_bank_statement_transactions(iban, month_start, last_day)),
+        ('get_bank_statement_transactions[year]', 'get_bank_statement_transactions',
+         lambda: db.get_bank_statement_transactions(iban, year_ago, last_day)),
+        ('get_bank_statement_fingerprint[year]', 'get_bank_statement_fingerprint',
+         lambda: db.get_bank_statement_fingerprint(iban, year_ago, last_day)),
+        ('get_bank_statement_summaries[all]', 'get_bank_statement_summaries',
+         lambda: db.get_bank_statement_summaries(ibans, month_start, last_day)),
+        ('get_bank_statement_transactions_for_ibans[all]', 'get_bank_statement_transactions_for_ibans',
+         lambda: db.get_bank_statement_transactions_for_ibans(ibans, month_start, last_day)),
+        ('get_export_configs', 'get_export_configs', db.get_export_configs),
+        ('get_export_balances[all]', 'get_export_balances', lambda: db.get_export_balances(ibans, last_day)),
+        ('iter_export_transactions[all]', 'iter_export_transactions',
+         lambda: list(db.iter_export_transactions(ibans, last_day))),
+        ('get_export_audit_page[first]', 'get_export_audit_page', lambda: db.get_export_audit_page()),
+        ('get_export_audit_page[iban]', 'get_export_audit_page',
+         lambda: db.get_export_audit_page(iban=iban, export_format='MT940', date_from=year_ago)),
+        ('get_export_audit_summary', 'get_export_audit_summary', lambda: db.get_export_audit_summary()),
+        ('get_export_filter_values', 'get_export_filter_values', db.get_export_filter_values),
+    ]
+
+
+def recon_cases(db, first_day, last_day):
+    """(name, method, callable) per benchmark case of the ReconDatabase"""
+    week_ago = last_day - timedelta(days=6)
+    sample = db.get_worldline_payments(start_date=last_day, end_date=last_day, limit=1)
+    payment_id, paydate = (sample[0]['id'], sample[0]['paydate']) if sample else ('0', last_day)
+    return [
+        ('get_worldline_payments[page1]', 'get_worldline_payments',
+         lambda: db.get_worldline_payments(start_date=first_day, end_date=last_day)),
+        ('get_worldline_payments[deep]', 'get_worldline_payments',
+         lambda: db.get_worldline_payments(start_date=first_day, end_date=last_day, offset=10000)),
+        ('get_worldline_payments[filtered]', 'get_worldline_payments',
+         lambda: db.get_worldline_payments(start_date=week_ago, end_date=last_day, brand='VISA', country='BE',
+                                           amount_min=50)),
+        ('get_worldline_payment_count[all]', 'get_worldline_payment_count',
+         lambda: db.get_worldline_payment_count(start_date=first_day, end_date=last_day)),
+        ('get_worldline_payment_count[filtered]', 'get_worldline_payment_count',
+         lambda: db.get_worldline_payment_count(start_date=week_ago, end_date=last_day, brand='VISA')),
+        ('get_worldline_summary_stats[30d]', 'get_worldline_summary_stats', lambda: db.get_worldline_summary_stats(30)),
+        ('get_daily_volume[30d]', 'get_daily_volume', lambda: db.get_daily_volume(30)),
+        ('get_daily_volume[365d]', 'get_daily_volume', lambda: db.get_daily_volume(365)),
+        ('get_brand_breakdown[30d]', 'get_brand_breakdown', lambda: db.get_brand_breakdown(30)),
+        ('get_merchant_breakdown[30d]', 'get_merchant_breakdown', lambda: db.get_merchant_breakdown(30)),
+        ('get_country_breakdown[30d]', 'get_country_breakdown', lambda: db.get_country_breakdown(30)),
+        ('get_payment_details', 'get_payment_details', lambda: db.get_payment_details(payment_id, paydate)),
+        ('search_payments[ref]', 'search_payments', lambda: db.search_payments('RES1234')),
+        ('get_unmatched_worldline_payments[7d]', 'get_unmatched_worldline_payments',
+         lambda: db.get_unmatched_worldline_payments(week_ago, last_day)),
+        ('get_reconciliation_exceptions', 'get_reconciliation_exceptions', db.get_reconciliation_exceptions),
+        ('get_reconciliation_summary[all]', 'get_reconciliation_summary',
+         lambda: db.get_reconciliation_summary(first_day, last_day)),
+        ('get_import_history', 'get_import_history', db.get_import_history),
+        ('get_import_stats', 'get_import_stats', db.get_import_stats),
+        ('get_data_sources', 'get_data_sources', db.get_data_sources),
+        ('get_reconciliation_rules', 'get_reconciliation_rules', db.get_reconciliation_rules),
+        ('get_partition_info', 'get_partition_info', db.get_partition_info),
+        ('get_data_date_range', 'get_data_date_range', db.get_data_date_range),
+    ]
+
+
+def uncovered_methods(db, cases):
+    """Public methods of db without a benchmark case"""
+    covered = {method for _, method, _ in cases}
+    public = {name for name, _ in inspect.getmembers(type(db), inspect.isfunction) if not name.startswith('_')}
+    return sorted(public - covered - SKIPPED_METHODS)
+
+
+def data_range(bai):
+    """IBANs and first/last booking date of the generated data set"""
+    ibans = [row['iban'] for row in bai.get_account_list()]
+    dates = bai.execute_query(
+        "SELECT MIN(booking_date) AS first_day, MAX(booking_date) AS last_day "
+        "FROM rpa_data.bai_rabobank_transactions"
+    )[0]
+    if not ibans or not dates['last_day']:
+        raise SystemExit("No benchmark data found; run python -m benchmarks.datagen first")
+    return ibans, dates['first_day'], dates['last_day']
+
+
+def time_case(fn, repeat):
+    """Run fn `repeat` times; returns timings in ms and the row count of the last run"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'min_ms': round(min(timings), 2),
+        'median_ms': round(statistics.median(timings), 2),
+        'max_ms': round(max(timings), 2),
+        'rows': _count(result),
+    }
+
+
+def bench_importer(rows, last_day, repeat):
+    """Time read_csv and import_records on a generated Worldline file, then remove the rows again
+
+    import_file is not timed as a whole: it unpacks the dict of import_records
+    into three values and fails after the import.
+    """
+    importer = WorldlineCSVImporter()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = write_worldline_csv(os.path.join(tmpdir, 'bench_worldline.csv'), rows, last_day)
+        source_file = os.path.basename(path)
+        results['importer.read_csv'] = time_case(lambda: importer.read_csv(path)[0], repeat)
+        records, _ = importer.read_csv(path)
+        timings = []
+        try:
+            for _ in range(repeat):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    importer.import_records([dict(r) for r in records], source_file=source_file)
+                    timings.append((time.perf_counter() - start) * 1000)
+                # Later repeats would only hit duplicates
+                conn = importer.connect()
+                with conn.cursor() as cur:
+                    cur.execute(f"DELETE FROM {importer.schema}.recon_worldline_payments WHERE source_file = %s",
+                                (source_file,))
+                conn.commit()
+        finally:
+            importer.close()
+        results['importer.import_records'] = {
+            'min_ms': round(min(timings), 2),
+            'median_ms': round(statistics.median(timings), 2),
+            'max_ms': round(max(timings), 2),
+            'rows': len(records),
+        }
+    return results
+
+
+def bench_pdf(db, iban, last_day, repeat):
+    """Time a year of one IBAN rendered as a PDF bank statement"""
+    date_from = last_day - timedelta(days=364)
+    summary = db.get_bank_statement_summary(iban, date_from, last_day)[0]
+    transactions = db.get_bank_statement_transactions(iban, date_from, last_day)
+
+    def render():
+        with tempfile.TemporaryFile() as output:
+            generate_bank_statement_pdf(summary, transactions, output=output)
+        return transactions
+
+    return {'pdf.generate_bank_statement_pdf[year]': time_case(render, repeat)}
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       cwd=os.path.dirname(__file__), stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def collect_meta(bai, recon):
+    """Environment and data set description stored with the results"""
+    counts = {}
+    for db, tables in ((bai, ['bai_rabobank_transactions', 'bai_rabobank_balances', 'bai_api_audit_log',
+                              'bai_exports_audit_log']),
+                       (recon, ['recon_worldline_payments'])):
+        for table in tables:
+            counts[table] = db.execute_query(f"SELECT COUNT(*) AS n FROM rpa_data.{table}")[0]['n']
+    return {
+        'at': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'postgres': bai.execute_query("SHOW server_version")[0]['server_version'],
+        'rows': counts,
+    }
+
+
+def run(repeat=3, only=None, importer_rows=5000, include_pdf=True, log=print):
+    """Run all cases; returns {'meta': ..., 'results': {case: timings}}"""
+    query_cache.enabled = False
+    bai = Database('bai')
+    recon = ReconDatabase()
+    try:
+        ibans, first_day, last_day = data_range(bai)
+
+        cases = bai_cases(bai, ibans, last_day)
+        for name in uncovered_methods(bai, cases):
+            print(f"Warning: Database.{name} has no benchmark case")
+        rcases = recon_cases(recon, first_day, last_day)
+        for name in uncovered_methods(recon, rcases):
+            print(f"Warning: ReconDatabase.{name} has no benchmark case")
+
+        results = {}
+        for name, _, fn in cases + rcases:
+            if only and not any(o in name for o in only):
+                continue
+            try:
+                results[name] = time_case(fn, repeat)
+            except Exception as e:
+                print(f"Warning: {name} failed: {e}")
+                bai.close()
+                recon.close()
+                continue
+            log(f"{name:<50} {results[name]['median_ms']:>10} ms {results[name]['rows']:>8} rows")
+
+        extra = {}
+        if importer_rows and (not only or any('importer' in o for o in only)):
+            extra.update(bench_importer(importer_rows, last_day, repeat))
+        if include_pdf and (not only or any('pdf' in o for o in only)):
+            extra.update(bench_pdf(bai, ibans[0], last_day, repeat))
+        for name, timing in extra.items():
+            log(f"{name:<50} {timing['median_ms']:>10} ms {timing['rows']:>8} rows")
+        results.update(extra)
+
+        meta = collect_meta(bai, recon)
+        meta.update({'repeat': repeat, 'ibans': len(ibans), 'first_day': first_day.isoformat(),
+                     'last_day': last_day.isoformat()})
+        return {'meta': meta, 'results': results}
+    finally:
+        bai.close()
+        recon.close()
+
+
+def compare(current, baseline):
+    """Print median deltas against a baseline run"""
+    print(f"\n{'Case':<50} {'Baseline':>10} {'Current':>10} {'Delta':>8}")
+    print('-' * 82)
+    for name, timing in current['results'].items():
+        before = baseline['results'].get(name)
+        if not before:
+            print(f"{name:<50} {'-':>10} {timing['median_ms']:>10} {'new':>8}")
+            continue
+        change = (timing['median_ms'] - before['median_ms']) / before['median_ms'] if before['median_ms'] else 0
+        marker = '' if abs(change) < NOISE else (' slower' if change > 0 else ' faster')
+        print(f"{name:<50} {before['median_ms']:>10} {timing['median_ms']:>10} {change:>+8.0%}{marker}")
+    if baseline['meta'].get('rows') != current['meta'].get('rows'):
+        print("Warning: baseline was run on a different data set, deltas are not comparable")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Database/ReconDatabase methods, importer and PDF')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per case (median is reported)')
+    parser.add_argument('--only', nargs='+', help='only cases whose name contains one of these')
+    parser.add_argument('--importer-rows', type=int, default=5000, help='rows in the importer file, 0 to skip')
+    parser.add_argument('--no-pdf', action='store_true', help='skip the PDF generator')
+    parser.add_argument('--output', help='write the results as JSON')
+    parser.add_argument('--compare', metavar='BASELINE', help='JSON of an earlier run to compare against')
+    args = parser.parse_args()
+
+    current = run(args.repeat, args.only, args.importer_rows, not args.no_pdf)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2, default=str)
+        print(f"Results written to {args.output}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(current, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
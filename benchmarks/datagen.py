@@ -0,0 +1,438 @@
+"""
+Synthetic BAI and Worldline data for the benchmark suite
+Fills a local PostgreSQL database (the BAI_DB_* and RECON_DB_* settings,
+both may point at the same database) with production-shaped data: per IBAN
+and day the bai_api_audit_log calls, closing/interim/expected balances and
+transactions, export configs with their audit log, and Worldline payments.
+Generation is deterministic for a given scale and seed, so runs on different
+machines or branches see the same data; the last generated day is yesterday,
+so the "last N days" queries of the app find data.
+
+Loads with COPY and refuses non-local database hosts unless --allow-remote.
+
+Usage:
+    python -m benchmarks.datagen --scale small --reset
+    python -m benchmarks.datagen --scale large --reset
+    python -m benchmarks.datagen --ibans 100 --days 365 --transactions-per-day 60 --reset
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+from config.config import Config
+from database.partition_manager import add_months, create_month_partition
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+BAI_SCHEMA_FILE = os.path.join(os.path.dirname(__file__), 'schema.sql')
+RECON_SCHEMA_FILE = os.path.join(ROOT, 'Archive', 'Recon_Tool', 'database', '01_create_schema.sql')
+
+# Transactions per day are per IBAN; payments per day are Worldline payments in total
+SCALES = {
+    'small': {'ibans': 5, 'days': 30, 'transactions_per_day': 20, 'payments_per_day': 200},
+    'medium': {'ibans': 25, 'days': 180, 'transactions_per_day': 40, 'payments_per_day': 1000},
+    'large': {'ibans': 100, 'days': 365, 'transactions_per_day': 60, 'payments_per_day': 3000},
+}
+
+BAI_TABLES = ['bai_rabobank_transactions', 'bai_rabobank_balances', 'bai_api_audit_log',
+              'bai_rabobank_account_info', 'bai_exports', 'bai_exports_audit_log']
+RECON_TABLES = ['recon_worldline_payments', 'recon_worldline_payments_archive', 'recon_reconciliation_matches',
+                'recon_reconciliation_exceptions', 'recon_reconciliation_rules', 'recon_file_import_log',
+                'recon_data_sources']
+
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '::1', '')
+
+# Days on which an IBAN has no successful API call (shows up as missing) and
+# days whose closing balance does not match opening + transactions
+MISSING_DAY_RATE = 0.005
+RETRY_RATE = 0.02
+MISMATCH_RATE = 0.005
+
+TRANSACTION_TYPES = [
+    # (rabo_detailed_transaction_type, rabo_transaction_type_name, bank_transaction_code, sign)
+    ('100', 'ba', 'PMNT-RCDT-ESCT', 1),
+    ('541', 'db', 'PMNT-ICDT-ESCT', -1),
+    ('544', 'db', 'PMNT-ICDT-ESCT', -1),
+    ('586', 'id', 'PMNT-RDDT-ESDD', -1),
+    ('2065', 'cb', 'PMNT-CCRD-POSD', 1),
+    ('93', 'tb', 'PMNT-ICDT-BOOK', -1),
+]
+TRANSACTION_TYPE_WEIGHTS = [45, 20, 5, 15, 10, 5]
+BRANDS = ['VISA', 'MasterCard', 'iDEAL', 'Bancontact', 'American Express', 'PayPal', 'Maestro']
+BRAND_WEIGHTS = [30, 25, 25, 8, 4, 5, 3]
+COUNTRIES = ['NL', 'BE', 'DE', 'FR', 'GB', 'LU']
+COUNTRY_WEIGHTS = [55, 20, 15, 5, 3, 2]
+PARKS = ['De Eemhof', 'Het Heijderbos', 'Port Zelande', 'De Kempervennen', 'Park Allgau', 'Erperheide']
+EXPORT_FORMATS = [('MT940', 'Autobank', '.sta'), ('CAMT053', 'Globes', '.xml')]
+
+
+def make_iban(number, bank='RABO', country='NL'):
+    """Valid (mod-97) IBAN for an account number"""
+    account = f'{number:010d}'
+    digits = ''.join(str(int(ch, 36)) for ch in f'{bank}{account}{country}00')
+    return f'{country}{98 - int(digits) % 97:02d}{bank}{account}'
+
+
+def scale_settings(scale=None, **overrides):
+    settings = dict(SCALES[scale or 'small'])
+    settings.update({key: value for key, value in overrides.items() if value is not None})
+    return settings
+
+
+def check_local(allow_remote=False):
+    hosts = {Config.BAI_DB_HOST, Config.RECON_DB_HOST}
+    remote = [host for host in hosts if host not in LOCAL_HOSTS]
+    if remote and not allow_remote:
+        raise SystemExit(f"Refusing to write benchmark data to {', '.join(remote)}; "
+                         f"point BAI_DB_HOST/RECON_DB_HOST at a local database or pass --allow-remote")
+
+
+def copy_rows(cur, table, columns, rows, chunk_size=50000):
+    """COPY rows (iterable of tuples) into table in chunks; returns the row count"""
+    statement = f"COPY rpa_data.{table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    total = 0
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    pending = 0
+    for row in rows:
+        writer.writerow(['' if value is None else value for value in row])
+        pending += 1
+        if pending >= chunk_size:
+            buffer.seek(0)
+            cur.copy_expert(statement, buffer)
+            total += pending
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        buffer.seek(0)
+        cur.copy_expert(statement, buffer)
+        total += pending
+    return total
+
+
+def _months(first_day, last_day):
+    month = first_day.replace(day=1)
+    while month <= last_day:
+        yield month
+        month = add_months(month, 1)
+
+
+def _counterparty(rng, index):
+    number = rng.randint(0, 4999)
+    return make_iban(900000 + number, bank=rng.choice(['INGB', 'ABNA', 'RABO', 'SNSB'])), f'Relation {number:04d} B.V.'
+
+
+# ---------------------------------------------------------------------------
+# BAI data
+# ---------------------------------------------------------------------------
+
+def bai_day(rng, iban, day, opening, transactions_per_day):
+    """Audit log calls, balances and transactions of one IBAN for one day
+
+    Returns:
+        tuple: (audit rows, balance rows, transaction rows, closing balance)
+    """
+    retrieved = datetime.combine(day + timedelta(days=1), datetime.min.time(), timezone.utc) + \
+        timedelta(hours=5, minutes=rng.randint(0, 59), seconds=rng.randint(0, 59))
+    audit, balances, transactions = [], [], []
+
+    if rng.random() < MISSING_DAY_RATE:
+        for endpoint in ('balances', 'transactions'):
+            audit.append((uuid.UUID(int=rng.getrandbits(128)), 1, retrieved, 'Rabobank', endpoint, 'GET', 503,
+                          rng.randint(5000, 30000), 'robot', None, 'Service unavailable', day, iban))
+        return audit, balances, transactions, opening
+
+    calls = {}
+    for endpoint in ('balances', 'transactions'):
+        call_id = uuid.UUID(int=rng.getrandbits(128))
+        attempt = 1
+        if rng.random() < RETRY_RATE:
+            audit.append((call_id, 1, retrieved, 'Rabobank', endpoint, 'GET', 500,
+                          rng.randint(1000, 30000), 'robot', call_id, 'Internal server error', day, iban))
+            attempt = 2
+        audit.append((call_id, attempt, retrieved + timedelta(seconds=attempt * 3), 'Rabobank', endpoint, 'GET',
+                      200, rng.randint(80, 2500), 'robot', call_id, None, day, iban))
+        calls[endpoint] = (call_id, attempt)
+
+    count = max(0, int(rng.gauss(transactions_per_day, transactions_per_day / 4)))
+    balance = opening
+    tx_id, tx_attempt = calls['transactions']
+    for index in range(count):
+        code, type_name, bank_code, sign = rng.choices(TRANSACTION_TYPES, TRANSACTION_TYPE_WEIGHTS)[0]
+        amount = Decimal(sign * int(rng.lognormvariate(9, 1.4))) / 100
+        balance += amount
+        counter_iban, counter_name = _counterparty(rng, index)
+        booked = datetime.combine(day, datetime.min.time(), timezone.utc) + \
+            timedelta(seconds=rng.randint(6 * 3600, 22 * 3600))
+        reference = f'{day:%Y%m%d}{iban[-6:]}{index:05d}'
+        debtor = (counter_iban, counter_name) if amount > 0 else (iban, 'Account holder')
+        creditor = (iban, 'Account holder') if amount > 0 else (counter_iban, counter_name)
+        transactions.append((
+            str(tx_id), tx_attempt, iban, 'EUR', day, reference, amount, 'EUR', bank_code, day,
+            f'E2E{reference}', f'BATCH{day:%Y%m%d}{index // 50:03d}' if code == '541' else None,
+            f'ACCT{reference}', f'INSTR{reference}', day,
+            debtor[0], debtor[1], 'RABONL2U', creditor[0], creditor[1], 'INGBNL2A',
+            f'NL{rng.randint(10, 99)}ZZZ{rng.randint(10**9, 10**10 - 1)}' if code == '586' else None,
+            f'MNDT{rng.randint(1, 20000):06d}' if code == '586' else None,
+            f'Reservation {rng.randint(10**6, 10**7 - 1)} {rng.choice(PARKS)} invoice {100000 + index}',
+            booked, code, type_name, balance, 'EUR', 'InterimBooked', retrieved,
+        ))
+
+    closing = balance
+    if rng.random() < MISMATCH_RATE:
+        closing += Decimal(rng.randint(-10000, 10000)) / 100
+    bal_id, bal_attempt = calls['balances']
+    for balance_type, amount in (('closingBooked', closing), ('interimBooked', closing),
+                                 ('expected', closing + Decimal(rng.randint(-50000, 50000)) / 100)):
+        balances.append((str(uuid.UUID(int=rng.getrandbits(128))), str(bal_id), bal_attempt, iban, 'EUR',
+                         balance_type, amount, day, retrieved, retrieved))
+    return audit, balances, transactions, closing
+
+
+AUDIT_COLUMNS = ['id', 'attempt_nr', '"timestamp"', 'bank', 'endpoint', 'http_method', 'response_status',
+                 'response_time_ms', 'caller_id', 'correlation_id', 'error_message', 'closingdate', 'iban']
+BALANCE_COLUMNS = ['id', 'audit_id', 'attempt_nr', 'iban', 'currency', 'balance_type', 'amount',
+                   'reference_date', 'last_change_datetime', 'retrieved_at']
+TRANSACTION_COLUMNS = [
+    'audit_id', 'attempt_nr', 'iban', 'currency', 'booking_date', 'entry_reference', 'transaction_amount',
+    'transaction_currency', 'bank_transaction_code', 'value_date', 'end_to_end_id', 'batch_entry_reference',
+    'acctsvcr_ref', 'instruction_id', 'interbank_settlement_date', 'debtor_iban', 'debtor_name',
+    'debtor_agent_bic', 'creditor_iban', 'creditor_name', 'creditor_agent_bic', 'creditor_id', 'mandate_id',
+    'remittance_information_unstructured', 'rabo_booking_datetime', 'rabo_detailed_transaction_type',
+    'rabo_transaction_type_name', 'balance_after_booking_amount', 'balance_after_booking_currency',
+    'balance_after_booking_type', 'retrieved_at',
+]
+EXPORT_AUDIT_COLUMNS = ['"timestamp"', 'bank', 'iban', 'destination', 'export_format', 'closingdate', 'filename',
+                        'outputfilepath', 'record_count', 'success', 'error_message', 'caller_id',
+                        'duration_ms', 'attempts']
+
+
+def generate_bai(conn, settings, first_day, last_day, seed=42, log=print):
+    """Write account info, export configs, audit logs, balances and transactions"""
+    rng = random.Random(seed)
+    ibans = [make_iban(100000 + n) for n in range(settings['ibans'])]
+    counts = {}
+    with conn.cursor() as cur:
+        for month in _months(first_day, last_day + timedelta(days=1)):
+            for table in ('bai_rabobank_transactions', 'bai_api_audit_log', 'bai_exports_audit_log'):
+                create_month_partition(cur, table, month)
+
+        counts['bai_rabobank_account_info'] = copy_rows(cur, 'bai_rabobank_account_info', ['iban', 'owner_name', 'currency'], (
+            (iban, f'Holiday Parks {PARKS[n % len(PARKS)]} {n:03d}', 'EUR') for n, iban in enumerate(ibans)
+        ))
+        exports = [(True, 'Rabobank', iban, fmt, '1', destination, f'/exports/{destination.lower()}',
+                    iban[-8:], extension, True, 'yyyyMMdd')
+                   for iban in ibans for fmt, destination, extension in EXPORT_FORMATS]
+        counts['bai_exports'] = copy_rows(cur, 'bai_exports', [
+            'enabled', 'bank', 'iban', 'exportformat', 'exportformatversion', 'destination', 'outputpath',
+            'fileprefix', 'fileextension', 'includedate', 'dateformat'], exports)
+        conn.commit()
+
+        for table in ('bai_api_audit_log', 'bai_rabobank_balances', 'bai_rabobank_transactions',
+                      'bai_exports_audit_log'):
+            counts[table] = 0
+        days = (last_day - first_day).days + 1
+        for number, iban in enumerate(ibans, start=1):
+            audit, balances, transactions, export_audit = [], [], [], []
+            closing = Decimal(rng.randint(10**6, 10**8)) / 100
+            for offset in range(days):
+                day = first_day + timedelta(days=offset)
+                day_audit, day_balances, day_transactions, closing = bai_day(
+                    rng, iban, day, closing, settings['transactions_per_day'])
+                audit.extend(day_audit)
+                balances.extend(day_balances)
+                transactions.extend(day_transactions)
+                exported = datetime.combine(day + timedelta(days=1), datetime.min.time(), timezone.utc) + \
+                    timedelta(hours=6, minutes=30)
+                for fmt, destination, extension in EXPORT_FORMATS:
+                    success = bool(day_balances)
+                    filename = f'{iban[-8:]}_{day:%Y%m%d}{extension}'
+                    export_audit.append((
+                        exported, 'Rabobank', iban, destination, fmt, day, filename,
+                        f'/exports/{destination.lower()}/{filename}' if success else None,
+                        len(day_transactions) if success else 0, success,
+                        None if success else f'No closingBooked balance for {iban} on {day}',
+                        'scheduler', rng.randint(50, 5000), 1
+                    ))
+            counts['bai_api_audit_log'] += copy_rows(cur, 'bai_api_audit_log', AUDIT_COLUMNS, audit)
+            counts['bai_rabobank_balances'] += copy_rows(cur, 'bai_rabobank_balances', BALANCE_COLUMNS, balances)
+            counts['bai_rabobank_transactions'] += copy_rows(cur, 'bai_rabobank_transactions',
+                                                             TRANSACTION_COLUMNS, transactions)
+            counts['bai_exports_audit_log'] += copy_rows(cur, 'bai_exports_audit_log', EXPORT_AUDIT_COLUMNS,
+                                                         export_audit)
+            conn.commit()
+            log(f"  {number}/{len(ibans)} {iban}: {len(transactions)} transactions")
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Worldline data
+# ---------------------------------------------------------------------------
+
+PAYMENT_COLUMNS = [
+    'id', 'ref', '"order"', 'status', 'lib', 'accept', 'ncid', 'ncster', 'paydate', 'cie', 'facname1', 'country',
+    'total', 'cur', 'method', 'brand', 'card', 'expdate', 'uid', 'struct', 'fileid', 'action', 'ticket', '"desc"',
+    'ship', 'tax', 'userid', 'merchref', 'refid', 'refkind', 'eci', 'cccty', 'ipcty', 'cvccheck', 'aavcheck',
+    'vc', 'batchref', 'owner', 'alias', 'fraud_type', 'bincard', 'rec_ipaddr', 'paydatetime', 'orderdatetime',
+    'subbrand', 'source_file',
+]
+
+
+def worldline_payment(rng, number, day, source_file, prefix=''):
+    """One Worldline payment as a dict keyed by recon_worldline_payments column (unquoted)"""
+    brand = rng.choices(BRANDS, BRAND_WEIGHTS)[0]
+    country = rng.choices(COUNTRIES, COUNTRY_WEIGHTS)[0]
+    status = rng.choices(['9', '5', '91', '2', '1'], [85, 6, 4, 3, 2])[0]
+    paid = datetime.combine(day, datetime.min.time()) + timedelta(seconds=rng.randint(0, 86399))
+    reservation = rng.randint(10**7, 10**8 - 1)
+    total = Decimal(int(rng.lognormvariate(10.5, 0.9))) / 100
+    return {
+        'id': f'{prefix}{number:010d}', 'ref': f'RES{reservation}', 'order': f'ORD{reservation}-{number % 7}',
+        'status': status, 'lib': 'Authorised' if status in ('5', '9', '91') else 'Refused',
+        'accept': f'{rng.randint(0, 999999):06d}', 'ncid': str(rng.randint(10**8, 10**9 - 1)), 'ncster': '0',
+        'paydate': day, 'cie': 'CENTERPARCS', 'facname1': rng.choice(PARKS), 'country': country,
+        'total': total, 'cur': 'EUR', 'method': 'CreditCard' if brand not in ('iDEAL', 'PayPal') else brand,
+        'brand': brand, 'card': f'XXXXXXXXXXXX{rng.randint(0, 9999):04d}', 'expdate': f'{rng.randint(1, 12):02d}/{rng.randint(26, 31)}',
+        'uid': str(rng.randint(10**5, 10**6 - 1)), 'struct': '', 'fileid': f'F{day:%Y%m%d}',
+        'action': 'SAL', 'ticket': '', 'desc': f'Reservation {reservation} {rng.choice(PARKS)}',
+        'ship': Decimal(0), 'tax': (total * Decimal('0.09')).quantize(Decimal('0.01')),
+        'userid': 'webshop', 'merchref': f'MR{reservation}', 'refid': '', 'refkind': '',
+        'eci': '7', 'cccty': country, 'ipcty': country, 'cvccheck': 'OK', 'aavcheck': 'NO', 'vc': '',
+        'batchref': f'B{day:%Y%m%d}{number % 40:02d}', 'owner': f'Guest {rng.randint(1, 250000):06d}',
+        'alias': '', 'fraud_type': '', 'bincard': str(rng.randint(400000, 559999)),
+        'rec_ipaddr': f'84.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}',
+        'paydatetime': paid, 'orderdatetime': paid - timedelta(minutes=rng.randint(1, 30)),
+        'subbrand': '', 'source_file': source_file,
+    }
+
+
+def generate_worldline(conn, settings, first_day, last_day, seed=42, log=print):
+    """Write Worldline payments for every day of the period"""
+    rng = random.Random(seed + 1)
+    keys = [column.strip('"') for column in PAYMENT_COLUMNS]
+    total = 0
+    with conn.cursor() as cur:
+        for month in _months(first_day, last_day):
+            cur.execute("SELECT rpa_data.recon_create_worldline_partition(%s)", (month,))
+        conn.commit()
+        day = first_day
+        number = 0
+        while day <= last_day:
+            source_file = f'worldline_{day:%Y%m%d}.csv'
+            rows = []
+            for _ in range(settings['payments_per_day']):
+                number += 1
+                payment = worldline_payment(rng, number, day, source_file)
+                rows.append(tuple(payment[key] for key in keys))
+            total += copy_rows(cur, 'recon_worldline_payments', PAYMENT_COLUMNS, rows)
+            conn.commit()
+            if day.day == 1 or day == last_day:
+                log(f"  Worldline {day:%Y-%m}: {total} payments so far")
+            day += timedelta(days=1)
+    return {'recon_worldline_payments': total}
+
+
+def write_worldline_csv(path, count, day, seed=42, prefix='BENCH'):
+    """Worldline export file (semicolon separated, European decimals) for the importer benchmark"""
+    rng = random.Random(seed)
+    source_file = os.path.basename(path)
+    keys = [column.strip('"') for column in PAYMENT_COLUMNS if column != 'source_file']
+    with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile, delimiter=';')
+        writer.writerow(['Id' if key == 'id' else key.upper() for key in keys])
+        for number in range(count):
+            payment = worldline_payment(rng, number, day, source_file, prefix=prefix)
+            row = []
+            for key in keys:
+                value = payment[key]
+                if isinstance(value, Decimal):
+                    value = str(value).replace('.', ',')
+                elif isinstance(value, datetime):
+                    value = value.strftime('%d/%m/%Y %H:%M:%S')
+                elif isinstance(value, date):
+                    value = value.strftime('%d/%m/%Y')
+                row.append(value)
+            writer.writerow(row)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Schema
+# ---------------------------------------------------------------------------
+
+def create_schema(bai_conn, recon_conn, reset=False):
+    with bai_conn.cursor() as cur:
+        if reset:
+            cur.execute("DROP TABLE IF EXISTS " + ', '.join(f'rpa_data.{t}' for t in BAI_TABLES) + " CASCADE")
+        with open(BAI_SCHEMA_FILE, encoding='utf-8') as f:
+            cur.execute(f.read())
+    bai_conn.commit()
+    with recon_conn.cursor() as cur:
+        cur.execute("CREATE SCHEMA IF NOT EXISTS rpa_data")
+        if reset:
+            cur.execute("DROP TABLE IF EXISTS " + ', '.join(f'rpa_data.{t}' for t in RECON_TABLES) + " CASCADE")
+        with open(RECON_SCHEMA_FILE, encoding='utf-8') as f:
+            cur.execute(f.read())
+    recon_conn.commit()
+
+
+def generate(scale='small', seed=42, reset=False, end_date=None, log=print, **overrides):
+    """Create the schema and generate a full data set; returns settings, period and row counts"""
+    settings = scale_settings(scale, **overrides)
+    last_day = end_date or date.today() - timedelta(days=1)
+    first_day = last_day - timedelta(days=settings['days'] - 1)
+    started = time.perf_counter()
+
+    bai_conn = psycopg2.connect(Config.get_db_connection_string('bai'), cursor_factory=RealDictCursor)
+    recon_conn = psycopg2.connect(Config.get_db_connection_string('recon'), cursor_factory=RealDictCursor)
+    try:
+        create_schema(bai_conn, recon_conn, reset=reset)
+        log(f"Generating {scale} data set {first_day} - {last_day}: {settings}")
+        counts = generate_bai(bai_conn, settings, first_day, last_day, seed=seed, log=log)
+        counts.update(generate_worldline(recon_conn, settings, first_day, last_day, seed=seed, log=log))
+        for conn in (bai_conn, recon_conn):
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute("ANALYZE")
+    finally:
+        bai_conn.close()
+        recon_conn.close()
+
+    seconds = round(time.perf_counter() - started, 1)
+    log(f"Done in {seconds}s: " + ', '.join(f'{table} {count}' for table, count in counts.items()))
+    return {'scale': scale, 'settings': settings, 'first_day': first_day.isoformat(),
+            'last_day': last_day.isoformat(), 'seed': seed, 'rows': counts, 'seconds': seconds}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic BAI and Worldline data for benchmarks')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--ibans', type=int, default=None, help='override the number of IBANs')
+    parser.add_argument('--days', type=int, default=None, help='override the number of days')
+    parser.add_argument('--transactions-per-day', type=int, default=None, help='per IBAN')
+    parser.add_argument('--payments-per-day', type=int, default=None, help='Worldline payments per day')
+    parser.add_argument('--end-date', type=date.fromisoformat, default=None, help='last day, default yesterday')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--reset', action='store_true', help='drop and recreate the benchmark tables first')
+    parser.add_argument('--allow-remote', action='store_true', help='allow a non-local database host')
+    args = parser.parse_args()
+
+    check_local(args.allow_remote)
+    generate(args.scale, seed=args.seed, reset=args.reset, end_date=args.end_date,
+             ibans=args.ibans, days=args.days, transactions_per_day=args.transactions_per_day,
+             payments_per_day=args.payments_per_day)
+
+
+if __name__ == '__main__':
+    main()
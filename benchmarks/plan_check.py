@@ -0,0 +1,299 @@
+"""
+EXPLAIN plan regression check
+Runs every benchmark case of benchmarks.bench_suite (all public Database and
+ReconDatabase query methods) plus the /bai/api/ops-status queries against the
+data of benchmarks.datagen, captures each SQL statement they execute and
+EXPLAINs it with FORMAT JSON. Flags:
+  * seq scans on partitions of a partitioned table (partitions with at least
+    --min-rows rows)
+  * appends that scan every partition of a partitioned table (no pruning)
+  * estimated total cost above --max-cost-ratio times the baseline
+
+Findings that are already in the baseline are accepted; new findings and cost
+jumps fail the check (exit code 1). Review the plans, then store the current
+state as the new baseline with --write-baseline. Run on the same data scale
+as the baseline, e.g. before deploying a migration or index change.
+
+Usage:
+    python -m benchmarks.datagen --scale medium --reset
+    python -m benchmarks.plan_check --write-baseline
+    python -m benchmarks.plan_check
+    python -m benchmarks.plan_check --only get_detailed_reconciliation ops_status --show-plans
+"""
+import argparse
+import contextlib
+import hashlib
+import inspect
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask
+from app.shared.cache import query_cache
+from app.shared.database import Database, EXPLAIN_TIMEOUT_MS
+from app.recon.database import ReconDatabase
+from benchmarks.bench_suite import bai_cases, data_range, recon_cases
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'plan_baseline.json')
+
+# Cost growth that counts as a regression, and the absolute growth below which it is ignored
+MAX_COST_RATIO = 2.0
+MIN_COST_DELTA = 1000
+
+# Partitions smaller than this may be seq scanned
+SEQ_SCAN_MIN_ROWS = 10000
+
+SEQ_SCANS = ('Seq Scan', 'Parallel Seq Scan')
+APPENDS = ('Append', 'Merge Append')
+_READ_QUERY = re.compile(r'^\s*(SELECT|WITH)\b', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+@contextlib.contextmanager
+def capture_queries():
+    """Record (db, query, params) of every statement run through Database/ReconDatabase
+
+    The statements still execute, so methods that use the result of one query
+    for the next work as usual.
+    """
+    captured = []
+    originals = {
+        (Database, '_fetch_all'): Database._fetch_all,
+        (Database, 'iter_query'): Database.iter_query,
+        (ReconDatabase, '_fetch_all'): ReconDatabase._fetch_all,
+    }
+
+    def fetch_all(original):
+        def wrapper(self, query, params=None, *args, **kwargs):
+            captured.append((self, query, params))
+            return original(self, query, params, *args, **kwargs)
+        return wrapper
+
+    def iter_query(self, query, params=None, *args, **kwargs):
+        captured.append((self, query, params))
+        yield from originals[(Database, 'iter_query')](self, query, params, *args, **kwargs)
+
+    Database._fetch_all = fetch_all(originals[(Database, '_fetch_all')])
+    Database.iter_query = iter_query
+    ReconDatabase._fetch_all = fetch_all(originals[(ReconDatabase, '_fetch_all')])
+    try:
+        yield captured
+    finally:
+        for (cls, name), original in originals.items():
+            setattr(cls, name, original)
+
+
+def route_cases():
+    """(name, method, callable) for queries that live in route functions"""
+    from app.bai import routes as bai_routes
+    app = Flask(__name__)
+    app.register_blueprint(bai_routes.bai_bp, url_prefix='/bai')
+
+    def call(view):
+        with app.test_request_context():
+            return inspect.unwrap(view)()
+
+    return [('ops_status', 'ops_status', lambda: call(bai_routes.ops_status))]
+
+
+def explain_json(db, query, params=None):
+    """EXPLAIN (FORMAT JSON) without executing; returns the top plan node"""
+    conn = db.connect()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET LOCAL statement_timeout = %s", (EXPLAIN_TIMEOUT_MS,))
+            cur.execute("EXPLAIN (FORMAT JSON) " + query, params)
+            plan = cur.fetchone()['QUERY PLAN']
+    finally:
+        conn.rollback()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']
+
+
+def partition_catalog(db):
+    """{partition: (parent, reltuples)} and {parent: partition count} of rpa_data"""
+    rows = db.execute_query("""
+        SELECT c.relname AS partition, p.relname AS parent, c.reltuples
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        JOIN pg_namespace n ON n.oid = p.relnamespace
+        JOIN pg_partitioned_table pt ON pt.partrelid = p.oid
+        WHERE n.nspname = 'rpa_data'
+    """)
+    partitions = {row['partition']: (row['parent'], row['reltuples']) for row in rows}
+    counts = {}
+    for parent, _ in partitions.values():
+        counts[parent] = counts.get(parent, 0) + 1
+    return partitions, counts
+
+
+def _walk(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from _walk(child)
+
+
+def _first_relation(node):
+    for sub in _walk(node):
+        if 'Relation Name' in sub:
+            return sub['Relation Name']
+    return None
+
+
+def plan_findings(plan, partitions, counts, min_rows=SEQ_SCAN_MIN_ROWS):
+    """Finding keys (stable across months) with a readable detail per key"""
+    findings = {}
+    seq_scanned = {}
+    for node in _walk(plan):
+        relation = node.get('Relation Name')
+        if node['Node Type'] in SEQ_SCANS and relation in partitions:
+            parent, rows = partitions[relation]
+            if rows >= min_rows:
+                seq_scanned.setdefault(parent, []).append(relation)
+        if node['Node Type'] in APPENDS:
+            scanned = {}
+            for child in node.get('Plans', []):
+                relation = _first_relation(child)
+                if relation in partitions:
+                    parent = partitions[relation][0]
+                    scanned.setdefault(parent, set()).add(relation)
+            for parent, relations in scanned.items():
+                if counts[parent] > 1 and len(relations) == counts[parent] and not node.get('Subplans Removed'):
+                    findings[f'no_pruning:{parent}'] = f"scans all {counts[parent]} partitions of {parent}"
+    for parent, relations in seq_scanned.items():
+        findings[f'seq_scan:{parent}'] = f"seq scan on {len(relations)} partition(s) of {parent}: " + \
+            ', '.join(sorted(relations)[:3]) + (' ...' if len(relations) > 3 else '')
+    return findings
+
+
+def sql_hash(query):
+    return hashlib.sha1(_WHITESPACE.sub(' ', query).strip().encode('utf-8')).hexdigest()[:12]
+
+
+def run(only=None, min_rows=SEQ_SCAN_MIN_ROWS, show_plans=False, log=print):
+    """EXPLAIN every captured statement; returns {statement key: result}"""
+    query_cache.enabled = False
+    bai = Database('bai')
+    recon = ReconDatabase()
+    try:
+        ibans, first_day, last_day = data_range(bai)
+        bai_catalog, recon_catalog = partition_catalog(bai), partition_catalog(recon)
+        cases = bai_cases(bai, ibans, last_day) + recon_cases(recon, first_day, last_day) + route_cases()
+
+        statements = {}
+        for name, _, fn in cases:
+            if only and not any(o in name for o in only):
+                continue
+            with capture_queries() as captured:
+                try:
+                    fn()
+                except Exception as e:
+                    print(f"Warning: {name} failed: {e}")
+            seen = set()
+            for db, query, params in captured:
+                digest = sql_hash(query)
+                if digest in seen or not _READ_QUERY.match(query):
+                    continue
+                seen.add(digest)
+                key = f'{name}#{len(seen)}'
+                try:
+                    plan = explain_json(db, query, params)
+                except Exception as e:
+                    print(f"Warning: EXPLAIN of {key} failed: {e}")
+                    continue
+                partitions, counts = recon_catalog if isinstance(db, ReconDatabase) else bai_catalog
+                statements[key] = {
+                    'sql_hash': digest,
+                    'cost': plan['Total Cost'],
+                    'findings': plan_findings(plan, partitions, counts, min_rows),
+                }
+                if show_plans:
+                    log(f"\n{key}\n{json.dumps(plan, indent=2)}")
+        return statements
+    finally:
+        bai.close()
+        recon.close()
+
+
+def check(statements, baseline, max_cost_ratio=MAX_COST_RATIO):
+    """Compare against the baseline statements; returns {key: [failure reasons]}"""
+    failures = {}
+    for key, current in statements.items():
+        before = baseline.get(key)
+        reasons = []
+        accepted = set(before['findings']) if before else set()
+        for finding, detail in current['findings'].items():
+            if finding not in accepted:
+                reasons.append(detail)
+        if before:
+            if current['cost'] > before['cost'] * max_cost_ratio and current['cost'] - before['cost'] > MIN_COST_DELTA:
+                reasons.append(f"cost {before['cost']:.0f} -> {current['cost']:.0f} "
+                               f"({current['cost'] / before['cost']:.1f}x)")
+        if reasons:
+            failures[key] = reasons
+    return failures
+
+
+def report(statements, baseline, failures):
+    print(f"{'Statement':<55} {'Cost':>12} {'Baseline':>12}  Result")
+    print('-' * 95)
+    for key, current in statements.items():
+        before = baseline.get(key)
+        result = 'FAIL' if key in failures else 'ok'
+        if before and before['sql_hash'] != current['sql_hash']:
+            result += ' (query changed)'
+        elif not before:
+            result += ' (new)'
+        print(f"{key:<55} {current['cost']:>12.0f} {before['cost'] if before else '-':>12}  {result}")
+        for reason in failures.get(key, []):
+            print(f"    - {reason}")
+        for detail in (current['findings'].values() if key not in failures else []):
+            print(f"    ~ accepted: {detail}")
+    for key in sorted(set(baseline) - set(statements)):
+        print(f"{key:<55} {'-':>12} {baseline[key]['cost']:>12.0f}  missing")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EXPLAIN plan regression check for all query methods')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON (default: %(default)s)')
+    parser.add_argument('--write-baseline', action='store_true', help='store the current plans as the baseline')
+    parser.add_argument('--max-cost-ratio', type=float, default=MAX_COST_RATIO)
+    parser.add_argument('--min-rows', type=int, default=SEQ_SCAN_MIN_ROWS,
+                        help='ignore seq scans on partitions with fewer rows')
+    parser.add_argument('--only', nargs='+', help='only cases whose name contains one of these')
+    parser.add_argument('--show-plans', action='store_true', help='print the JSON plans')
+    args = parser.parse_args()
+
+    statements = run(args.only, args.min_rows, args.show_plans)
+
+    if args.write_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'meta': {'at': datetime.now().isoformat(timespec='seconds')}, 'statements': statements},
+                      f, indent=2, sort_keys=True)
+        print(f"Baseline with {len(statements)} statements written to {args.baseline}")
+        return
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['statements']
+        if args.only:
+            baseline = {key: value for key, value in baseline.items() if key.split('#')[0] in
+                        {k.split('#')[0] for k in statements}}
+    else:
+        print(f"Warning: no baseline at {args.baseline}, every finding fails")
+
+    failures = check(statements, baseline, args.max_cost_ratio)
+    report(statements, baseline, failures)
+    print(f"\n{len(statements) - len(failures)} passed, {len(failures)} failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+-- =============================================================================
+-- CashApp benchmark schema (BAI tables)
+-- =============================================================================
+-- Production-shaped rpa_data tables for benchmarks/datagen.py, matching the
+-- state after migrate_partition_transactions.sql and migrations 004-007:
+--   * bai_rabobank_transactions partitioned by booking_date (monthly)
+--   * bai_api_audit_log / bai_exports_audit_log partitioned by "timestamp"
+--   * indexes as created by those scripts
+-- Monthly partitions are added by the generator for the generated period.
+-- The Recon tables come from Archive/Recon_Tool/database/01_create_schema.sql.
+--
+-- Only for a local benchmark database: --reset drops these tables first.
+-- =============================================================================
+
+CREATE SCHEMA IF NOT EXISTS rpa_data;
+SET search_path TO rpa_data;
+
+CREATE TABLE IF NOT EXISTS bai_api_audit_log (
+    id UUID NOT NULL,
+    attempt_nr SMALLINT NOT NULL DEFAULT 1,
+    "timestamp" TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    bank VARCHAR(50) NOT NULL,
+    endpoint VARCHAR(255) NOT NULL,
+    http_method VARCHAR(10),
+    response_status INTEGER,
+    response_time_ms INTEGER,
+    caller_id VARCHAR(100),
+    correlation_id UUID,
+    error_message TEXT,
+    closingdate DATE,
+    iban VARCHAR,
+    CONSTRAINT bai_api_audit_log_pkey PRIMARY KEY (id, attempt_nr, "timestamp")
+) PARTITION BY RANGE ("timestamp");
+
+CREATE TABLE IF NOT EXISTS bai_api_audit_log_default PARTITION OF bai_api_audit_log DEFAULT;
+
+CREATE INDEX IF NOT EXISTS idx_bai_audit_bank_endpoint_ts ON bai_api_audit_log (bank, endpoint, "timestamp" DESC);
+CREATE INDEX IF NOT EXISTS idx_bai_audit_correlation ON bai_api_audit_log (correlation_id);
+CREATE INDEX IF NOT EXISTS idx_bai_audit_status ON bai_api_audit_log (response_status);
+CREATE INDEX IF NOT EXISTS idx_bai_audit_closingdate_endpoint ON bai_api_audit_log (closingdate, endpoint, iban);
+
+CREATE TABLE IF NOT EXISTS bai_rabobank_account_info (
+    id SERIAL PRIMARY KEY,
+    iban VARCHAR(34) NOT NULL UNIQUE,
+    owner_name VARCHAR(255) NOT NULL,
+    currency VARCHAR(3) NOT NULL DEFAULT 'EUR',
+    resource_id VARCHAR(255),
+    status VARCHAR(20) DEFAULT 'enabled',
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- No foreign key to bai_api_audit_log: its primary key includes "timestamp" since migration 006
+CREATE TABLE IF NOT EXISTS bai_rabobank_balances (
+    id UUID NOT NULL DEFAULT gen_random_uuid() PRIMARY KEY,
+    audit_id UUID NOT NULL,
+    attempt_nr SMALLINT DEFAULT 1,
+    iban VARCHAR(34) NOT NULL,
+    currency VARCHAR(3) NOT NULL,
+    balance_type VARCHAR(50) NOT NULL
+        CHECK (balance_type IN ('interimBooked', 'expected', 'closingBooked')),
+    amount NUMERIC(18,2) NOT NULL,
+    reference_date DATE,
+    last_change_datetime TIMESTAMP WITH TIME ZONE,
+    retrieved_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_bai_balance_audit_id_attempt ON bai_rabobank_balances (audit_id, attempt_nr);
+CREATE INDEX IF NOT EXISTS idx_bai_balance_iban_type_date ON bai_rabobank_balances (iban, balance_type, reference_date);
+CREATE INDEX IF NOT EXISTS idx_bai_balance_retrieved_at ON bai_rabobank_balances (retrieved_at DESC);
+
+-- balance_kind as added by migration_007_balance_kind.sql
+DO $$
+BEGIN
+    CREATE TYPE bai_balance_kind AS ENUM ('closing_booked', 'interim_booked', 'expected', 'other');
+EXCEPTION
+    WHEN duplicate_object THEN NULL;
+END $$;
+
+CREATE OR REPLACE FUNCTION bai_balance_kind_of(balance_type TEXT)
+RETURNS bai_balance_kind
+LANGUAGE sql IMMUTABLE
+AS $$
+    SELECT CASE REPLACE(LOWER(balance_type), '_', '')
+        WHEN 'closingbooked' THEN 'closing_booked'
+        WHEN 'interimbooked' THEN 'interim_booked'
+        WHEN 'expected' THEN 'expected'
+        ELSE 'other'
+    END::rpa_data.bai_balance_kind
+$$;
+
+CREATE OR REPLACE FUNCTION bai_set_balance_kind()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.balance_kind := rpa_data.bai_balance_kind_of(NEW.balance_type);
+    RETURN NEW;
+END $$;
+
+ALTER TABLE bai_rabobank_balances ADD COLUMN IF NOT EXISTS balance_kind bai_balance_kind NOT NULL;
+
+DROP TRIGGER IF EXISTS trg_bai_balance_kind ON bai_rabobank_balances;
+CREATE TRIGGER trg_bai_balance_kind
+    BEFORE INSERT OR UPDATE OF balance_type ON bai_rabobank_balances
+    FOR EACH ROW EXECUTE FUNCTION bai_set_balance_kind();
+
+CREATE INDEX IF NOT EXISTS idx_bai_balance_closing_iban_date ON bai_rabobank_balances (iban, reference_date)
+    INCLUDE (amount, currency) WHERE balance_kind = 'closing_booked';
+CREATE INDEX IF NOT EXISTS idx_bai_balance_closing_date ON bai_rabobank_balances (reference_date, iban)
+    INCLUDE (amount, currency) WHERE balance_kind = 'closing_booked';
+
+CREATE TABLE IF NOT EXISTS bai_rabobank_transactions (
+    id SERIAL,
+    external_audit_id VARCHAR(255),
+    audit_id VARCHAR(255) NOT NULL,
+    attempt_nr INTEGER DEFAULT 1,
+    iban VARCHAR(34) NOT NULL,
+    currency VARCHAR(3) NOT NULL DEFAULT 'EUR',
+    booking_date DATE NOT NULL,
+    entry_reference VARCHAR(255) NOT NULL,
+    transaction_amount NUMERIC(15,2) NOT NULL,
+    transaction_currency VARCHAR(3) NOT NULL,
+    bank_transaction_code VARCHAR(50) NOT NULL,
+    value_date DATE,
+    end_to_end_id VARCHAR(255),
+    batch_entry_reference VARCHAR(255),
+    acctsvcr_ref VARCHAR(255),
+    instruction_id VARCHAR(255),
+    interbank_settlement_date DATE,
+    debtor_iban VARCHAR(34),
+    debtor_name VARCHAR(255),
+    debtor_agent_bic VARCHAR(11),
+    creditor_iban VARCHAR(34),
+    creditor_name VARCHAR(255),
+    creditor_agent_bic VARCHAR(11),
+    creditor_currency VARCHAR(3),
+    creditor_id VARCHAR(255),
+    ultimate_debtor VARCHAR(255),
+    ultimate_creditor VARCHAR(255),
+    initiating_party_name VARCHAR(255),
+    mandate_id VARCHAR(255),
+    remittance_information_unstructured TEXT,
+    remittance_information_structured TEXT,
+    purpose_code VARCHAR(10),
+    reason_code VARCHAR(10),
+    payment_information_identification VARCHAR(255),
+    number_of_transactions INTEGER,
+    currency_exchange_rate NUMERIC(10,6),
+    currency_exchange_source_currency VARCHAR(3),
+    currency_exchange_target_currency VARCHAR(3),
+    instructed_amount NUMERIC(15,2),
+    instructed_amount_currency VARCHAR(3),
+    rabo_booking_datetime TIMESTAMP(6) WITH TIME ZONE NOT NULL,
+    rabo_detailed_transaction_type VARCHAR(10) NOT NULL,
+    rabo_transaction_type_name VARCHAR(10),
+    balance_after_booking_amount NUMERIC(15,2),
+    balance_after_booking_currency VARCHAR(3),
+    balance_after_booking_type VARCHAR(50),
+    source_system VARCHAR(50) DEFAULT 'BAI_API',
+    created_at TIMESTAMP(6) WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP(6) WITH TIME ZONE DEFAULT NOW(),
+    retrieved_at TIMESTAMP(6) WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (id, booking_date)
+) PARTITION BY RANGE (booking_date);
+
+CREATE INDEX IF NOT EXISTS idx_bai_transactions_iban ON bai_rabobank_transactions (iban);
+CREATE INDEX IF NOT EXISTS idx_bai_transactions_audit_id ON bai_rabobank_transactions (audit_id);
+CREATE INDEX IF NOT EXISTS idx_bai_transactions_entry_reference ON bai_rabobank_transactions (entry_reference);
+CREATE INDEX IF NOT EXISTS idx_bai_transactions_end_to_end_id ON bai_rabobank_transactions (end_to_end_id);
+CREATE INDEX IF NOT EXISTS idx_bai_transactions_rabo_booking_datetime ON bai_rabobank_transactions (rabo_booking_datetime);
+CREATE INDEX IF NOT EXISTS idx_bai_transactions_created_at ON bai_rabobank_transactions (created_at);
+CREATE INDEX IF NOT EXISTS idx_bai_transactions_iban_booking_date ON bai_rabobank_transactions (iban, booking_date);
+CREATE INDEX IF NOT EXISTS idx_bai_transactions_debtor_creditor ON bai_rabobank_transactions (debtor_iban, creditor_iban);
+
+CREATE TABLE IF NOT EXISTS bai_exports (
+    id SERIAL PRIMARY KEY,
+    enabled BOOLEAN DEFAULT TRUE,
+    bank VARCHAR(50),
+    iban VARCHAR(34) NOT NULL,
+    exportformat VARCHAR(20) NOT NULL,
+    exportformatversion VARCHAR(20),
+    destination VARCHAR(100),
+    outputpath VARCHAR(500),
+    fileprefix VARCHAR(100),
+    fileextension VARCHAR(20),
+    includedate BOOLEAN DEFAULT TRUE,
+    dateformat VARCHAR(20),
+    createdat TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updatedat TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS bai_exports_audit_log (
+    id SERIAL,
+    "timestamp" TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    bank VARCHAR(50),
+    iban VARCHAR(34),
+    destination VARCHAR(100),
+    export_format VARCHAR(20),
+    closingdate DATE,
+    filename VARCHAR(255),
+    outputfilepath VARCHAR(500),
+    record_count INTEGER,
+    success BOOLEAN,
+    error_message TEXT,
+    caller_id VARCHAR(100),
+    duration_ms INTEGER,
+    attempts SMALLINT,
+    CONSTRAINT bai_exports_audit_log_ts_pkey PRIMARY KEY (id, "timestamp")
+) PARTITION BY RANGE ("timestamp");
+
+CREATE TABLE IF NOT EXISTS bai_exports_audit_log_default PARTITION OF bai_exports_audit_log DEFAULT;
+
+CREATE INDEX IF NOT EXISTS idx_exports_audit_timestamp ON bai_exports_audit_log ("timestamp" DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_exports_audit_iban_timestamp ON bai_exports_audit_log (iban, "timestamp" DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_exports_audit_format_closingdate ON bai_exports_audit_log (export_format, closingdate);
+CREATE INDEX IF NOT EXISTS idx_exports_audit_destination_timestamp ON bai_exports_audit_log (destination, "timestamp");
@@ -2,6 +2,7 @@
 Configuration settings for CashApp
 """
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -45,7 +46,74 @@ class Config:
     # Application settings
     ITEMS_PER_PAGE = int(os.getenv('ITEMS_PER_PAGE', '50'))
     MAX_TRANSACTION_DISPLAY = int(os.getenv('MAX_TRANSACTION_DISPLAY', '10000'))
-    
+
+    # Query result cache (app.shared.cache)
+    QUERY_CACHE_ENABLED = os.getenv('QUERY_CACHE_ENABLED', 'True').lower() == 'true'
+    QUERY_CACHE_MAX_ENTRIES = int(os.getenv('QUERY_CACHE_MAX_ENTRIES', '1000'))
+    QUERY_CACHE_MAX_MB = int(os.getenv('QUERY_CACHE_MAX_MB', '64'))
+    QUERY_CACHE_DEFAULT_TTL = int(os.getenv('QUERY_CACHE_DEFAULT_TTL', '300'))  # seconds
+    # LISTEN channel for cross-process invalidation (empty = disabled)
+    QUERY_CACHE_NOTIFY_CHANNEL = os.getenv('QUERY_CACHE_NOTIFY_CHANNEL', '')
+    # flask-login user_loader cache; admin user changes invalidate it
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', '60'))  # seconds, 0 = disabled
+    # Coalesce identical concurrent SELECTs in Database.execute_query (app.shared.singleflight)
+    SINGLE_FLIGHT_ENABLED = os.getenv('SINGLE_FLIGHT_ENABLED', 'True').lower() == 'true'
+
+    # Query instrumentation (app.shared.metrics, admin page /admin/queries)
+    QUERY_METRICS_ENABLED = os.getenv('QUERY_METRICS_ENABLED', 'True').lower() == 'true'
+    SLOW_QUERY_MS = int(os.getenv('SLOW_QUERY_MS', '500'))  # log queries at least this slow
+    SLOW_QUERY_LOG_SIZE = int(os.getenv('SLOW_QUERY_LOG_SIZE', '100'))  # slow queries kept per process
+    # Request metrics per endpoint (/admin/perf, Prometheus text at /metrics)
+    REQUEST_METRICS_ENABLED = os.getenv('REQUEST_METRICS_ENABLED', 'True').lower() == 'true'
+    REQUEST_METRICS_WINDOW = int(os.getenv('REQUEST_METRICS_WINDOW', '1000'))  # recent requests per endpoint for percentiles
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')  # bearer token for /metrics scrapes, empty = admin login only
+    # Per-request profiling for admins with ?_profile=cprofile|sampling (app.shared.profiler, /admin/profiles)
+    PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', 'True').lower() == 'true'
+    PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'cashapp_profiles'))
+    PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', '50'))  # newest profiles kept on disk
+    PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv('PROFILE_SAMPLE_INTERVAL_MS', '5'))  # sampling profiler interval
+
+    # Password hashing (app.shared.passwords)
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))  # weaker stored hashes are upgraded on login, never downgraded
+    BCRYPT_WORKERS = int(os.getenv('BCRYPT_WORKERS', '2'))  # concurrent verifications per process
+    BCRYPT_MAX_QUEUE = int(os.getenv('BCRYPT_MAX_QUEUE', '16'))  # waiting logins before rejecting
+    BCRYPT_TIMEOUT = int(os.getenv('BCRYPT_TIMEOUT', '10'))  # seconds
+
+    # Background report jobs (app.shared.report_jobs)
+    REPORT_ASYNC_MIN_DAYS = int(os.getenv('REPORT_ASYNC_MIN_DAYS', '30'))  # periods this long run as a job
+    REPORT_JOB_WORKERS = int(os.getenv('REPORT_JOB_WORKERS', '2'))
+    REPORT_RESULT_TTL = int(os.getenv('REPORT_RESULT_TTL', '600'))  # seconds a finished report is kept
+    REPORT_RESULT_MAX = int(os.getenv('REPORT_RESULT_MAX', '50'))  # stored results, shared by all workers
+    REPORT_JOB_TIMEOUT = int(os.getenv('REPORT_JOB_TIMEOUT', '3600'))  # seconds before a running job counts as lost
+    REPORT_JOB_DIR = os.getenv('REPORT_JOB_DIR', os.path.join(tempfile.gettempdir(), 'cashapp_report_jobs'))
+
+    # Reconciliation engine (app.bai.reconciliation): sql, pandas or auto
+    RECONCILIATION_ENGINE = os.getenv('RECONCILIATION_ENGINE', 'sql').lower()
+    RECONCILIATION_PANDAS_MIN_DAYS = int(os.getenv('RECONCILIATION_PANDAS_MIN_DAYS', '90'))  # auto: pandas from this period on
+
+    # Batch PDF statements (app.bai.batch_statements)
+    BATCH_STATEMENT_WORKERS = int(os.getenv('BATCH_STATEMENT_WORKERS', '0'))  # render processes, 0 = CPU count
+    BATCH_STATEMENT_DIR = os.getenv('BATCH_STATEMENT_DIR', os.path.join(tempfile.gettempdir(), 'cashapp_statements'))
+
+    # On-disk cache of rendered PDF statements (app.bai.statement_cache)
+    STATEMENT_CACHE_ENABLED = os.getenv('STATEMENT_CACHE_ENABLED', 'True').lower() == 'true'
+    STATEMENT_CACHE_DIR = os.getenv('STATEMENT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'cashapp_statement_cache'))
+    STATEMENT_CACHE_MAX_MB = int(os.getenv('STATEMENT_CACHE_MAX_MB', '512'))
+
+    # Scheduled bai_exports runs (app.bai.exports.scheduler); enable in one process only
+    SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', 'False').lower() == 'true'
+    EXPORT_SCHEDULE_TIME = os.getenv('EXPORT_SCHEDULE_TIME', '06:30')  # HH:MM, exports yesterday
+    EXPORT_WORKERS = int(os.getenv('EXPORT_WORKERS', '8'))  # concurrent exports over all destinations
+    EXPORT_DESTINATION_LIMITS = os.getenv('EXPORT_DESTINATION_LIMITS', '')  # e.g. Autobank=4,Globes=2
+    EXPORT_DESTINATION_DEFAULT_LIMIT = int(os.getenv('EXPORT_DESTINATION_DEFAULT_LIMIT', '2'))
+    EXPORT_RETRIES = int(os.getenv('EXPORT_RETRIES', '2'))  # extra attempts after a failure
+    EXPORT_RETRY_BACKOFF = float(os.getenv('EXPORT_RETRY_BACKOFF', '5'))  # seconds, doubled per retry
+
+    # Monthly partitions (database/partition_manager.py, database/audit_log_maintenance.py)
+    PARTITION_MONTHS_AHEAD = int(os.getenv('PARTITION_MONTHS_AHEAD', '3'))  # monthly partitions created ahead
+    AUDIT_LOG_RETENTION_MONTHS = int(os.getenv('AUDIT_LOG_RETENTION_MONTHS', '24'))  # 0 = keep everything
+    AUDIT_LOG_ARCHIVE_SCHEMA = os.getenv('AUDIT_LOG_ARCHIVE_SCHEMA', 'rpa_archive')  # detached partitions go here
+
     @staticmethod
     def get_db_connection_string(db_type='bai'):
         """Generate PostgreSQL connection string for specified database
@@ -0,0 +1,160 @@
+"""
+Partition maintenance for the BAI audit logs
+Keeps the monthly partitions of rpa_data.bai_api_audit_log and
+rpa_data.bai_exports_audit_log (see migration_006_partition_audit_logs.sql)
+in shape:
+  * moves rows that landed in the DEFAULT partition into their monthly
+    partitions (otherwise creating those months would fail)
+  * creates the partitions for the coming months before rows arrive, so
+    nothing lands in the DEFAULT partition
+  * detaches months older than the retention window and moves them to an
+    archive schema (or drops them with --drop)
+
+Safe to run repeatedly; the app runs it daily on the shared scheduler
+(SCHEDULER_ENABLED), or run it by hand / from cron.
+
+Usage:
+    python database/audit_log_maintenance.py --dry-run
+    python database/audit_log_maintenance.py --months-ahead 3 --retention-months 24
+"""
+import argparse
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extras import RealDictCursor
+from config.config import Config
+from database.partition_manager import (
+    SCHEMA, add_months, default_partition_rows, ensure_future_partitions, list_partitions, move_default_rows
+)
+
+# Partitioned audit log tables (all partitioned by RANGE on "timestamp", monthly)
+AUDIT_LOG_TABLES = ['bai_api_audit_log', 'bai_exports_audit_log']
+PARTITION_KEY = 'timestamp'
+
+DAILY_JOB_ID = 'audit_log_partition_maintenance'
+
+
+def detach_expired_partitions(cur, table, retention_months, archive_schema, drop=False, today=None,
+                              schema=SCHEMA, dry_run=False, log=print):
+    """Detach partitions that end before the retention window
+
+    Detached partitions are moved to `archive_schema` (created if needed) or
+    dropped when `drop` is set; the DEFAULT partition is never touched.
+
+    Returns:
+        list: Names of the partitions detached
+    """
+    cutoff = add_months(today or date.today(), -retention_months)
+    expired = [p for p in list_partitions(cur, table, schema) if p['upper'] and p['upper'] <= cutoff]
+    detached = []
+    for partition in expired:
+        name = partition['name']
+        action = 'drop' if drop else f'archive to {archive_schema}'
+        if dry_run:
+            log(f"Would detach and {action} {schema}.{name} ({partition['lower']} - {partition['upper']})")
+            detached.append(name)
+            continue
+        cur.execute(sql.SQL("ALTER TABLE {} DETACH PARTITION {}").format(
+            sql.Identifier(schema, table), sql.Identifier(schema, name)
+        ))
+        if drop:
+            cur.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(schema, name)))
+        else:
+            cur.execute(sql.SQL("CREATE SCHEMA IF NOT EXISTS {}").format(sql.Identifier(archive_schema)))
+            cur.execute(sql.SQL("ALTER TABLE {} SET SCHEMA {}").format(
+                sql.Identifier(schema, name), sql.Identifier(archive_schema)
+            ))
+        detached.append(name)
+        log(f"Detached {schema}.{name} ({action})")
+    return detached
+
+
+def run_maintenance(months_ahead=None, retention_months=None, archive_schema=None, drop=False,
+                    move_default=True, dry_run=False, tables=None, log=print):
+    """Empty the DEFAULT partition, create future partitions and detach expired ones for every audit log table
+
+    Each table is handled in its own transaction; a failure is logged and the
+    next table is still processed.
+
+    Returns:
+        dict: Per table the created and detached partitions, moved rows per month and DEFAULT rows left
+    """
+    months_ahead = Config.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    retention_months = Config.AUDIT_LOG_RETENTION_MONTHS if retention_months is None else retention_months
+    archive_schema = archive_schema or Config.AUDIT_LOG_ARCHIVE_SCHEMA
+
+    summary = {}
+    conn = psycopg2.connect(Config.get_db_connection_string('bai'), cursor_factory=RealDictCursor)
+    try:
+        for table in tables or AUDIT_LOG_TABLES:
+            try:
+                with conn.cursor() as cur:
+                    moved = {}
+                    if move_default:
+                        moved = move_default_rows(cur, table, PARTITION_KEY, dry_run=dry_run, log=log)
+                    created = ensure_future_partitions(cur, table, months_ahead, dry_run=dry_run, log=log)
+                    detached = []
+                    if retention_months > 0:
+                        detached = detach_expired_partitions(
+                            cur, table, retention_months, archive_schema, drop=drop, dry_run=dry_run, log=log
+                        )
+                    default_rows = default_partition_rows(cur, table)
+                conn.commit()
+                if default_rows and not moved:
+                    log(f"Warning: {default_rows} rows in the DEFAULT partition of {table}")
+                summary[table] = {
+                    'created': created,
+                    'detached': detached,
+                    'moved': {month.isoformat(): rows for month, rows in moved.items()},
+                    'default_rows': default_rows,
+                }
+            except Exception as e:
+                conn.rollback()
+                log(f"Warning: partition maintenance for {table} failed: {e}")
+                summary[table] = {'error': str(e)}
+    finally:
+        conn.close()
+    return summary
+
+
+def schedule_maintenance(scheduler=None):
+    """Register the daily audit log partition maintenance on the shared scheduler"""
+    if scheduler is None:
+        from app.shared.scheduler import scheduler
+    scheduler.add_job(
+        run_maintenance,
+        'cron',
+        hour=2,
+        minute=15,
+        id=DAILY_JOB_ID,
+        name='Audit log partition maintenance',
+        replace_existing=True
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Create future and archive expired audit log partitions')
+    parser.add_argument('--months-ahead', type=int, default=None,
+                        help=f'default {Config.PARTITION_MONTHS_AHEAD}')
+    parser.add_argument('--retention-months', type=int, default=None,
+                        help=f'default {Config.AUDIT_LOG_RETENTION_MONTHS}, 0 = keep everything')
+    parser.add_argument('--archive-schema', default=None, help=f'default {Config.AUDIT_LOG_ARCHIVE_SCHEMA}')
+    parser.add_argument('--drop', action='store_true', help='drop expired partitions instead of archiving them')
+    parser.add_argument('--table', action='append', choices=AUDIT_LOG_TABLES, help='limit to this table')
+    parser.add_argument('--no-move-default', action='store_true', help='leave DEFAULT partition rows in place')
+    parser.add_argument('--dry-run', action='store_true', help='only report what would change')
+    args = parser.parse_args()
+
+    summary = run_maintenance(args.months_ahead, args.retention_months, args.archive_schema,
+                              drop=args.drop, move_default=not args.no_move_default,
+                              dry_run=args.dry_run, tables=args.table)
+    sys.exit(1 if any('error' in result for result in summary.values()) else 0)
+
+
+if __name__ == '__main__':
+    main()
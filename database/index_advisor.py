@@ -0,0 +1,435 @@
+"""
+Index advisor for the BAI and Recon tables
+Checks the filter patterns the app actually uses (CANDIDATES) against the
+workload and the existing indexes:
+
+  * workload from pg_stat_statements (default), or the app's own queries as
+    captured from the benchmark cases (--source benchmarks, seeded database)
+  * existing indexes from pg_indexes; a candidate whose leading keys are
+    already indexed is reported as covered
+  * estimated gain from hypothetical indexes when the hypopg extension is
+    installed (EXPLAIN cost before/after), otherwise the total execution time
+    of the matching statements as an upper bound
+
+With --write-migration the proposed indexes are written as
+database/migration_NNN_index_advisor_<db>.sql, to be reviewed and run with psql.
+
+Usage:
+    python database/index_advisor.py
+    python database/index_advisor.py --db recon --all
+    python database/index_advisor.py --source benchmarks --write-migration
+"""
+import argparse
+import os
+import re
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import psycopg2
+from psycopg2 import errors
+from psycopg2.extras import RealDictCursor
+from config.config import Config
+
+SCHEMA = 'rpa_data'
+MIGRATION_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Indexes for the filter patterns of the app. `keys` are the leading index keys
+# as PostgreSQL renders them in pg_indexes (lower case); `match_where` is the
+# partial index predicate with casts, quotes and spaces removed.
+CANDIDATES = [
+    {
+        'name': 'idx_bai_balance_closing_iban_date',
+        'db_type': 'bai',
+        'table': 'bai_rabobank_balances',
+        'method': 'btree',
+        'keys': ['iban', 'reference_date'],
+        'definition': '(iban, reference_date) INCLUDE (amount, currency)',
+        'where': "balance_kind = 'closing_booked'",
+        'match_where': "balance_kind='closing_booked'",
+        'pattern': r"balance_kind\s*=\s*('closing_booked'|\$\d+)",
+        'reason': "Bank statements and exports look up the closing booked balance per IBAN and date; "
+                  "a partial index holds a third of the rows and answers from the index alone.",
+    },
+    {
+        'name': 'idx_bai_balance_closing_date',
+        'db_type': 'bai',
+        'table': 'bai_rabobank_balances',
+        'method': 'btree',
+        'keys': ['reference_date', 'iban'],
+        'definition': '(reference_date, iban) INCLUDE (amount, currency)',
+        'where': "balance_kind = 'closing_booked'",
+        'match_where': "balance_kind='closing_booked'",
+        'pattern': r"balance_kind\s*=\s*('closing_booked'|\$\d+)[^;]*reference_date\s+(between|>=|in\b)",
+        'reason': "Reconciliation, data quality and OPS status read the closing booked balances "
+                  "of all IBANs over a reference_date range.",
+    },
+    {
+        'name': 'idx_bai_audit_closingdate_endpoint',
+        'db_type': 'bai',
+        'table': 'bai_api_audit_log',
+        'method': 'btree',
+        'keys': ['closingdate', 'endpoint'],
+        'definition': '(closingdate, endpoint, iban)',
+        'where': None,
+        'pattern': r"closingdate(::date)?\s*(=|>=|<=|<|>|between)",
+        'reason': "Data quality, missing days and OPS status group the audit log by closingdate and endpoint.",
+    },
+    {
+        'name': 'idx_bai_transactions_iban_booking_date',
+        'db_type': 'bai',
+        'table': 'bai_rabobank_transactions',
+        'method': 'btree',
+        'keys': ['iban', 'booking_date'],
+        'definition': '(iban, booking_date)',
+        'where': None,
+        'pattern': r"\biban\s*(=|in\b|=\s*any)",
+        'reason': "Statements, exports and transaction details read one or more IBANs over a booking_date range.",
+    },
+] + [
+    {
+        'name': f'idx_recon_worldline_{column}_trgm',
+        'db_type': 'recon',
+        'table': 'recon_worldline_payments',
+        'method': 'gin',
+        'keys': [column],
+        'definition': f'({quoted} gin_trgm_ops)',
+        'where': None,
+        'extension': 'pg_trgm',
+        'pattern': rf'\b{column}(::text)?\s+ilike',
+        'reason': f"Payment filters and search_payments use {quoted} ILIKE '%term%', "
+                  "which only a trigram index can serve.",
+    }
+    for column, quoted in [('id', 'id'), ('ref', 'ref'), ('order', '"order"'), ('owner', 'owner'),
+                           ('merchref', 'merchref'), ('batchref', 'batchref'), ('facname1', 'facname1')]
+]
+
+_WHITESPACE = re.compile(r'\s+')
+_ORDER_SUFFIX = re.compile(r'\s+(\w+_ops|asc|desc|nulls first|nulls last)$')
+
+
+def connect(db_type):
+    return psycopg2.connect(Config.get_db_connection_string(db_type), cursor_factory=RealDictCursor)
+
+
+def normalize_sql(query):
+    return _WHITESPACE.sub(' ', query.replace('"', '')).strip().lower()
+
+
+def normalize_where(predicate):
+    return re.sub(r"::(character varying|[\w.]+)|[()\s\"]", '', predicate.lower())
+
+
+def _split_top_level(text):
+    parts, depth, current = [], 0, ''
+    for ch in text:
+        if ch == ',' and depth == 0:
+            parts.append(current)
+            current = ''
+            continue
+        depth += (ch == '(') - (ch == ')')
+        current += ch
+    parts.append(current)
+    return parts
+
+
+def parse_indexdef(indexdef):
+    """(method, normalized key list, normalized predicate or None) of a pg_indexes definition"""
+    match = re.search(r' USING (\w+) \(', indexdef)
+    if not match:
+        return None, [], None
+    start = match.end()
+    depth, end = 1, start
+    while depth and end < len(indexdef):
+        depth += (indexdef[end] == '(') - (indexdef[end] == ')')
+        end += 1
+    keys = []
+    for key in _split_top_level(indexdef[start:end - 1]):
+        key = _WHITESPACE.sub(' ', key.replace('"', '')).strip().lower()
+        while _ORDER_SUFFIX.search(key):
+            key = _ORDER_SUFFIX.sub('', key)
+        keys.append(key)
+    where = indexdef.split(' WHERE ', 1)[1] if ' WHERE ' in indexdef[end:] else None
+    return match.group(1).lower(), keys, normalize_where(where) if where else None
+
+
+def existing_indexes(cur, schema=SCHEMA):
+    """{table: [(index name, method, keys, predicate)]}"""
+    cur.execute("SELECT tablename, indexname, indexdef FROM pg_indexes WHERE schemaname = %s", (schema,))
+    indexes = {}
+    for row in cur.fetchall():
+        method, keys, where = parse_indexdef(row['indexdef'])
+        indexes.setdefault(row['tablename'], []).append((row['indexname'], method, keys, where))
+    return indexes
+
+
+def covering_index(candidate, indexes):
+    """Name of an existing index that already serves the candidate, or None"""
+    for name, method, keys, where in indexes.get(candidate['table'], []):
+        if method != candidate['method']:
+            continue
+        if method == 'gin':
+            if candidate['keys'][0] in keys:
+                return name
+            continue
+        if keys[:len(candidate['keys'])] != candidate['keys']:
+            continue
+        if where is None or (candidate.get('match_where') and candidate['match_where'] in where):
+            return name
+    return None
+
+
+def pg_stat_statements_workload(conn, limit=500):
+    """Top statements on rpa_data tables by total execution time; None without the extension"""
+    with conn.cursor() as cur:
+        cur.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'")
+        if not cur.fetchone():
+            return None
+        for total in ('total_exec_time', 'total_time'):  # renamed in PostgreSQL 13
+            try:
+                cur.execute(f"""
+                    SELECT s.query, s.calls, s.{total} AS total_ms, s.rows
+                    FROM pg_stat_statements s
+                    JOIN pg_database d ON d.oid = s.dbid
+                    WHERE d.datname = current_database()
+                        AND s.query ILIKE %s
+                    ORDER BY s.{total} DESC
+                    LIMIT %s
+                """, (f'%{SCHEMA}.%', limit))
+                return [dict(row, params=None) for row in cur.fetchall()]
+            except errors.UndefinedColumn:
+                conn.rollback()
+    return None
+
+
+def benchmark_workload(db_type):
+    """Statements (with parameters) the benchmark cases run against db_type"""
+    from app.shared.database import Database
+    from app.recon.database import ReconDatabase
+    from benchmarks.bench_suite import bai_cases, data_range, recon_cases
+    from benchmarks.plan_check import capture_queries, route_cases
+
+    bai = Database('bai')
+    recon = ReconDatabase()
+    try:
+        ibans, first_day, last_day = data_range(bai)
+        if db_type == 'recon':
+            cases = recon_cases(recon, first_day, last_day)
+        else:
+            cases = bai_cases(bai, ibans, last_day) + route_cases()
+        statements = {}
+        for name, _, fn in cases:
+            with capture_queries() as captured:
+                try:
+                    fn()
+                except Exception as e:
+                    print(f"Warning: {name} failed: {e}")
+            for _, query, params in captured:
+                entry = statements.setdefault(normalize_sql(query), {
+                    'query': query, 'params': params, 'calls': 0, 'total_ms': None, 'rows': None
+                })
+                entry['calls'] += 1
+        return list(statements.values())
+    finally:
+        bai.close()
+        recon.close()
+
+
+def has_extension(conn, name):
+    with conn.cursor() as cur:
+        cur.execute("SELECT 1 FROM pg_extension WHERE extname = %s", (name,))
+        return cur.fetchone() is not None
+
+
+def is_partitioned(conn, table, schema=SCHEMA):
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT c.relkind = 'p' AS partitioned
+            FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = %s AND c.relname = %s
+        """, (schema, table))
+        row = cur.fetchone()
+        return bool(row and row['partitioned'])
+
+
+def explain_cost(conn, query, params=None):
+    """Estimated total cost of a statement; pg_stat_statements text ($1) needs PostgreSQL 16"""
+    options = 'FORMAT JSON' if params is not None or not re.search(r'\$\d', query) else 'FORMAT JSON, GENERIC_PLAN'
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"EXPLAIN ({options}) {query}", params)
+            plan = cur.fetchone()['QUERY PLAN']
+        return plan[0]['Plan']['Total Cost']
+    except psycopg2.Error:
+        conn.rollback()
+        return None
+
+
+def index_ddl(candidate, concurrently=False, schema=SCHEMA):
+    ddl = (f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {candidate['name']}\n"
+           f"    ON {schema}.{candidate['table']} USING {candidate['method']} {candidate['definition']}")
+    if candidate['where']:
+        ddl += f"\n    WHERE {candidate['where']}"
+    return ddl
+
+
+def estimate_gain(conn, candidate, statements):
+    """(cost before, cost after) summed over the statements with a hypothetical index, or None"""
+    before_total = after_total = 0
+    try:
+        for statement in statements:
+            before = explain_cost(conn, statement['query'], statement['params'])
+            if before is None:
+                continue
+            with conn.cursor() as cur:
+                cur.execute("SELECT * FROM hypopg_create_index(%s)", (index_ddl(candidate).replace('IF NOT EXISTS ', ''),))
+            after = explain_cost(conn, statement['query'], statement['params'])
+            with conn.cursor() as cur:
+                cur.execute("SELECT hypopg_reset()")
+            if after is not None:
+                weight = statement['calls'] or 1
+                before_total += before * weight
+                after_total += after * weight
+    except psycopg2.Error as e:
+        conn.rollback()
+        print(f"Warning: hypopg estimate for {candidate['name']} failed: {e}")
+        return None
+    finally:
+        conn.rollback()
+    return (before_total, after_total) if before_total else None
+
+
+def advise(db_type, source='pg_stat_statements', limit=500, log=print):
+    """Evaluate every candidate of db_type; returns a list of result dicts"""
+    conn = connect(db_type)
+    try:
+        if source == 'benchmarks':
+            workload = benchmark_workload(db_type)
+        else:
+            workload = pg_stat_statements_workload(conn, limit)
+            if workload is None:
+                log(f"Warning: pg_stat_statements is not installed on the {db_type} database, "
+                    f"use --source benchmarks on a seeded copy")
+                return []
+        with conn.cursor() as cur:
+            indexes = existing_indexes(cur)
+        hypopg = has_extension(conn, 'hypopg')
+
+        results = []
+        for candidate in (c for c in CANDIDATES if c['db_type'] == db_type):
+            pattern = re.compile(candidate['pattern'])
+            table = f"{SCHEMA}.{candidate['table']}"
+            matching = [s for s in workload
+                        if table in normalize_sql(s['query']) and pattern.search(normalize_sql(s['query']))]
+            result = {
+                'candidate': candidate,
+                'statements': len(matching),
+                'calls': sum(s['calls'] or 0 for s in matching),
+                'total_ms': sum(s['total_ms'] or 0 for s in matching) if source != 'benchmarks' else None,
+                'covered_by': covering_index(candidate, indexes),
+                'partitioned': is_partitioned(conn, candidate['table']),
+                'gain': None,
+            }
+            if matching and not result['covered_by'] and hypopg:
+                result['gain'] = estimate_gain(conn, candidate, matching)
+            result['status'] = ('covered' if result['covered_by'] else 'unused' if not matching else 'proposed')
+            results.append(result)
+        return results
+    finally:
+        conn.close()
+
+
+def describe_gain(result):
+    if result['gain']:
+        before, after = result['gain']
+        text = f"estimated cost {before:.0f} -> {after:.0f} ({1 - after / before:.0%} less)"
+        if result['total_ms']:
+            text += f", about {result['total_ms'] * (1 - after / before) / 1000:.0f} s of {result['total_ms'] / 1000:.0f} s"
+        return text
+    if result['total_ms']:
+        return f"at most {result['total_ms'] / 1000:.0f} s execution time (install hypopg for an estimate)"
+    return "no estimate (install hypopg)"
+
+
+def print_report(db_type, results, show_all=False):
+    print(f"\n{db_type.upper()} database")
+    print('-' * 80)
+    for result in results:
+        candidate = result['candidate']
+        if result['status'] != 'proposed' and not show_all:
+            continue
+        print(f"{result['status'].upper():<9} {candidate['name']} on {candidate['table']}")
+        if result['status'] == 'covered':
+            print(f"          already served by {result['covered_by']}")
+        elif result['status'] == 'unused':
+            print(f"          no matching statements in the workload")
+        else:
+            print(f"          {result['statements']} statements, {result['calls']} calls; {describe_gain(result)}")
+            print(f"          {candidate['reason']}")
+    if not any(r['status'] == 'proposed' for r in results):
+        print("No new indexes proposed")
+
+
+def next_migration_number(directory=MIGRATION_DIR):
+    numbers = [int(m.group(1)) for m in (re.match(r'migration_(\d{3})_', name) for name in os.listdir(directory)) if m]
+    return max(numbers, default=0) + 1
+
+
+def write_migration(db_type, results, directory=MIGRATION_DIR):
+    """Write the proposed indexes as a migration file; returns its path or None"""
+    proposed = [r for r in results if r['status'] == 'proposed']
+    if not proposed:
+        return None
+    number = next_migration_number(directory)
+    path = os.path.join(directory, f'migration_{number:03d}_index_advisor_{db_type}.sql')
+    lines = [
+        '-- =============================================================================',
+        '-- CashApp Database Migration Script',
+        f'-- {number:03d}: Indexes proposed by index_advisor.py ({db_type} database, {date.today()})',
+        '-- =============================================================================',
+        '-- Review before running. Indexes on non-partitioned tables are built',
+        '-- CONCURRENTLY: run this file with psql (\\i), not via run_migration.py.',
+        '-- Partitioned tables do not support CONCURRENTLY; those indexes block',
+        '-- writes to the table while they build, run them outside the ingest window.',
+        '-- =============================================================================',
+        '',
+    ]
+    for extension in sorted({r['candidate']['extension'] for r in proposed if r['candidate'].get('extension')}):
+        lines += [f'CREATE EXTENSION IF NOT EXISTS {extension};', '']
+    for result in proposed:
+        candidate = result['candidate']
+        lines.append(f"-- {candidate['reason']}")
+        lines.append(f"-- Workload: {result['statements']} statements, {result['calls']} calls; {describe_gain(result)}")
+        if result['partitioned']:
+            lines.append('-- Partitioned table: no CONCURRENTLY')
+        lines += [index_ddl(candidate, concurrently=not result['partitioned']) + ';', '']
+    for table in sorted({r['candidate']['table'] for r in proposed}):
+        lines.append(f'ANALYZE {SCHEMA}.{table};')
+    lines += ['', '-- Rollback: DROP INDEX ' + ', '.join(f"{SCHEMA}.{r['candidate']['name']}" for r in proposed) + ';', '']
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Propose indexes for the filter patterns of the app')
+    parser.add_argument('--db', choices=['bai', 'recon', 'all'], default='all')
+    parser.add_argument('--source', choices=['pg_stat_statements', 'benchmarks'], default='pg_stat_statements',
+                        help='workload: pg_stat_statements, or the benchmark cases on a seeded database')
+    parser.add_argument('--limit', type=int, default=500, help='top statements read from pg_stat_statements')
+    parser.add_argument('--all', action='store_true', help='also list covered and unused candidates')
+    parser.add_argument('--write-migration', action='store_true', help='write database/migration_NNN_index_advisor_<db>.sql')
+    args = parser.parse_args()
+
+    for db_type in (['bai', 'recon'] if args.db == 'all' else [args.db]):
+        results = advise(db_type, args.source, args.limit)
+        print_report(db_type, results, args.all)
+        if args.write_migration:
+            path = write_migration(db_type, results)
+            if path:
+                print(f"Migration written to {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -171,6 +171,9 @@ FOR VALUES FROM ('2026-03-01') TO ('2026-04-01');
 COMMIT;
 
 -- TODO: Add more partitions based on your actual date range
+-- Future months are created (and DEFAULT partition rows moved) by
+-- database/partition_manager.py, daily via the app scheduler:
+--   py partition_manager.py --report
 
 
 -- ============================================================================
@@ -362,6 +365,7 @@ $$ LANGUAGE plpgsql;
 
 -- Schedule this function to run monthly (via cron or pg_cron)
 -- Or call it manually before start of new month
+-- (superseded by database/partition_manager.py, which keeps PARTITION_MONTHS_AHEAD months)
 
 
 -- ============================================================================
@@ -0,0 +1,44 @@
+-- =============================================================================
+-- CashApp Database Migration Script
+-- 003: NOTIFY triggers for query cache invalidation
+-- =============================================================================
+-- The app caches BAI query results per process (app/shared/cache.py).
+-- These statement-level triggers send a NOTIFY on channel 'cashapp_cache'
+-- whenever the ingest writes BAI data, so every worker drops its 'bai'
+-- entries. Set QUERY_CACHE_NOTIFY_CHANNEL=cashapp_cache in .env to listen.
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION rpa_data.cashapp_cache_notify()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('cashapp_cache', TG_ARGV[0]);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_cache_notify_transactions ON rpa_data.bai_rabobank_transactions;
+CREATE TRIGGER trg_cache_notify_transactions
+AFTER INSERT OR UPDATE OR DELETE ON rpa_data.bai_rabobank_transactions
+FOR EACH STATEMENT EXECUTE FUNCTION rpa_data.cashapp_cache_notify('bai');
+
+DROP TRIGGER IF EXISTS trg_cache_notify_balances ON rpa_data.bai_rabobank_balances;
+CREATE TRIGGER trg_cache_notify_balances
+AFTER INSERT OR UPDATE OR DELETE ON rpa_data.bai_rabobank_balances
+FOR EACH STATEMENT EXECUTE FUNCTION rpa_data.cashapp_cache_notify('bai');
+
+DROP TRIGGER IF EXISTS trg_cache_notify_account_info ON rpa_data.bai_rabobank_account_info;
+CREATE TRIGGER trg_cache_notify_account_info
+AFTER INSERT OR UPDATE OR DELETE ON rpa_data.bai_rabobank_account_info
+FOR EACH STATEMENT EXECUTE FUNCTION rpa_data.cashapp_cache_notify('bai');
+
+DROP TRIGGER IF EXISTS trg_cache_notify_exports ON rpa_data.bai_exports;
+CREATE TRIGGER trg_cache_notify_exports
+AFTER INSERT OR UPDATE OR DELETE ON rpa_data.bai_exports
+FOR EACH STATEMENT EXECUTE FUNCTION rpa_data.cashapp_cache_notify('bai_exports');
+
+-- Verify
+SELECT event_object_table, trigger_name
+FROM information_schema.triggers
+WHERE trigger_schema = 'rpa_data'
+  AND trigger_name LIKE 'trg_cache_notify_%'
+ORDER BY event_object_table;
@@ -0,0 +1,15 @@
+-- =============================================================================
+-- CashApp Database Migration Script
+-- 004: Duration per export in bai_exports_audit_log
+-- =============================================================================
+-- The in-app export scheduler (app/bai/exports/scheduler.py) records how long
+-- each export file took, including retries, and how many attempts it needed.
+-- Rows written by the external robot keep NULL in both columns.
+-- =============================================================================
+
+ALTER TABLE rpa_data.bai_exports_audit_log
+    ADD COLUMN IF NOT EXISTS duration_ms INTEGER,
+    ADD COLUMN IF NOT EXISTS attempts SMALLINT;
+
+COMMENT ON COLUMN rpa_data.bai_exports_audit_log.duration_ms IS 'Wall time of the export in milliseconds (all attempts)';
+COMMENT ON COLUMN rpa_data.bai_exports_audit_log.attempts IS 'Number of attempts made by the export scheduler';
@@ -0,0 +1,23 @@
+-- =============================================================================
+-- CashApp Database Migration Script
+-- 005: Indexes for browsing bai_exports_audit_log
+-- =============================================================================
+-- The export status page and /bai/api/exports/audit-log page through the
+-- audit log by keyset on (timestamp, id), newest first, optionally filtered
+-- on IBAN or on export format and closing date. These indexes let every page
+-- be read as an index range scan, however deep the page is.
+--
+-- CREATE INDEX CONCURRENTLY cannot run inside a transaction: run this file
+-- with psql (\i), not via run_migration.py.
+-- =============================================================================
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_exports_audit_timestamp
+    ON rpa_data.bai_exports_audit_log (timestamp DESC, id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_exports_audit_iban_timestamp
+    ON rpa_data.bai_exports_audit_log (iban, timestamp DESC, id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_exports_audit_format_closingdate
+    ON rpa_data.bai_exports_audit_log (export_format, closingdate);
+
+ANALYZE rpa_data.bai_exports_audit_log;
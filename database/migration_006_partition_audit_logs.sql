@@ -0,0 +1,200 @@
+-- =============================================================================
+-- CashApp Database Migration Script
+-- 006: Range-partition the BAI audit logs by month
+-- =============================================================================
+-- rpa_data.bai_api_audit_log and rpa_data.bai_exports_audit_log grow forever.
+-- Both are converted to tables partitioned by RANGE ("timestamp"), one
+-- partition per month plus a DEFAULT partition, so that:
+--   * queries with a timestamp range only touch the months they need
+--     (closingdate filters are paired with a timestamp lower bound in the app,
+--     a closing date is always fetched/exported after that day has started)
+--   * old months can be detached and archived instead of deleted row by row
+--
+-- "timestamp" is used as partition key because it is NOT NULL in both logs
+-- (closingdate is nullable in bai_api_audit_log and can not be part of the
+-- primary key). The primary keys get "timestamp" added, as PostgreSQL requires.
+--
+-- Future partitions and retention are handled by database/audit_log_maintenance.py
+-- (daily job on the app scheduler, or run it by hand / from cron).
+--
+-- Test on ACCEPT first. Run with psql (\i); the DO blocks can not go through
+-- run_migration.py. Writers (robot, export scheduler) should be stopped
+-- during STEP 2-3.
+-- =============================================================================
+
+SET search_path TO rpa_data;
+
+-- ============================================================================
+-- STEP 1: BACKUP
+-- ============================================================================
+BEGIN;
+
+CREATE TABLE bai_api_audit_log_backup_006 AS SELECT * FROM bai_api_audit_log;
+CREATE TABLE bai_exports_audit_log_backup_006 AS SELECT * FROM bai_exports_audit_log;
+
+COMMIT;
+
+
+-- ============================================================================
+-- STEP 2: CREATE PARTITIONED TABLES
+-- ============================================================================
+BEGIN;
+
+ALTER TABLE bai_api_audit_log RENAME TO bai_api_audit_log_old;
+ALTER TABLE bai_api_audit_log_old RENAME CONSTRAINT bai_api_audit_log_pkey TO bai_api_audit_log_old_pkey;
+-- Free the index names for the partitioned table (STEP 4)
+ALTER INDEX IF EXISTS idx_bai_audit_bank_endpoint_ts RENAME TO idx_bai_audit_bank_endpoint_ts_old;
+ALTER INDEX IF EXISTS idx_bai_audit_correlation RENAME TO idx_bai_audit_correlation_old;
+ALTER INDEX IF EXISTS idx_bai_audit_status RENAME TO idx_bai_audit_status_old;
+
+CREATE TABLE bai_api_audit_log (
+    LIKE bai_api_audit_log_old INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMMENTS,
+    CONSTRAINT bai_api_audit_log_pkey PRIMARY KEY (id, attempt_nr, "timestamp")
+) PARTITION BY RANGE ("timestamp");
+
+ALTER TABLE bai_exports_audit_log RENAME TO bai_exports_audit_log_old;
+ALTER INDEX IF EXISTS idx_exports_audit_timestamp RENAME TO idx_exports_audit_timestamp_old;
+ALTER INDEX IF EXISTS idx_exports_audit_iban_timestamp RENAME TO idx_exports_audit_iban_timestamp_old;
+ALTER INDEX IF EXISTS idx_exports_audit_format_closingdate RENAME TO idx_exports_audit_format_closingdate_old;
+
+-- id keeps its serial default (nextval of bai_exports_audit_log_id_seq)
+CREATE TABLE bai_exports_audit_log (
+    LIKE bai_exports_audit_log_old INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMMENTS,
+    CONSTRAINT bai_exports_audit_log_ts_pkey PRIMARY KEY (id, "timestamp")
+) PARTITION BY RANGE ("timestamp");
+
+COMMENT ON TABLE bai_api_audit_log IS 'BAI API audit log - partitioned by timestamp (monthly)';
+COMMENT ON TABLE bai_exports_audit_log IS 'Export audit log - partitioned by timestamp (monthly)';
+
+-- Monthly partitions from the oldest row up to 3 months ahead, plus DEFAULT
+DO $$
+DECLARE
+    parent TEXT;
+    first_month DATE;
+    month DATE;
+BEGIN
+    FOREACH parent IN ARRAY ARRAY['bai_api_audit_log', 'bai_exports_audit_log'] LOOP
+        EXECUTE format('SELECT date_trunc(''month'', MIN("timestamp"))::date FROM rpa_data.%I', parent || '_old')
+            INTO first_month;
+        month := COALESCE(first_month, date_trunc('month', CURRENT_DATE)::date);
+        WHILE month <= (date_trunc('month', CURRENT_DATE) + INTERVAL '3 months')::date LOOP
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS rpa_data.%I PARTITION OF rpa_data.%I FOR VALUES FROM (%L) TO (%L)',
+                parent || '_' || to_char(month, 'YYYY_MM'), parent, month, (month + INTERVAL '1 month')::date
+            );
+            month := (month + INTERVAL '1 month')::date;
+        END LOOP;
+        EXECUTE format('CREATE TABLE IF NOT EXISTS rpa_data.%I PARTITION OF rpa_data.%I DEFAULT',
+                       parent || '_default', parent);
+    END LOOP;
+END $$;
+
+COMMIT;
+
+
+-- ============================================================================
+-- STEP 3: MIGRATE DATA
+-- ============================================================================
+BEGIN;
+
+INSERT INTO bai_api_audit_log SELECT * FROM bai_api_audit_log_old;
+INSERT INTO bai_exports_audit_log SELECT * FROM bai_exports_audit_log_old;
+
+-- The serial sequence must survive dropping the old table
+ALTER SEQUENCE IF EXISTS bai_exports_audit_log_id_seq OWNED BY bai_exports_audit_log.id;
+
+COMMIT;
+
+SELECT 'bai_api_audit_log' AS log_table,
+       (SELECT COUNT(*) FROM bai_api_audit_log_old) AS old_rows,
+       (SELECT COUNT(*) FROM bai_api_audit_log) AS new_rows
+UNION ALL
+SELECT 'bai_exports_audit_log',
+       (SELECT COUNT(*) FROM bai_exports_audit_log_old),
+       (SELECT COUNT(*) FROM bai_exports_audit_log);
+
+
+-- ============================================================================
+-- STEP 4: INDEXES (created on every partition)
+-- ============================================================================
+BEGIN;
+
+-- Existing bai_api_audit_log indexes
+CREATE INDEX IF NOT EXISTS idx_bai_audit_bank_endpoint_ts
+    ON bai_api_audit_log (bank, endpoint, "timestamp" DESC);
+CREATE INDEX IF NOT EXISTS idx_bai_audit_correlation
+    ON bai_api_audit_log (correlation_id);
+CREATE INDEX IF NOT EXISTS idx_bai_audit_status
+    ON bai_api_audit_log (response_status);
+
+-- Data quality / reconciliation / OPS: closingdate + endpoint per IBAN
+CREATE INDEX IF NOT EXISTS idx_bai_audit_closingdate_endpoint
+    ON bai_api_audit_log (closingdate, endpoint, iban);
+
+-- Export status browsing (migration 005, recreated on the partitioned table)
+CREATE INDEX IF NOT EXISTS idx_exports_audit_timestamp
+    ON bai_exports_audit_log ("timestamp" DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_exports_audit_iban_timestamp
+    ON bai_exports_audit_log (iban, "timestamp" DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_exports_audit_format_closingdate
+    ON bai_exports_audit_log (export_format, closingdate);
+
+-- OPS dashboard: exports per destination for a day
+CREATE INDEX IF NOT EXISTS idx_exports_audit_destination_timestamp
+    ON bai_exports_audit_log (destination, "timestamp");
+
+COMMIT;
+
+ANALYZE bai_api_audit_log;
+ANALYZE bai_exports_audit_log;
+
+
+-- ============================================================================
+-- STEP 5: PERMISSIONS
+-- ============================================================================
+-- Grant the same privileges as on the old tables; check them with:
+SELECT table_name, grantee, privilege_type
+FROM information_schema.role_table_grants
+WHERE table_schema = 'rpa_data'
+  AND table_name IN ('bai_api_audit_log_old', 'bai_exports_audit_log_old');
+
+-- Example:
+-- GRANT SELECT, INSERT ON bai_api_audit_log TO rpa_pvcp_acc;
+
+
+-- ============================================================================
+-- STEP 6: VERIFY
+-- ============================================================================
+SELECT tableoid::regclass AS partition_name, COUNT(*) AS row_count,
+       MIN("timestamp") AS first_ts, MAX("timestamp") AS last_ts
+FROM bai_api_audit_log
+GROUP BY tableoid
+ORDER BY partition_name;
+
+EXPLAIN
+SELECT iban, endpoint, response_status
+FROM bai_api_audit_log
+WHERE closingdate = CURRENT_DATE - 1
+  AND "timestamp" >= CURRENT_DATE - 2;
+
+
+-- ============================================================================
+-- STEP 7: CLEANUP (after 24-48 hours of verification!)
+-- ============================================================================
+-- DROP TABLE rpa_data.bai_api_audit_log_old;
+-- DROP TABLE rpa_data.bai_exports_audit_log_old;
+-- DROP TABLE rpa_data.bai_api_audit_log_backup_006;
+-- DROP TABLE rpa_data.bai_exports_audit_log_backup_006;
+
+
+-- ============================================================================
+-- ROLLBACK
+-- ============================================================================
+-- BEGIN;
+-- ALTER SEQUENCE rpa_data.bai_exports_audit_log_id_seq OWNED BY rpa_data.bai_exports_audit_log_old.id;
+-- DROP TABLE rpa_data.bai_api_audit_log;
+-- DROP TABLE rpa_data.bai_exports_audit_log;
+-- ALTER TABLE rpa_data.bai_api_audit_log_old RENAME TO bai_api_audit_log;
+-- ALTER TABLE rpa_data.bai_api_audit_log RENAME CONSTRAINT bai_api_audit_log_old_pkey TO bai_api_audit_log_pkey;
+-- ALTER TABLE rpa_data.bai_exports_audit_log_old RENAME TO bai_exports_audit_log;
+-- COMMIT;
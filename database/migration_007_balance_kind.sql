@@ -0,0 +1,136 @@
+-- =============================================================================
+-- CashApp Database Migration Script
+-- 007: Canonical balance kind on bai_rabobank_balances
+-- =============================================================================
+-- The reconciliation queries filtered balances on
+-- LOWER(balance_type) IN ('closingbooked', 'closing_booked') and the statement
+-- and export queries on balance_type = 'closingBooked'; neither can use an
+-- index on balance_type. This adds a balance_kind enum column that a trigger
+-- fills on every insert (robot ingest) and balance_type update, backfills the
+-- existing rows and adds partial indexes on the closing booked balances.
+--
+-- The app queries balance_kind from this release on: run this migration
+-- before deploying it.
+--
+-- Run with psql (\i): the backfill commits per batch and the indexes are
+-- built CONCURRENTLY, neither can go through run_migration.py.
+-- =============================================================================
+
+SET search_path TO rpa_data;
+
+-- ============================================================================
+-- STEP 1: ENUM, NORMALIZATION FUNCTION AND TRIGGER
+-- ============================================================================
+BEGIN;
+
+DO $$
+BEGIN
+    CREATE TYPE bai_balance_kind AS ENUM ('closing_booked', 'interim_booked', 'expected', 'other');
+EXCEPTION
+    WHEN duplicate_object THEN NULL;
+END $$;
+
+-- closingBooked, ClosingBooked, closing_booked, ... -> closing_booked
+CREATE OR REPLACE FUNCTION bai_balance_kind_of(balance_type TEXT)
+RETURNS bai_balance_kind
+LANGUAGE sql IMMUTABLE
+AS $$
+    SELECT CASE REPLACE(LOWER(balance_type), '_', '')
+        WHEN 'closingbooked' THEN 'closing_booked'
+        WHEN 'interimbooked' THEN 'interim_booked'
+        WHEN 'expected' THEN 'expected'
+        ELSE 'other'
+    END::rpa_data.bai_balance_kind
+$$;
+
+ALTER TABLE bai_rabobank_balances ADD COLUMN IF NOT EXISTS balance_kind bai_balance_kind;
+
+COMMENT ON COLUMN bai_rabobank_balances.balance_kind IS 'Normalized balance_type, set by trigger trg_bai_balance_kind';
+
+CREATE OR REPLACE FUNCTION bai_set_balance_kind()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.balance_kind := rpa_data.bai_balance_kind_of(NEW.balance_type);
+    RETURN NEW;
+END $$;
+
+DROP TRIGGER IF EXISTS trg_bai_balance_kind ON bai_rabobank_balances;
+CREATE TRIGGER trg_bai_balance_kind
+    BEFORE INSERT OR UPDATE OF balance_type ON bai_rabobank_balances
+    FOR EACH ROW EXECUTE FUNCTION bai_set_balance_kind();
+
+COMMIT;
+
+
+-- ============================================================================
+-- STEP 2: BACKFILL (batches of 50k rows, committed one by one)
+-- ============================================================================
+DO $$
+DECLARE
+    updated INTEGER;
+BEGIN
+    LOOP
+        UPDATE rpa_data.bai_rabobank_balances
+        SET balance_kind = rpa_data.bai_balance_kind_of(balance_type)
+        WHERE id IN (
+            SELECT id FROM rpa_data.bai_rabobank_balances
+            WHERE balance_kind IS NULL
+            LIMIT 50000
+        );
+        GET DIAGNOSTICS updated = ROW_COUNT;
+        EXIT WHEN updated = 0;
+        RAISE NOTICE 'balance_kind set on % rows', updated;
+        COMMIT;
+    END LOOP;
+END $$;
+
+ALTER TABLE bai_rabobank_balances ALTER COLUMN balance_kind SET NOT NULL;
+
+
+-- ============================================================================
+-- STEP 3: PARTIAL INDEXES
+-- ============================================================================
+-- Statements and exports: closing balance of one IBAN on one or two dates
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_bai_balance_closing_iban_date
+    ON rpa_data.bai_rabobank_balances (iban, reference_date)
+    INCLUDE (amount, currency)
+    WHERE balance_kind = 'closing_booked';
+
+-- Reconciliation and OPS status: closing balances of all IBANs over a date range
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_bai_balance_closing_date
+    ON rpa_data.bai_rabobank_balances (reference_date, iban)
+    INCLUDE (amount, currency)
+    WHERE balance_kind = 'closing_booked';
+
+ANALYZE rpa_data.bai_rabobank_balances;
+
+
+-- ============================================================================
+-- STEP 4: VERIFY
+-- ============================================================================
+SELECT balance_type, balance_kind, COUNT(*) AS row_count
+FROM bai_rabobank_balances
+GROUP BY balance_type, balance_kind
+ORDER BY balance_type;
+
+EXPLAIN
+SELECT iban, reference_date, amount
+FROM bai_rabobank_balances
+WHERE balance_kind = 'closing_booked'
+  AND reference_date BETWEEN CURRENT_DATE - 7 AND CURRENT_DATE - 1;
+
+
+-- ============================================================================
+-- ROLLBACK (deploy the previous app release first)
+-- ============================================================================
+-- DROP INDEX CONCURRENTLY IF EXISTS rpa_data.idx_bai_balance_closing_iban_date;
+-- DROP INDEX CONCURRENTLY IF EXISTS rpa_data.idx_bai_balance_closing_date;
+-- BEGIN;
+-- DROP TRIGGER IF EXISTS trg_bai_balance_kind ON rpa_data.bai_rabobank_balances;
+-- ALTER TABLE rpa_data.bai_rabobank_balances DROP COLUMN IF EXISTS balance_kind;
+-- DROP FUNCTION IF EXISTS rpa_data.bai_set_balance_kind();
+-- DROP FUNCTION IF EXISTS rpa_data.bai_balance_kind_of(TEXT);
+-- DROP TYPE IF EXISTS rpa_data.bai_balance_kind;
+-- COMMIT;
@@ -0,0 +1,22 @@
+-- =============================================================================
+-- CashApp Database Migration Script
+-- 008: NOTIFY trigger for cached export audit log values
+-- =============================================================================
+-- The export config page caches the banks and IBANs found in
+-- bai_exports_audit_log under the query cache tag 'bai_exports_audit'.
+-- This statement-level trigger sends that tag on channel 'cashapp_cache'
+-- whenever audit rows are written (app, scheduler or robot), so every worker
+-- drops the cached dropdown values. Uses the function from migration 003.
+-- =============================================================================
+
+DROP TRIGGER IF EXISTS trg_cache_notify_exports_audit ON rpa_data.bai_exports_audit_log;
+CREATE TRIGGER trg_cache_notify_exports_audit
+AFTER INSERT OR UPDATE OR DELETE ON rpa_data.bai_exports_audit_log
+FOR EACH STATEMENT EXECUTE FUNCTION rpa_data.cashapp_cache_notify('bai_exports_audit');
+
+-- Verify
+SELECT event_object_table, trigger_name
+FROM information_schema.triggers
+WHERE trigger_schema = 'rpa_data'
+  AND trigger_name LIKE 'trg_cache_notify_%'
+ORDER BY event_object_table;
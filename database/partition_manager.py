@@ -0,0 +1,296 @@
+"""
+Partition manager for the monthly partitioned BAI data tables
+rpa_data.bai_rabobank_transactions is partitioned by booking_date per month
+(migrate_partition_transactions.sql); bai_rabobank_balances is handled the
+same way on reference_date once it is partitioned, and skipped until then.
+
+  * keeps PARTITION_MONTHS_AHEAD months of future partitions, so the ingest
+    never hits a month without a partition at rollover
+  * moves rows that ended up in a DEFAULT partition into their own month
+  * reports size and (estimated) row count per partition
+
+The app runs it daily on the shared scheduler (SCHEDULER_ENABLED); the
+generic helpers are also used by audit_log_maintenance.py.
+
+Usage:
+    python database/partition_manager.py --report
+    python database/partition_manager.py --months-ahead 6 --dry-run
+"""
+import argparse
+import os
+import re
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extras import RealDictCursor
+from config.config import Config
+
+SCHEMA = 'rpa_data'
+
+# Monthly range-partitioned data tables and their partition key
+DATA_TABLES = {
+    'bai_rabobank_transactions': 'booking_date',
+    'bai_rabobank_balances': 'reference_date',
+}
+
+_BOUND = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+DAILY_JOB_ID = 'data_partition_maintenance'
+
+
+def add_months(day, months):
+    """First day of the month `months` after the month of `day`"""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    return f"{table}_{month.strftime('%Y_%m')}"
+
+
+def is_partitioned(cur, table, schema=SCHEMA):
+    cur.execute("""
+        SELECT c.relkind = 'p' AS partitioned
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = %s AND c.relname = %s
+    """, (schema, table))
+    row = cur.fetchone()
+    return bool(row and row['partitioned'])
+
+
+def list_partitions(cur, table, schema=SCHEMA):
+    """Partitions of a range-partitioned table as dicts (name, lower, upper, is_default)
+
+    Bounds are the first days of the covered months; both are None for DEFAULT.
+    """
+    cur.execute("""
+        SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bound
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        JOIN pg_namespace n ON n.oid = p.relnamespace
+        WHERE n.nspname = %s AND p.relname = %s
+        ORDER BY c.relname
+    """, (schema, table))
+    partitions = []
+    for row in cur.fetchall():
+        match = _BOUND.search(row['bound'])
+        partitions.append({
+            'name': row['name'],
+            'lower': date.fromisoformat(match.group(1)[:10]) if match else None,
+            'upper': date.fromisoformat(match.group(2)[:10]) if match else None,
+            'is_default': row['bound'] == 'DEFAULT',
+        })
+    return partitions
+
+
+def create_month_partition(cur, table, month, schema=SCHEMA):
+    name = partition_name(table, month)
+    cur.execute(sql.SQL("CREATE TABLE IF NOT EXISTS {} PARTITION OF {} FOR VALUES FROM (%s) TO (%s)").format(
+        sql.Identifier(schema, name), sql.Identifier(schema, table)
+    ), (month, add_months(month, 1)))
+    return name
+
+
+def ensure_future_partitions(cur, table, months_ahead, today=None, schema=SCHEMA, dry_run=False, log=print):
+    """Create the monthly partitions from this month up to `months_ahead` months ahead
+
+    Returns:
+        list: Names of the partitions created
+    """
+    today = today or date.today()
+    existing = {p['lower'] for p in list_partitions(cur, table, schema) if p['lower']}
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(today, offset)
+        if month in existing:
+            continue
+        name = partition_name(table, month) if dry_run else create_month_partition(cur, table, month, schema)
+        created.append(name)
+        log(f"{'Would create' if dry_run else 'Created'} partition {schema}.{name}")
+    return created
+
+
+def default_partition(cur, table, schema=SCHEMA):
+    return next((p for p in list_partitions(cur, table, schema) if p['is_default']), None)
+
+
+def default_partition_rows(cur, table, schema=SCHEMA):
+    """Rows in the DEFAULT partition (should be 0 when future partitions are kept up)"""
+    default = default_partition(cur, table, schema)
+    if default is None:
+        return 0
+    cur.execute(sql.SQL("SELECT COUNT(*) AS rows FROM {}").format(sql.Identifier(schema, default['name'])))
+    return cur.fetchone()['rows']
+
+
+def move_default_rows(cur, table, key, schema=SCHEMA, dry_run=False, log=print):
+    """Move DEFAULT partition rows into monthly partitions
+
+    A partition can not be created while the DEFAULT partition holds rows for
+    its range, so the DEFAULT partition is detached, the months are created,
+    their rows re-inserted through the parent and the DEFAULT partition is
+    attached again. Run inside one transaction: the parent is locked until
+    commit, so concurrent inserts wait instead of failing.
+
+    Returns:
+        dict: month (date) -> rows moved
+    """
+    default = default_partition(cur, table, schema)
+    if default is None:
+        return {}
+    default_table = sql.Identifier(schema, default['name'])
+    column = sql.Identifier(key)
+    cur.execute(sql.SQL(
+        "SELECT date_trunc('month', {column})::date AS month, COUNT(*) AS rows "
+        "FROM {default} WHERE {column} IS NOT NULL GROUP BY 1 ORDER BY 1"
+    ).format(column=column, default=default_table))
+    months = {row['month']: row['rows'] for row in cur.fetchall()}
+    if not months:
+        return {}
+    if dry_run:
+        for month, rows in months.items():
+            log(f"Would move {rows} rows of {month:%Y-%m} from {default['name']} to {partition_name(table, month)}")
+        return months
+
+    parent = sql.Identifier(schema, table)
+    cur.execute(sql.SQL("ALTER TABLE {} DETACH PARTITION {}").format(parent, default_table))
+    for month, rows in months.items():
+        create_month_partition(cur, table, month, schema)
+        bounds = (month, add_months(month, 1))
+        cur.execute(sql.SQL(
+            "INSERT INTO {parent} SELECT * FROM {default} WHERE {column} >= %s AND {column} < %s"
+        ).format(parent=parent, default=default_table, column=column), bounds)
+        cur.execute(sql.SQL(
+            "DELETE FROM {default} WHERE {column} >= %s AND {column} < %s"
+        ).format(default=default_table, column=column), bounds)
+        log(f"Moved {rows} rows of {month:%Y-%m} from {default['name']} to {partition_name(table, month)}")
+    cur.execute(sql.SQL("ALTER TABLE {} ATTACH PARTITION {} DEFAULT").format(parent, default_table))
+    return months
+
+
+def partition_report(cur, table, schema=SCHEMA):
+    """Size and estimated live rows per partition (from pg_stat_user_tables)"""
+    cur.execute("""
+        SELECT
+            c.relname AS name,
+            pg_get_expr(c.relpartbound, c.oid) AS bound,
+            pg_total_relation_size(c.oid) AS total_bytes,
+            COALESCE(s.n_live_tup, c.reltuples::bigint) AS estimated_rows,
+            s.last_autovacuum,
+            s.last_autoanalyze
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        JOIN pg_namespace n ON n.oid = p.relnamespace
+        LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+        WHERE n.nspname = %s AND p.relname = %s
+        ORDER BY c.relname
+    """, (schema, table))
+    return cur.fetchall()
+
+
+def run_partition_maintenance(months_ahead=None, move_default=True, dry_run=False, tables=None, log=print):
+    """Create future partitions and empty the DEFAULT partition for every data table
+
+    Each table is handled in its own transaction; tables that are not
+    partitioned are skipped and a failure is logged without stopping the run.
+
+    Returns:
+        dict: Per table the created partitions, moved rows per month and DEFAULT rows left
+    """
+    months_ahead = Config.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    summary = {}
+    conn = psycopg2.connect(Config.get_db_connection_string('bai'), cursor_factory=RealDictCursor)
+    try:
+        for table in tables or DATA_TABLES:
+            try:
+                with conn.cursor() as cur:
+                    if not is_partitioned(cur, table):
+                        summary[table] = {'skipped': 'not partitioned'}
+                        continue
+                    moved = {}
+                    if move_default:
+                        moved = move_default_rows(cur, table, DATA_TABLES[table], dry_run=dry_run, log=log)
+                    created = ensure_future_partitions(cur, table, months_ahead, dry_run=dry_run, log=log)
+                    default_rows = default_partition_rows(cur, table)
+                conn.commit()
+                if default_rows and not moved:
+                    log(f"Warning: {default_rows} rows in the DEFAULT partition of {table}")
+                summary[table] = {
+                    'created': created,
+                    'moved': {month.isoformat(): rows for month, rows in moved.items()},
+                    'default_rows': default_rows,
+                }
+            except Exception as e:
+                conn.rollback()
+                log(f"Warning: partition maintenance for {table} failed: {e}")
+                summary[table] = {'error': str(e)}
+    finally:
+        conn.close()
+    return summary
+
+
+def print_report(tables=None):
+    conn = psycopg2.connect(Config.get_db_connection_string('bai'), cursor_factory=RealDictCursor)
+    try:
+        with conn.cursor() as cur:
+            for table in tables or DATA_TABLES:
+                if not is_partitioned(cur, table):
+                    print(f"\n{SCHEMA}.{table}: not partitioned")
+                    continue
+                rows = partition_report(cur, table)
+                print(f"\n{SCHEMA}.{table}")
+                print(f"{'Partition':<40} {'Range':<28} {'Rows (est.)':>12} {'Size MB':>9}")
+                print('-' * 92)
+                for row in rows:
+                    match = _BOUND.search(row['bound'])
+                    bounds = f"{match.group(1)[:10]} - {match.group(2)[:10]}" if match else row['bound']
+                    print(f"{row['name']:<40} {bounds:<28} {row['estimated_rows']:>12} "
+                          f"{row['total_bytes'] / 1024 / 1024:>9.1f}")
+                total_rows = sum(row['estimated_rows'] or 0 for row in rows)
+                total_mb = sum(row['total_bytes'] for row in rows) / 1024 / 1024
+                print(f"{'Total':<40} {len(rows):<28} {total_rows:>12} {total_mb:>9.1f}")
+    finally:
+        conn.close()
+
+
+def schedule_maintenance(scheduler=None):
+    """Register the daily data table partition maintenance on the shared scheduler"""
+    if scheduler is None:
+        from app.shared.scheduler import scheduler
+    scheduler.add_job(
+        run_partition_maintenance,
+        'cron',
+        hour=2,
+        minute=0,
+        id=DAILY_JOB_ID,
+        name='Data table partition maintenance',
+        replace_existing=True
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Keep future monthly partitions for the BAI data tables')
+    parser.add_argument('--months-ahead', type=int, default=None, help=f'default {Config.PARTITION_MONTHS_AHEAD}')
+    parser.add_argument('--table', action='append', choices=sorted(DATA_TABLES), help='limit to this table')
+    parser.add_argument('--no-move-default', action='store_true', help='leave DEFAULT partition rows in place')
+    parser.add_argument('--report', action='store_true', help='only print partition sizes and row counts')
+    parser.add_argument('--dry-run', action='store_true', help='only report what would change')
+    args = parser.parse_args()
+
+    if args.report:
+        print_report(args.table)
+        return
+    summary = run_partition_maintenance(args.months_ahead, move_default=not args.no_move_default,
+                                        dry_run=args.dry_run, tables=args.table)
+    sys.exit(1 if any('error' in result for result in summary.values()) else 0)
+
+
+if __name__ == '__main__':
+    main()